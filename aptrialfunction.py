@@ -42,10 +42,19 @@ Methods:
         at xv with network output N, network output gradient
         delN, and network output Hessian deldelN
 
+    Af_v(X), delAf_v(X), deldelAf_v(X), Pf_v(X), delPf_v(X), deldelPf_v(X),
+    Ytf_v(X, N), delYtf_v(X, N, delN), deldelYtf_v(X, N, delN, deldelN) -
+        Batched versions of the above methods for an (n, m) array X of
+        points, with N (n,), delN (n, m) and deldelN (n, m, m) arrays of
+        network outputs. The A and P methods call the scalar versions once
+        per point unless a subclass overrides them.
+
 Todo:
 """
 
 
+import numpy as np
+
 from trialfunction import TrialFunction
 
 
@@ -88,16 +97,17 @@ class APTrialFunction(TrialFunction):
         A = self.Af(xv)
         P = self.Pf(xv)
         Yt = A + P*N
-        return None
+        return Yt
 
     def delYtf(self, xv, N, delN):
         """Trial function gradient"""
         delA = self.delAf(xv)
         P = self.Pf(xv)
+        delP = self.delPf(xv)
         delYt = []
         m = len(xv)
         for j in range(m):
-            delYt.append(delA[j] + P*delN[j] + delP[j]*n)
+            delYt.append(delA[j] + P*delN[j] + delP[j]*N)
         return delYt
 
     def deldelYtf(self, xv, N, delN, deldelN):
@@ -106,6 +116,7 @@ class APTrialFunction(TrialFunction):
         P = self.Pf(xv)
         delP = self.delPf(xv)
         deldelP = self.deldelPf(xv)
+        deldelYt = []
         m = len(xv)
         for j in range(m):
             tmp = []
@@ -116,6 +127,62 @@ class APTrialFunction(TrialFunction):
 
         return deldelYt
 
+    # Batched versions of the methods above. Each takes an (n, m) array X
+    # of points, one point per row, and returns an (n,) array for scalar
+    # quantities, an (n, m) array for gradients, or an (n, m, m) array for
+    # Hessians.
+
+    def Af_v(self, X):
+        """Boundary condition function for an array of points"""
+        return np.array([self.Af(xv) for xv in X], dtype=float)
+
+    def delAf_v(self, X):
+        """Boundary condition function gradient for an array of points"""
+        return np.array([self.delAf(xv) for xv in X], dtype=float)
+
+    def deldelAf_v(self, X):
+        """Boundary condition function Hessian for an array of points"""
+        return np.array([self.deldelAf(xv) for xv in X], dtype=float)
+
+    def Pf_v(self, X):
+        """Network coefficient function for an array of points"""
+        return np.array([self.Pf(xv) for xv in X], dtype=float)
+
+    def delPf_v(self, X):
+        """Network coefficient function gradient for an array of points"""
+        return np.array([self.delPf(xv) for xv in X], dtype=float)
+
+    def deldelPf_v(self, X):
+        """Network coefficient function Hessian for an array of points"""
+        return np.array([self.deldelPf(xv) for xv in X], dtype=float)
+
+    def Ytf_v(self, X, N):
+        """Trial function for an array of points"""
+        A = self.Af_v(X)
+        P = self.Pf_v(X)
+        Yt = A + P*N
+        return Yt
+
+    def delYtf_v(self, X, N, delN):
+        """Trial function gradient for an array of points"""
+        delA = self.delAf_v(X)
+        P = self.Pf_v(X)
+        delP = self.delPf_v(X)
+        delYt = delA + P[:, np.newaxis]*delN + delP*N[:, np.newaxis]
+        return delYt
+
+    def deldelYtf_v(self, X, N, delN, deldelN):
+        """Trial function Hessian for an array of points"""
+        deldelA = self.deldelAf_v(X)
+        P = self.Pf_v(X)
+        delP = self.delPf_v(X)
+        deldelP = self.deldelPf_v(X)
+        deldelYt = (deldelA + P[:, np.newaxis, np.newaxis]*deldelN +
+                    delP[:, :, np.newaxis]*delN[:, np.newaxis, :] +
+                    delP[:, np.newaxis, :]*delN[:, :, np.newaxis] +
+                    deldelP*N[:, np.newaxis, np.newaxis])
+        return deldelYt
+
 
 if __name__ == '__main__':
 
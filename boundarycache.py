@@ -0,0 +1,227 @@
+###############################################################################
+"""
+BoundaryCache - Class to memoize boundary condition function values at the
+face points of a set of points
+
+A boundary condition function for a face of the domain depends only on the
+coordinates along the axes which are free on that face. The BC for the
+face x=0 in a 2-D diffusion problem, f0f([0, y, t]), depends only on (y, t).
+On a tensor-product grid of nx*ny*nt points, f0f is therefore needed at
+only ny*nt distinct face points.
+
+A BoundaryCache finds the distinct face points among an array of points
+from the distinct coordinates along each axis, calls each BC function once
+for each face point it has not seen before, and broadcasts the values back
+onto the points. Values are saved by (function, face, coordinates), so they
+are reused by later calls with the same points, by calls for blocks of the
+same grid, and by calls for any other points which share face points. The
+number of saved values is limited to maxsize; when a call takes it over the
+limit, all saved values are discarded after the call.
+
+Example:
+    Compute the values of f0f at the face points x=0 of the points X.
+        cache = BoundaryCache(3)
+        index = cache.index(X)
+        g = cache.face_values(f0f, (0,), (0,), index)
+
+Attributes:
+    m - Number of independent variables
+    maxsize - Maximum number of saved values
+    size - Number of saved values
+    values - Dictionary of saved BC values, by (function, axes, faces),
+        each a dictionary of values by face point coordinates
+
+Methods:
+    index(X) - Find the distinct coordinates along each axis of the (n, m)
+        array of points X
+    face_values(f, S, bits, index) - Compute the values of BC function f at
+        the points moved onto the face with the axes in S at bits
+    clear() - Discard the saved values
+
+Notes:
+    Call clear() when the saved values will not be needed again, such as
+    when the training points change.
+
+Todo:
+
+"""
+
+
+import numpy as np
+
+
+# Default maximum number of saved BC values.
+DEFAULT_MAXSIZE = 100000
+
+
+class BoundaryCache():
+    """Memoized BC function values at face points."""
+
+
+    # Public methods
+
+    def __init__(self, m, maxsize=DEFAULT_MAXSIZE):
+        """Constructor"""
+        self.m = m
+        self.maxsize = maxsize
+        self.size = 0
+        self.values = {}
+
+    def index(self, X):
+        """Find the distinct coordinates along each axis of the points X.
+        The result is used for all face_values() calls for X."""
+        assert X.ndim == 2 and X.shape[1] == self.m
+        axes = [np.unique(c, return_inverse=True) for c in X.T]
+        coords = [a[0] for a in axes]
+        idx = [a[1].ravel() for a in axes]
+        return _GridIndex(coords, idx)
+
+    def face_values(self, f, S, bits, index):
+        """Compute the values of the BC function f at the indexed points
+        moved onto the face with the axes in S at bits. f is only called for
+        face points without a saved value. A single value is returned for a
+        corner."""
+        table = self.values.setdefault((f, S, bits), {})
+
+        # The BC value at a corner is the same for all points.
+        free = tuple(k for k in range(self.m) if k not in S)
+        if not free:
+            if () not in table:
+                table[()] = f(list(bits))
+                self.size += 1
+            return table[()]
+
+        # Look up or compute the BC value at each distinct face point.
+        (U, inv) = index.face_points(free)
+        xv = np.empty(self.m)
+        xv[list(S)] = bits
+        g = np.empty(len(U))
+        for (i, u) in enumerate(map(tuple, U)):
+            if u not in table:
+                xv[list(free)] = u
+                table[u] = f(list(xv))
+                self.size += 1
+            g[i] = table[u]
+
+        # Keep the number of saved values bounded.
+        if self.size > self.maxsize:
+            self.clear()
+        return g[inv]
+
+    def clear(self):
+        """Discard the saved values."""
+        self.values = {}
+        self.size = 0
+
+
+class _GridIndex():
+    """Distinct coordinates and face points for an array of points."""
+
+    def __init__(self, coords, idx):
+        self.coords = coords
+        self.idx = idx
+        self.faces = {}
+
+    def face_points(self, free):
+        """Return (U, inv), where U is the array of distinct face points
+        for the free axes, and U[inv] are the face points of each point."""
+        if free not in self.faces:
+
+            # Number each face point by its coordinate indices along the
+            # free axes, or compare the index rows if the numbers would
+            # overflow.
+            dims = [len(self.coords[k]) for k in free]
+            if np.prod(dims, dtype=float) < 2**62:
+                code = np.ravel_multi_index([self.idx[k] for k in free], dims)
+                (ucode, inv) = np.unique(code, return_inverse=True)
+                uidx = np.unravel_index(ucode, dims)
+            else:
+                (urows, inv) = np.unique(np.stack([self.idx[k] for k in free],
+                                                  axis=1),
+                                         axis=0, return_inverse=True)
+                uidx = urows.T
+            U = np.stack([self.coords[k][i] for (k, i) in zip(free, uidx)],
+                         axis=1)
+            self.faces[free] = (U, inv.ravel())
+        return self.faces[free]
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    from tensorgrid import TensorGrid
+
+    # 2-D diffusion BCs, counting their calls.
+    calls = {'f0': 0, 'g1': 0, 'Y0': 0}
+
+    def f0f(xyt):
+        calls['f0'] += 1
+        (x, y, t) = xyt
+        return y*t
+
+    def g1f(xyt):
+        calls['g1'] += 1
+        (x, y, t) = xyt
+        return x + t
+
+    def Y0f(xyt):
+        calls['Y0'] += 1
+        (x, y, t) = xyt
+        return x*y
+
+    (nx, ny, nt) = (7, 6, 5)
+    grid = TensorGrid([np.linspace(0, 1, nx), np.linspace(0, 1, ny),
+                       np.linspace(0, 1, nt)])
+    X = grid.points()
+    cache = BoundaryCache(3)
+    index = cache.index(X)
+
+    print("Testing face values.")
+    for (f, S, bits) in ((f0f, (0,), (0,)), (g1f, (1,), (1,)),
+                         (Y0f, (2,), (0,)), (Y0f, (0, 2), (1, 0))):
+        g = cache.face_values(f, S, bits, index)
+        Xf = X.copy()
+        Xf[:, list(S)] = bits
+        ref = [f(xv) for xv in Xf]
+        if not np.allclose(g, ref):
+            print("ERROR: Incorrect face values for %s!" % f.__name__)
+
+    print("Testing number of BC evaluations.")
+    for f in calls:
+        calls[f] = 0
+    cache.clear()
+    cache.face_values(f0f, (0,), (0,), index)
+    cache.face_values(g1f, (1,), (1,), index)
+    cache.face_values(Y0f, (2,), (0,), index)
+    if calls != {'f0': ny*nt, 'g1': nx*nt, 'Y0': nx*ny}:
+        print("ERROR: BC evaluation counts %s, vs ref %s!" %
+              (calls, {'f0': ny*nt, 'g1': nx*nt, 'Y0': nx*ny}))
+
+    print("Testing reuse of saved values for grid blocks.")
+    for (start, stop) in grid.blocks(17):
+        index = cache.index(grid.points(start, stop))
+        g = cache.face_values(Y0f, (2,), (0,), index)
+    if calls['Y0'] != nx*ny:
+        print("ERROR: BC recomputed for grid blocks!")
+
+    print("Testing corner values.")
+    g = cache.face_values(Y0f, (0, 1, 2), (1, 1, 0), index)
+    g = cache.face_values(Y0f, (0, 1, 2), (1, 1, 0), index)
+    if g != 1 or calls['Y0'] != nx*ny + 1:
+        print("ERROR: Incorrect corner value!")
+
+    print("Testing size limit.")
+    cache = BoundaryCache(3, maxsize=nx*ny + nx*nt)
+    index = cache.index(X)
+    cache.face_values(Y0f, (2,), (0,), index)
+    cache.face_values(g1f, (1,), (1,), index)
+    if cache.size != nx*ny + nx*nt:
+        print("ERROR: Incorrect number of saved values!")
+    g = cache.face_values(f0f, (0,), (0,), index)
+    if cache.size != 0 or cache.values:
+        print("ERROR: Saved values not discarded over the size limit!")
+    if not np.allclose(g, X[:, 1]*X[:, 2]):
+        print("ERROR: Incorrect face values over the size limit!")
@@ -26,6 +26,8 @@ Example:
 Notes:
     Variables that end in 'f' are usually functions or arrays of functions.
 
+    This is a DiffTrialFunction for 2 independent variables.
+
 Attributes:
     bcf - 2x2 array of BC functions at (x,t)=0|1
     delbcf - 2x2x2 array of BC gradient functions at (x,t)=0|1
@@ -55,6 +57,11 @@ Methods:
         components at [x, t] with network output N, network output gradient
         delN, and network output Laplacian components del2N
 
+    Af_v(X), delAf_v(X), del2Af_v(X), Pf_v(X), delPf_v(X), del2Pf_v(X),
+    Ytf_v(X, N), delYtf_v(X, N, delN), del2Ytf_v(X, N, delN, del2N) - Batched
+        versions of the above methods for an (n, m) array X of points, with
+        N (n,), delN (n, m) and del2N (n, m) arrays of network outputs
+
 Todo:
 
 """
@@ -62,8 +69,10 @@ Todo:
 
 import numpy as np
 
+from difftrialfunction import DiffTrialFunction
 
-class Diff1DTrialFunction():
+
+class Diff1DTrialFunction(DiffTrialFunction):
     """Trial function for 1D diffusion problems."""
 
 
@@ -71,98 +80,8 @@ class Diff1DTrialFunction():
 
     def __init__(self, bcf, delbcf, del2bcf):
         """Constructor"""
-        self.bcf = bcf
-        self.delbcf = delbcf
-        self.del2bcf = del2bcf
-
-    def Af(self, xt):
-        """Boundary condition function"""
-        (x, t) = xt
-        ((f0f, f1f), (Y0f, Y1f)) = self.bcf
-        A = (1 - x)*f0f([0, t]) + x*f1f([1, t]) + \
-            (1 - t)*(Y0f([x, 0]) - ((1 - x)*Y0f([0, 0]) + x*Y0f([1, 0])))
-        return A
-
-    def delAf(self, xt):
-        """Boundary condition function gradient"""
-        (x, t) = xt
-        ((f0f, f1f), (Y0f, Y1f)) = self.bcf
-        (((df0_dxf, df0_dtf), (df1_dxf, df1_dtf)),
-         ((dY0_dxf, dY0_dtf), (dY1_dxf, dY1_dtf))) = self.delbcf
-        dA_dx = -f0f([0, t]) + f1f([1, t]) - (-1 + t)* \
-                (Y0f([0, 0]) - Y0f([1, 0]) + dY0_dxf([x, 0]))
-        dA_dt =  Y0f([0, 0]) - x*Y0f([0, 0]) + x*Y0f([1, 0]) - Y0f([x, 0]) - \
-                 (-1 + x)*df0_dtf([0, t]) + x*df1_dtf([1, t])
-        delA = [dA_dx, dA_dt]
-        return delA
-
-    def del2Af(self, xt):
-        """Laplacian of boundary condition function"""
-        (x, t) = xt
-        ((f0f, f1f), (Y0f, Y1f)) = self.bcf
-        (((df0_dxf, df0_dtf), (df1_dxf, df1_dtf)),
-         ((dY0_dxf, dY0_dtf), (dY1_dxf, dY1_dtf))) = self.delbcf
-        (((d2f0_dx2f, d2f0_dt2f), (d2f1_dx2f, d2f1_dt2f)),
-         ((d2Y0_dx2f, d2Y0_dt2f), (d2Y1_dx2f, d2Y1_dt2f))) = self.del2bcf
-        d2A_dx2 = -(-1 + t)*d2Y0_dx2f([x, 0])
-        d2A_dt2 = -(-1 + x)*d2f0_dt2f([0, t]) + x*d2f1_dt2f([1, t])
-        del2A = [d2A_dx2, d2A_dt2]
-        return del2A
-
-    def Pf(self, xt):
-        """Network coefficient function"""
-        (x, t) = xt
-        P = x*(1 - x)*t
-        return P
-
-    def delPf(self, xt):
-        """Network coefficient function gradient"""
-        (x, t) = xt
-        dP_dx = (1 - 2*x)*t
-        dP_dt = x*(1 - x)
-        delP = [dP_dx, dP_dt]
-        return delP
-
-    def del2Pf(self, xt):
-        """Network coefficient function Laplacian"""
-        (x, t) = xt
-        d2P_dx2 = -2*t
-        d2P_dt2 = 0
-        del2P = [d2P_dx2, d2P_dt2]
-        return del2P
-
-    def Ytf(self, xt, N):
-        """Trial function"""
-        A = self.Af(xt)
-        P = self.Pf(xt)
-        Yt = A + P*N
-        return Yt
-
-    def delYtf(self, xt, N, delN):
-        """Trial function gradient"""
-        (x, t) = xt
-        (dN_dx, dN_dt) = delN
-        (dA_dx, dA_dt) = self.delAf(xt)
-        P = self.Pf(xt)
-        (dP_dx, dP_dt) = self.delPf(xt)
-        dYt_dx = dA_dx + P*dN_dx + dP_dx*N
-        dYt_dt = dA_dt + P*dN_dt + dP_dt*N
-        delYt = [dYt_dx, dYt_dt]
-        return delYt
-
-    def del2Ytf(self, xt, N, delN, del2N):
-        """Trial function Laplacian"""
-        (x, t) = xt
-        (dN_dx, dN_dt) = delN
-        (d2N_dx2, d2N_dt2) = del2N
-        (d2A_dx2, d2A_dt2) = self.del2Af(xt)
-        P = self.Pf(xt)
-        (dP_dx, dP_dt) = self.delPf(xt)
-        (d2P_dx2, d2P_dt2) = self.del2Pf(xt)
-        d2Yt_dx2 = d2A_dx2 + P*d2N_dx2 + 2*dP_dx*dN_dx + d2P_dx2*N
-        d2Yt_dt2 = d2A_dt2 + P*d2N_dt2 + 2*dP_dt*dN_dt + d2P_dt2*N
-        del2Yt = [d2Yt_dx2, d2Yt_dt2]
-        return del2Yt
+        super().__init__(bcf, delbcf, del2bcf)
+        assert self.m == 2
 
 #################
 
@@ -325,3 +244,30 @@ if __name__ == '__main__':
         if not np.isclose(del2Yt_t, del2Yt_ref[i]):
             print("ERROR: del2Yt[%d] = %s, vs ref %s" %
                   (i, del2Yt_t, del2Yt_ref[i]))
+
+    # Test the batched methods against the scalar methods at a set of
+    # points which includes the test point.
+    X_test = np.vstack((xt_test, np.linspace(0, 1, 5*len(xt_test)).reshape(5, -1)))
+    n = len(X_test)
+    N_v_test = np.full(n, N_test)
+    delN_v_test = np.tile(delN_test, (n, 1))
+    del2N_v_test = np.tile(del2N_test, (n, 1))
+    for (name, f, f_v, args, args_v) in (
+        ('A', tf.Af, tf.Af_v, (), ()),
+        ('delA', tf.delAf, tf.delAf_v, (), ()),
+        ('del2A', tf.del2Af, tf.del2Af_v, (), ()),
+        ('P', tf.Pf, tf.Pf_v, (), ()),
+        ('delP', tf.delPf, tf.delPf_v, (), ()),
+        ('del2P', tf.del2Pf, tf.del2Pf_v, (), ()),
+        ('Yt', tf.Ytf, tf.Ytf_v, (N_test,), (N_v_test,)),
+        ('delYt', tf.delYtf, tf.delYtf_v, (N_test, delN_test),
+         (N_v_test, delN_v_test)),
+        ('del2Yt', tf.del2Ytf, tf.del2Ytf_v,
+         (N_test, delN_test, del2N_test),
+         (N_v_test, delN_v_test, del2N_v_test))
+        ):
+        print("Testing batched %s." % name)
+        ref = np.array([f(xx, *args) for xx in X_test], dtype=float)
+        test = f_v(X_test, *args_v)
+        if test.shape != ref.shape or not np.allclose(test, ref):
+            print("ERROR: %s_v = %s, vs ref %s" % (name, test, ref))
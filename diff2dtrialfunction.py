@@ -26,6 +26,8 @@ Example:
 Notes:
     Variables that end in 'f' are usually functions or arrays of functions.
 
+    This is a DiffTrialFunction for 3 independent variables.
+
 Attributes:
     bcf - 3x2 array of BC functions at (x,y,t)=0|1
     delbcf - 3x2x3 array of BC gradient functions at (x,y,t)=0|1
@@ -58,6 +60,11 @@ Methods:
         components at [x, y, t] with network output N, network output gradient
         delN, and network output Laplacian components del2N
 
+    Af_v(X), delAf_v(X), del2Af_v(X), Pf_v(X), delPf_v(X), del2Pf_v(X),
+    Ytf_v(X, N), delYtf_v(X, N, delN), del2Ytf_v(X, N, delN, del2N) - Batched
+        versions of the above methods for an (n, m) array X of points, with
+        N (n,), delN (n, m) and del2N (n, m) arrays of network outputs
+
 Todo:
 
 """
@@ -65,8 +72,10 @@ Todo:
 
 import numpy as np
 
+from difftrialfunction import DiffTrialFunction
 
-class Diff2DTrialFunction():
+
+class Diff2DTrialFunction(DiffTrialFunction):
     """Trial function for 2D diffusion problems."""
 
 
@@ -74,146 +83,8 @@ class Diff2DTrialFunction():
 
     def __init__(self, bcf, delbcf, del2bcf):
         """Constructor"""
-        self.bcf = bcf
-        self.delbcf = delbcf
-        self.del2bcf = del2bcf
-
-    def Af(self, xyt):
-        """Boundary condition function"""
-        (x, y, t) = xyt
-        ((f0f, f1f), (g0f, g1f), (Y0f, Y1f)) = self.bcf
-        A = (1 - x)*f0f([0, y, t]) \
-          +      x *f1f([1, y, t]) \
-          + (1 - y)*(g0f([x, 0, t]) - ((1 - x)*g0f([0, 0, t]) +
-                     x*g0f([1, 0, t]))) \
-          +      y *(g1f([x, 1, t]) - ((1 - x)*g1f([0, 1, t]) +
-                     x*g1f([1, 1, t]))) \
-          + (1 - t)*(Y0f([x, y, 0]) - ((1 - x)*Y0f([0, y, 0]) + x*Y0f([1, y, 0])
-                                      + (1 - y)*(Y0f([x, 0, 0]) - ((1 - x)*Y0f([0, 0, 0]) + x*Y0f([1, 0, 0])))
-                                      +       y*(Y0f([x, 1, 0]) - ((1 - x)*Y0f([0, 1, 0]) + x*Y0f([1, 1, 0])))))
-        return A
-
-    def delAf(self, xyt):
-        """Gradient of boundary condition function"""
-        (x, y, t) = xyt
-        ((f0f, f1f), (g0f, g1f), (Y0f, Y1f)) = self.bcf
-        (((df0_dxf, df0_dyf, df0_dtf), (df1_dxf, df1_dyf, df1_dtf)),
-         ((dg0_dxf, dg0_dyf, dg0_dtf), (dg1_dxf, dg1_dyf, dg1_dtf)),
-         ((dY0_dxf, dY0_dyf, dY0_dtf), (dY1_dxf, dY1_dyf, dY1_dtf))
-         ) = self.delbcf
-
-        dA_dx = -f0f([0, y, t]) + f1f([1, y, t]) \
-            - (-1 + y)*(f0f([0, 0, t]) - f1f([1, 0, t]) + dg0_dxf([x, 0, t])) \
-            + y*(f0f([0, 1, t]) - f1f([1, 1, t]) + dg1_dxf([x, 1, t])) \
-            + (1 - t)*(f0f([0, y, 0]) - f1f([1, y, 0]) + (-1 + y)
-                       *(f0f([0, 0, 0]) - f1f([1, 0, 0]) + dg0_dxf([x, 0, 0]))
-                       - y*(f0f([0, 1, 0]) - f1f([1, 1, 0]) + dg1_dxf([x, 1, 0]))
-                       + dY0_dxf([x, y, 0]))
-
-        dA_dy = -(-1 + x)*f0f([0, 0, t]) + (-1 + x)*f0f([0, 1, t]) + x*f1f([1, 0, t]) - x*f1f([1, 1, t]) \
-                - g0f([x, 0, t]) + g1f([x, 1, t]) - (-1 + x)*df0_dyf([0, y, t]) + x*df1_dyf([1, y, t]) \
-                + (1 - t)*((-1 + x)*f0f([0, 0, 0]) + f0f([0, 1, 0])
-                           - x*(f0f([0, 1, 0]) + f1f([1, 0, 0]) - f1f([1, 1, 0]))
-                           + g0f([x, 0, 0]) - g1f([x, 1, 0])
-                           + (-1 + x)*df0_dyf([0, y, 0]) - x*df1_dyf([1, y, 0])
-                           + dY0_dyf([x, y, 0]))
-
-        dA_dt = -(-1 + x)*f0f([0, y, 0]) + x*f1f([1, y, 0]) \
-                - (-1 + y)*((-1 + x)*f0f([0, 0, 0]) - x*f1f([1, 0, 0]) + g0f([x, 0, 0])) \
-                + y*((-1 + x)*f0f([0, 1, 0]) - x*f1f([1, 1, 0]) + g1f([x, 1, 0])) \
-                - Y0f([x, y, 0]) - (-1 + x)*df0_dtf([0, y, t]) + x*df1_dtf([1, y, t]) \
-                + (1 - y)*((-1 + x)*df0_dtf([0, 0, t]) - x*df1_dtf([1, 0, t]) + dg0_dtf([x, 0, t])) \
-                + y*((-1 + x)*df0_dtf([0, 1, t]) - x*df1_dtf([1, 1, t]) + dg1_dtf([x, 1, t]))
-
-        delA = [dA_dx, dA_dy, dA_dt]
-        return delA
-
-    def del2Af(self, xyt):
-        (x, y, t) = xyt
-        ((f0f, f1f), (g0f, g1f), (Y0f, Y1f)) = self.bcf
-        (((df0_dxf, df0_dyf, df0_dtf), (df1_dxf, df1_dyf, df1_dtf)),
-         ((dg0_dxf, dg0_dyf, dg0_dtf), (dg1_dxf, dg1_dyf, dg1_dtf)),
-         ((dY0_dxf, dY0_dyf, dY0_dtf), (dY1_dxf, dY1_dyf, dY1_dtf))
-         ) = self.delbcf
-        (((d2f0_dx2f, d2f0_dy2f, d2f0_dt2f), (d2f1_dx2f, d2f1_dy2f, d2f1_dt2f)),
-         ((d2g0_dx2f, d2g0_dy2f, d2g0_dt2f), (d2g1_dx2f, d2g1_dy2f, d2g1_dt2f)),
-         ((d2Y0_dx2f, d2Y0_dy2f, d2Y0_dt2f), (d2Y1_dx2f, d2Y1_dy2f, d2Y1_dt2f))
-         ) = self.del2bcf
-
-        d2A_dx2 = -(-1 + y)*d2g0_dx2f([x, 0, t]) + y*d2g1_dx2f([x, 1, t]) \
-            - (-1 + t)*((-1 + y)*d2Y0_dx2f([x, 0, 0]) - y*d2Y0_dx2f([x, 1, 0])
-                        + d2Y0_dx2f([x, y, 0]))
-
-        d2A_dy2 = -(-1 + x)*d2f0_dy2f([0, y, t]) + x*d2f1_dy2f([1, y, t]) \
-            - (-1 + t)*((-1 + x)*d2Y0_dy2f([0, y, 0]) - x*d2Y0_dy2f([1, y, 0])
-                        + d2Y0_dy2f([x, y, 0]))
-        d2A_dt2 = -(-1 + x)*d2f0_dt2f([0, y, t]) + x*d2f1_dt2f([1, y, t]) \
-            + (1 - y)*((-1 + x)*d2g0_dt2f([0, 0, t]) - x*d2g0_dt2f([1, 0, t])
-                       + d2g0_dt2f([x, 0, t])) \
-            + y*((-1 + x)*d2g1_dt2f([0, 1, t]) - x*d2g1_dt2f([1, 1, t])
-                 + d2g1_dt2f([x, 1, t]))
-
-        del2A = [d2A_dx2, d2A_dy2, d2A_dt2]
-        return del2A
-
-    def Pf(self, xyt):
-        """Network coefficient function for 2D diffusion problems"""
-        (x, y, t) = xyt
-        P = x*(1 - x)*y*(1 - y)*t
-        return P
-
-    def delPf(self, xyt):
-        """Network coefficient function gradient"""
-        (x, y, t) = xyt
-        dP_dx = (1 - 2*x)*y*(1 - y)*t
-        dP_dy = x*(1 - x)*(1 - 2*y)*t
-        dP_dt = x*(1 - x)*y*(1 - y)
-        delP = [dP_dx, dP_dy, dP_dt]
-        return delP
-
-    def del2Pf(self, xyt):
-        """Network coefficient function Laplacian"""
-        (x, y, t) = xyt
-        d2P_dx2 = -2*y*(1 - y)*t
-        d2P_dy2 = -2*x*(1 - x)*t
-        d2P_dt2 = 0
-        del2P = [d2P_dx2, d2P_dy2, d2P_dt2]
-        return del2P
-
-    def Ytf(self, xyt, N):
-        """Trial function"""
-        A = self.Af(xyt)
-        P = self.Pf(xyt)
-        Yt = A + P*N
-        return Yt
-
-    def delYtf(self, xyt, N, delN):
-        """Trial function gradient"""
-        (x, y, t) = xyt
-        (dN_dx, dN_dy, dN_dt) = delN
-        (dA_dx, dA_dy, dA_dt) = self.delAf(xyt)
-        P = self.Pf(xyt)
-        (dP_dx, dP_dy, dP_dt) = self.delPf(xyt)
-        dYt_dx = dA_dx + P*dN_dx + dP_dx*N
-        dYt_dy = dA_dy + P*dN_dy + dP_dy*N
-        dYt_dt = dA_dt + P*dN_dt + dP_dt*N
-        delYt = [dYt_dx, dYt_dy, dYt_dt]
-        return delYt
-
-    def del2Ytf(self, xyt, N, delN, del2N):
-        """Trial function Laplacian"""
-        (x, y, t) = xyt
-        (dN_dx, dN_dy, dN_dt) = delN
-        (d2N_dx2, d2N_dy2, d2N_dt2) = del2N
-        (d2A_dx2, d2A_dy2, d2A_dt2) = self.del2Af(xyt)
-        P = self.Pf(xyt)
-        (dP_dx, dP_dy, dP_dt) = self.delPf(xyt)
-        (d2P_dx2, d2P_dy2, d2P_dt2) = self.del2Pf(xyt)
-        d2Yt_dx2 = d2A_dx2 + P*d2N_dx2 + 2*dP_dx*dN_dx + d2P_dx2*N
-        d2Yt_dy2 = d2A_dy2 + P*d2N_dy2 + 2*dP_dy*dN_dy + d2P_dy2*N
-        d2Yt_dt2 = d2A_dt2 + P*d2N_dt2 + 2*dP_dt*dN_dt + d2P_dt2*N
-        del2Yt = [d2Yt_dx2, d2Yt_dy2, d2Yt_dt2]
-        return del2Yt
+        super().__init__(bcf, delbcf, del2bcf)
+        assert self.m == 3
 
 #################
 
@@ -296,7 +167,7 @@ if __name__ == '__main__':
     A_ref = 0.264855
     delA_ref = [0.270355, 0.241738, -0.456647]
     del2A_ref = [-2.61402, -2.61402, 0]
-    P_ref = 0.243835
+    P_ref = 0.0243835
     delP_ref = [0.0203196, 0.018144, 0.058056]
     del2P_ref = [-0.203196, -0.2016, 0]
     Yt_ref = 0.277047
@@ -398,3 +269,30 @@ if __name__ == '__main__':
     for (i, del2Yt_t) in enumerate(del2Yt_test):
         if not np.isclose(del2Yt_t, del2Yt_ref[i]):
             print("ERROR: del2Yt[%d] = %s, vs ref %s" % (i, del2Yt_t, del2Yt_ref[i]))
+
+    # Test the batched methods against the scalar methods at a set of
+    # points which includes the test point.
+    X_test = np.vstack((xyt_test, np.linspace(0, 1, 5*len(xyt_test)).reshape(5, -1)))
+    n = len(X_test)
+    N_v_test = np.full(n, N_test)
+    delN_v_test = np.tile(delN_test, (n, 1))
+    del2N_v_test = np.tile(del2N_test, (n, 1))
+    for (name, f, f_v, args, args_v) in (
+        ('A', tf.Af, tf.Af_v, (), ()),
+        ('delA', tf.delAf, tf.delAf_v, (), ()),
+        ('del2A', tf.del2Af, tf.del2Af_v, (), ()),
+        ('P', tf.Pf, tf.Pf_v, (), ()),
+        ('delP', tf.delPf, tf.delPf_v, (), ()),
+        ('del2P', tf.del2Pf, tf.del2Pf_v, (), ()),
+        ('Yt', tf.Ytf, tf.Ytf_v, (N_test,), (N_v_test,)),
+        ('delYt', tf.delYtf, tf.delYtf_v, (N_test, delN_test),
+         (N_v_test, delN_v_test)),
+        ('del2Yt', tf.del2Ytf, tf.del2Ytf_v,
+         (N_test, delN_test, del2N_test),
+         (N_v_test, delN_v_test, del2N_v_test))
+        ):
+        print("Testing batched %s." % name)
+        ref = np.array([f(xx, *args) for xx in X_test], dtype=float)
+        test = f_v(X_test, *args_v)
+        if test.shape != ref.shape or not np.allclose(test, ref):
+            print("ERROR: %s_v = %s, vs ref %s" % (name, test, ref))
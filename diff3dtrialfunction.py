@@ -26,6 +26,8 @@ Example:
 Notes:
     Variables that end in 'f' are usually functions or arrays of functions.
 
+    This is a DiffTrialFunction for 4 independent variables.
+
 Attributes:
     bcf - 4x2 array of BC functions at (x,y,z,t)=0|1
     delbcf - 4x2x4 array of BC gradient functions at (x,y,z,t)=0|1
@@ -58,6 +60,11 @@ Methods:
         components at [x, y, z, t] with network output N, network output gradient
         delN, and network output Laplacian components del2N
 
+    Af_v(X), delAf_v(X), del2Af_v(X), Pf_v(X), delPf_v(X), del2Pf_v(X),
+    Ytf_v(X, N), delYtf_v(X, N, delN), del2Ytf_v(X, N, delN, del2N) - Batched
+        versions of the above methods for an (n, m) array X of points, with
+        N (n,), delN (n, m) and del2N (n, m) arrays of network outputs
+
 Todo:
 
 """
@@ -65,8 +72,10 @@ Todo:
 
 import numpy as np
 
+from difftrialfunction import DiffTrialFunction
 
-class Diff3DTrialFunction():
+
+class Diff3DTrialFunction(DiffTrialFunction):
     """Trial function for 3D diffusion problems."""
 
 
@@ -74,248 +83,8 @@ class Diff3DTrialFunction():
 
     def __init__(self, bcf, delbcf, del2bcf):
         """Constructor"""
-        self.bcf = bcf
-        self.delbcf = delbcf
-        self.del2bcf = del2bcf
-
-    def Af(self, xyzt):
-        """Boundary condition function"""
-        (x, y, z, t) = xyzt
-        ((f0f, f1f), (g0f, g1f), (h0f, h1f), (Y0f, Y1f)) = self.bcf
-        A = (1 - x)*f0f([0, y, z, t]) + x*f1f([1, y, z, t]) \
-            + (1 - y)*(g0f([x, 0, z, t]) - ((1 - x)*g0f([0, 0, z, t])
-                       + x*g0f([1, 0, z, t]))) \
-            + y*(g1f([x, 1, z, t]) - ((1 - x)*g1f([0, 1, z, t])
-                 + x*g1f([1, 1, z, t]))) \
-            + (1 - z)*(h0f([x, y, 0, t]) - ((1 - x)*h0f([0, y, 0, t]) + x*h0f([1, y, 0, t])
-                                            + y*(h0f([x, 1, 0, t]) - ((1 - x)*h0f([0, 1, 0, t]) + x*h0f([1, 1, 0, t]))))) \
-            + z*(h1f([x, y, 1, t]) -
-                 ((1 - x)*h1f([0, y, 1, t]) + x*h1f([1, y, 1, t])
-                  + (1 - y)*(h1f([x, 0, 1, t]) - ((1 - x)*h1f([0, 0, 1, t]) + x*h1f([1, 0, 1, t])))
-                  + y*(h1f([x, 1, 1, t]) - ((1 - x)*h1f([0, 1, 1, t]) + x*h1f([1, 1, 1, t]))))) \
-            + (1-t)* \
-               (Y0f([x, y, z, 0]) -
-                ((1 - x)*Y0f([0, y, z, 0]) + x*Y0f([1, y, z, 0]) +
-                 (1 - y)*(Y0f([x, 0, z, 0]) - ((1 - x)*Y0f([0, 0, z, 0]) + x*Y0f([1, 0, z, 0]))) +
-                 y*(Y0f([z, 1, z, 0]) - ((1 - x)*Y0f([0, 1, z, 0]) + x*Y0f([1, 1, z, 0]))) +
-                 (1 - z)*
-                 (Y0f([x, y, 0, 0]) - ((1 - x)*Y0f([0, y, 0, 0]) + x*Y0f([1, y, 0, 0]) +
-                                       (1 - y)*(Y0f([x, 0, 0, 0]) - ((1 - x)*Y0f([0, 0, 0, 0]) + x*Y0f([1, 0, 0, 0]))) +
-                                       y*(Y0f([x, 1, 0, 0]) - ((1 - x)*Y0f([0, 1, 0, 0]) + x*Y0f([1, 1, 0, 0]))))) +
-                 z*(Y0f([x, y, 1, 0]) - ((1 - x)*Y0f([0, y, 1, 0]) + x*Y0f([1, y, 1, 0]) +
-                                         (1 - y)*(Y0f([x, 0, 1, 0]) - ((1 - x)*Y0f([0, 0, 1, 0]) + x*Y0f([1, 0, 1, 0]))) +
-                                         y*(Y0f([x, 1, 1, 0]) - ((1 - x)*Y0f([0, 1, 1, 0]) + x*Y0f([1, 1, 1, 0])))))))
-        return A
-
-    def delAf(self, xyzt):
-        """Gradient of boundary condition function"""
-        (x, y, z, t) = xyzt
-        ((f0f, f1f), (g0f, g1f), (h0f, h1f), (Y0f, Y1f)) = self.bcf
-        (((df0_dxf, df0_dyf, df0_dzf, df0_dtf), (df1_dxf, df1_dyf, df1_dzf, df1_dtf)),
-         ((dg0_dxf, dg0_dyf, dg0_dzf, dg0_dtf), (dg1_dxf, dg1_dyf, dg1_dzf, dg1_dtf)),
-         ((dh0_dxf, dh0_dyf, dh0_dzf, dh0_dtf), (dh1_dxf, dh1_dyf, dh1_dzf, dh1_dtf)),
-         ((dY0_dxf, dY0_dyf, dY0_dzf, dY0_dtf), (dY1_dxf, dY1_dyf, dY1_dzf, dY1_dtf))
-         ) = self.delbcf
-
-        dA_dx = -f0f([0, y, z, t]) + f1f([1, y, z, t]) + \
-            (1 - y)*(f0f([0, 0, z, t]) - f1f([1, 0, z, t]) + dg0_dxf([x, 0, z, t])) + \
-            y*(f0f([0, 1, z, t]) - f1f([1, 1, z, t]) + dg1_dxf([x, 1, z, t])) + \
-            (1 - z)*(f0f([0, y, 0, t]) - f1f([1, y, 0, t]) -
-                     (1 - y)*(h0f([0, 0, 0, t]) - h0f([1, 0, 0, t]) + dg0_dxf([x, 0, 0, t])) -
-                     y*(h0f([0, 1, 0, t]) - h0f([1, 1, 0, t]) + dg1_dxf([x, 1, 0, t])) + dh0_dxf([x, y, 0, t])) + \
-            z*(f0f([0, y, 1, t]) - f1f([1, y, 1, t]) -
-               (1 - y)*(h1f([0, 0, 1, t]) - h1f([1, 0, 1, t]) + dg0_dxf([x, 0, 1, t])) -
-               y*(h1f([0, 1, 1, t]) - h1f([1, 1, 1, t]) + dg1_dxf([x, 1, 1, t])) + dh1_dxf([x, y, 1, t])) + \
-            (1 - t)*(f0f([0, y, z, 0]) - f1f([1, y, z, 0]) -
-                     (1 - y)*(f0f([0, 0, z, 0]) - f1f([1, 0, z, 0]) + dg0_dxf([x, 0, z, 0])) -
-                     y*(f0f([0, 1, z, 0]) - f1f([1, 1, z, 0]) + dg1_dxf([x, 1, z, 0])) -
-                     (1 - z)*(f0f([0, y, 0, 0]) - f1f([1, y, 0, 0]) -
-                              (1 - y)*(f0f([0, 0, 0, 0]) - f1f([1, 0, 0, 0]) + dg0_dxf([x, 0, 0, 0])) -
-                              + y*(f0f([0, 1, 0, 0]) - f1f([1, 1, 0, 0]) + dg1_dxf([x, 1, 0, 0])) + dh0_dxf([x, y, 0, 0])) -
-                     z*(f0f([0, y, 1, 0]) - f1f([1, y, 1, 0]) -
-                        (1 - y)*(f0f([0, 0, 1, 0]) - f1f([1, 0, 1, 0]) + dg0_dxf([x, 0, 1, 0])) -
-                        y*(f0f([0, 1, 1, 0]) - f1f([1, 1, 1, 0]) + dg1_dxf([x, 1, 1, 0])) +
-                        dh1_dxf([x, y, 1, 0])) + dY0_dxf([x, y, z, 0]))
-        dA_dy = (1 - x)*f0f([0, 0, z, t]) \
-                - (1 - x)*f0f([0, 1, z, t]) \
-                + x*f1f([1, 0, z, t]) - x*f1f([1, 1, z, t]) - g0f([x, 0, z, t]) + g1f([x, 1, z, t]) + \
-                (1 - x)*df0_dyf([0, y, z, t]) + x*df1_dyf([1, y, z, t]) + \
-                (1 - z)*(g0f([x, 0, 0, t]) - g1f([x, 1, 0, t]) - (1 - x)*h0f([0, 0, 0, t]) +
-                         (1 - x)*h0f([0, 1, 0, t]) - x*h0f([1, 0, 0, t]) + x*h0f([1, 1, 0, t]) -
-                         (1 - x)*df0_dyf([0, y, 0, t]) - x*df1_dyf([1, y, 0, t]) + dh0_dyf([x, y, 0, t])) + \
-                z*(g0f([x, 0, 1, t]) - g1f([x, 1, 1, t]) - (1 - x)*h1f([0, 0, 1, t]) +
-                   (1 - x)*h1f([0, 1, 1, t]) - x*h1f([1, 0, 1, t]) + x*h1f([1, 1, 1, t]) -
-                   (1 - x)*df0_dyf([0, y, 1, t]) - x*df1_dyf([1, y, 1, t]) + dh1_dyf([x, y, 1, t])) + \
-                (1 - t)*(-(1 - x)*f0f([0, 0, z, 0]) + (1 - x)*f0f([0, 1, z, 0]) -
-                         x*f1f([1, 0, z, 0]) + x*f1f([1, 1, z, 0]) + g0f([x, 0, z, 0]) - g1f([x, 1, z, 0]) -
-                         (1 - x)*df0_dyf([0, y, z, 0]) - x*df1_dyf([1, y, z, 0]) -
-                         (1 - z)*(-(1 - x)*f0f([0, 0, 0, 0]) + (1 - x)*f0f([0, 1, 0, 0]) - x*f1f([1, 0, 0, 0]) +
-                                  x*f1f([1, 1, 0, 0]) + g0f([x, 0, 0, 0]) - g1f([x, 1, 0, 0]) - (1 - x)*df0_dyf([0, y, 0, 0]) -
-                                  x*df1_dyf([1, y, 0, 0]) + dh0_dyf([x, y, 0, 0])) -
-                         z*(-(1 - x)*f0f([0, 0, 1, 0]) + (1 - x)*f0f([0, 1, 1, 0]) - x*f1f([1, 0, 1, 0]) +
-                            x*f1f([1, 1, 1, 0]) + g0f([x, 0, 1, 0]) - g1f([x, 1, 1, 0]) -
-                            (1 - x)*df0_dyf([0, y, 1, 0]) - x*df1_dyf([1, y, 1, 0]) +
-                            dh1_dyf([x, y, 1, 0])) + dY0_dyf([x, y, z, 0]))
-        dA_dz = (1 - x)*f0f([0, y, 0, t]) - \
-                (1 - x)*f0f([0, y, 1, t]) + \
-                x*f1f([1, y, 0, t]) - x*f1f([1, y, 12, t]) + \
-                (1 - y)*(g0f([x, 0, 0, t]) - (1 - x)*h0f([0, 0, 0, t]) - x*h0f([1, 0, 0, t])) + \
-                y*(g1f([x, 1, 0, t]) - (1 - x)*h0f([0, 1, 0, t]) - x*h0f([1, 1, 0, t])) - h0f([x, y, 0, t]) - \
-                (1 - y)*(g0f([x, 0, 1, t]) - (1 - x)*h1f([0, 0, 1, t]) - x*h1f([1, 0, 1, t])) - \
-                y*(g1f([x, 1, 1, t]) - (1 - x)*h1f([0, 1, 1, t]) - x*h1f([1, 1, 1, t])) + \
-                h1f([x, y, 1, t]) + (1 - x)*df0_dzf([0, y, z, t]) + x*df1_dzf([1, y, z, t]) + \
-                (1 - y)*(-(1 - x)*df0_dzf([0, 0, z, t]) - x*df1_dzf([1, 0, z, t]) + dg0_dzf([x, 0, z, t])) + \
-                y*(-(1 - x)*df0_dzf([0, 1, z, t]) - x*df1_dzf([1, 1, z, t]) + dg1_dzf([x, 1, z, t])) + \
-                (1 - t)*(-(1 - x)*f0f([0, y, 0, 0]) + (1 - x)*f0f([0, y, 1, 0]) - x*f1f([1, y, 0, 0]) + x*f1f([1, y, 1, 0]) - \
-                         (1 - y)*(-(1 - x)*f0f([0, 0, 0, 0]) - x*f1f([1, 0, 0, 0]) + g0f([x, 0, 0, 0])) +
-                         (1 - y)*(-(1 - x)*f0f([0, 0, 1, 0]) - x*f1f([1, 0, 1, 0]) + g0f([x, 0, 1, 0])) -
-                         y*(-(1 - x)*f0f([0, 1, 0, 0]) - x*f1f([1, 1, 0, 0]) + g1f([x, 1, 0, 0])) +
-                         y*(-(1 - x)*f0f([0, 1, 1, 0]) - x*f1f([1, 1, 1, 0]) + g1f([x, 1, 1, 0])) +
-                         h0f([x, y, 0, 0]) - h1f([x, y, 1, 0]) - (1 - x)*df0_dzf([0, y, z, 0]) - x*df1_dzf([1, y, z, 0]) -
-                         (1 - y)*(-(1 - x)*df0_dzf([0, 0, z, 0]) - x*df1_dzf([1, 0, z, 0]) + dg0_dzf([x, 0, z, 0])) -
-                         y*(-(1 - x)*df0_dzf([0, 1, z, 0]) - x*df1_dzf([1, 1, z, 0]) + dg1_dzf([x, 1, z, 0])) +
-                         dY0_dzf([x, y, z, 0]))
-        dA_dt = (1 - x)*f0f([0, y, z, 0]) + \
-                x*f1f([1, y, z, 0]) + \
-                (1 - y)*(-(1 - x)*f0f([0, 0, z, 0]) - x*f1f([1, 0, z, 0]) + g0f([x, 0, z, 0])) + \
-                y*(-(1 - x)*f0f([0, 1, z, 0]) - x*f1f([1, 1, z, 0]) + g1f([x, 1, z, 0])) + \
-                (1 - z)*(-(1 - x)*f0f([0, y, 0, 0]) - x*f1f([1, y, 0, 0]) -
-                         (1 - y)*(-(1 - x)*f0f([0, 0, 0, 0]) - x*f1f([1, 0, 0, 0]) + g0f([x, 0, 0, 0])) -
-                         y*(-(1 - x)*f0f([0, 1, 0, 0]) - x*f1f([1, 1, 0, 0]) + g1f([x, 1, 0, 0])) + h0f([x, y, 0, 0])) + \
-                z*(-(1 - x)*f0f([0, y, 1, 0]) - x*f1f([1, y, 1, 0]) -
-                   (1 - y)*(-(1 - x)*f0f([0, 0, 1, 0]) - x*f1f([1, 0, 1, 0]) + g0f([x, 0, 1, 0])) -
-                   y*(-(1 - x)*f0f([0, 1, 1, 0]) - x*f1f([1, 1, 1, 0]) + g1f([x, 1, 1, 0])) +
-                   h1f([x, y, 1, 0])) - \
-                Y0f([x, y, z, 0]) + \
-                (1 - x)*df0_dtf([0, y, z, t]) + x*df1_dtf([1, y, z, t]) + \
-                (1 - y)*(-(1 - x)*df0_dtf([0, 0, z, t]) - x*df1_dtf([1, 0, z, t]) + dg0_dtf([x, 0, z, t])) + \
-                y*(-(1 - x)*df0_dtf([0, 1, z, t]) - x*df1_dtf([1, 1, z, t]) + dg1_dtf([x, 1, z, t])) + \
-                (1 - z)*(-(1 - x)*df0_dtf([0, y, 0, t]) - x*df1_dtf([1, y, 0, t]) -
-                         (1 - y)*(dg0_dtf([x, 0, 0, t]) - (1 - x)*dh0_dtf([0, 0, 0, t]) - x*dh0_dtf([1, 0, 0, t])) -
-                         y*(dg1_dtf([x, 1, 0, t]) - (1 - x)*dh0_dtf([0, 1, 0, t]) - x*dh0_dtf([1, 1, 0, t])) +
-                         dh0_dtf([x, y, 0, t])) + \
-                z*(-(1 - x)*df0_dtf([0, y, 1, t]) - x*df1_dtf([1, y, 1, t]) -
-                   (1 - y)*(dg0_dtf([x, 0, 1, t]) - (1 - x)*dh1_dtf([0, 0, 1, t]) - x*dh1_dtf([1, 0, 1, t])) -
-                   y*(dg1_dtf([x, 1, 1, t]) - (1 - x)*dh1_dtf([0, 1, 1, t]) - x*dh1_dtf([1, 1, 1, t])) + \
-                   dh1_dtf([x, y, 1, t]))
-        delA = [dA_dx, dA_dy, dA_dz, dA_dt]
-        return delA
-
-    def del2Af(self, xyzt):
-        (x, y, z, t) = xyzt
-        ((f0f, f1f), (g0f, g1f), (h0f, h1f), (Y0f, Y1f)) = self.bcf
-        (((df0_dxf, df0_dyf, df0_dzf, df0_dtf), (df1_dxf, df1_dyf, df1_dzf, df1_dtf)),
-         ((dg0_dxf, dg0_dyf, dg0_dzf, dg0_dtf), (dg1_dxf, dg1_dyf, dg1_dzf, dg1_dtf)),
-         ((dh0_dxf, dh0_dyf, dh0_dzf, dh0_dtf), (dh1_dxf, dh1_dyf, dh1_dzf, dh1_dtf)),
-         ((dY0_dxf, dY0_dyf, dY0_dzf, dY0_dtf), (dY1_dxf, dY1_dyf, dY1_dzf, dY1_dtf))
-         ) = self.delbcf
-        (((d2f0_dx2f, d2f0_dy2f, d2f0_dz2f, d2f0_dt2f), (d2f1_dx2f, d2f1_dy2f, d2f1_dz2f, d2f1_dt2f)),
-         ((d2g0_dx2f, d2g0_dy2f, d2g0_dz2f, d2g0_dt2f), (d2g1_dx2f, d2g1_dy2f, d2g1_dz2f, d2g1_dt2f)),
-         ((d2h0_dx2f, d2h0_dy2f, d2h0_dz2f, d2h0_dt2f), (d2h1_dx2f, d2h1_dy2f, d2h1_dz2f, d2h1_dt2f)),
-         ((d2Y0_dx2f, d2Y0_dy2f, d2Y0_dz2f, d2Y0_dt2f), (d2Y1_dx2f, d2Y1_dy2f, d2Y1_dz2f, d2Y1_dt2f))
-         ) = self.del2bcf
-
-        d2A_dx2 = (1 - y)*d2g0_dx2f([x, 0, z, t]) + \
-                  y*d2g1_dx2f([x, 1, z, t]) + \
-                  (1 - z)*(-(1 - y)*d2g0_dx2f([x, 0, 0, t]) - y*d2g1_dx2f([x, 1, 0, t]) + d2h0_dx2f([x, y, 0, t])) + \
-                  z*(-(1 - y)*d2g0_dx2f([x, 0, 1, t]) - y*d2g1_dx2f([x, 1, 1, t]) + d2h1_dx2f([x, y, 1, t])) + \
-                  (1 - t)*(-(1 - y)*d2g0_dx2f([x, 0, z, 0]) - y*d2g1_dx2f([x, 1, z, 0]) -
-                           (1 - z)*(-(1 - y)*d2g0_dx2f([x, 0, 0, 0]) - y*d2g1_dx2f([x, 1, 0, 0]) + d2h0_dx2f([x, y, 0, 0])) -
-                           z*(-(1 - y)*d2g0_dx2f([x, 0, 1, 0]) - y*d2g1_dx2f([x, 1, 1, 0]) + d2h1_dx2f([x, y, 1, 0])) +
-                           d2Y0_dx2f([x, y, z, 0]))
-        d2A_dy2 = (1 - x)*d2f0_dy2f([0, y, z, t]) + \
-                  x*d2f1_dy2f([1, y, z, t]) + \
-                  (1 - z)*(-(1 - x)*d2f0_dy2f([0, y, 0, t]) - x*d2f1_dy2f([1, y, 0, t]) + d2h0_dy2f([x, y, 0, t])) + \
-                  z*(-(1 - x)*d2f0_dy2f([0, y, 1, t]) - x*d2f1_dy2f([1, y, 1, t]) + d2h1_dy2f([x, y, 1, t])) + \
-                  (1 - t)*(-(1 - x)*d2f0_dy2f([0, y, z, 0]) - x*d2f1_dy2f([1, y, z, 0]) -
-                           (1 - z)*(-(1 - x)*d2f0_dy2f([0, y, 0, 0]) - x*d2f1_dy2f([1, y, 0, 0]) + d2h0_dy2f([x, y, 0, 0])) -
-                           z*(-(1 - x)*d2f0_dy2f([0, y, 1, 0]) - x*d2f1_dy2f([1, y, 1, 0]) + d2h1_dy2f([x, y, 1, 0])) +
-                           d2Y0_dy2f([x, y, z, 0]))
-        d2A_dz2 = (1 - x)*d2f0_dz2f([0, y, z, t]) + \
-                  x*d2f1_dz2f([1, y, z, t]) + \
-                  (1 - y)*(-(1 - x)*d2f0_dz2f([0, 0, z, t]) - x*d2f1_dz2f([1, 0, z, t]) + d2g0_dz2f([x, 0, z, t])) + \
-                  y*(-(1 - x)*d2f0_dz2f([0, 1, z, t]) - x*d2f1_dz2f([1, 1, z, t]) + d2g1_dz2f([x, 1, z, t])) + \
-                  (1 - t)*(-(1 - x)*d2f0_dz2f([0, y, z, 0]) - x*d2f1_dz2f([1, y, z, 0]) -
-                           (1 - y)*(-(1 - x)*d2f0_dz2f([0, 0, z, 0]) - x*d2f1_dz2f([1, 0, z, 0]) + d2g0_dz2f([x, 0, z, 0])) -
-                           y*(-(1 - x)*d2f0_dz2f([0, 1, z, 0]) - x*d2f1_dz2f([1, 1, z, 0]) + d2g1_dz2f([x, 1, z, 0])) +
-                           d2Y0_dz2f([x, y, z, 0]))
-        d2A_dt2 = (1 - x)*d2f0_dt2f([0, y, z, t]) + \
-                  x*d2f1_dt2f([1, y, z, t]) + \
-                  (1 - y)*(-(1 - x)*d2f0_dt2f([0, 0, z, t]) - x*d2f1_dt2f([1, 0, z, t]) + d2g0_dt2f([x, 0, z, t])) + \
-                  y*(-(1 - x)*d2f0_dt2f([0, 1, z, t]) - x*d2f1_dt2f([1, 1, z, t]) + d2g1_dt2f([x, 1, z, t])) + \
-                  (1 - z)*(-(1 - x)*d2f0_dt2f([0, y, 0, t]) - x*d2f1_dt2f([1, y, 0, t]) -
-                           (1 - y)*(d2g0_dt2f([x, 0, 0, t]) - (1 - x)*d2h0_dt2f([0, 0, 0, t]) - x*d2h0_dt2f([1, 0, 0, t])) -
-                           y*(d2g1_dt2f([x, 1, 0, t]) - (1 - x)*d2h0_dt2f([0, 1, 0, t]) - x*d2h0_dt2f([1, 1, 0, t])) + d2h0_dt2f([x, y, 0, t])) + \
-                  z*(-(1 - x)*d2f0_dt2f([0, y, 1, t]) - x*d2f1_dt2f([1, y, 1, t]) -
-                     (1 - y)*(d2g0_dt2f([x, 0, 1, t]) - (1 - x)*d2h1_dt2f([0, 0, 1, t]) - x*d2h1_dt2f([1, 0, 1, t])) -
-                     y*(d2g1_dt2f([x, 1, 1, t]) - (1 - x)*d2h1_dt2f([0, 1, 1, t]) - x*d2h1_dt2f([1, 1, 1, t])) +
-                     d2h1_dt2f([x, y, 1, t]))
-
-        del2A = [d2A_dx2, d2A_dy2, d2A_dz2, d2A_dt2]
-        return del2A
-
-    def Pf(self, xyzt):
-        """Network coefficient function for 3D diffusion problems"""
-        (x, y, z, t) = xyzt
-        P = x*(1 - x)*y*(1 - y)*z*(1 - z)*t
-        return P
-
-    def delPf(self, xyzt):
-        """Network coefficient function gradient"""
-        (x, y, z, t) = xyzt
-        dP_dx = (1 - 2*x)*y*(1 - y)*z*(1 - z)*t
-        dP_dy = x*(1 - x)*(1 - 2*y)*z*(1 - z)*t
-        dP_dz = x*(1 - x)*y*(1 - y)*(1 - 2*z)*t
-        dP_dt = x*(1 - x)*y*(1 - y)*z*(1 - z)
-        delP = [dP_dx, dP_dy, dP_dz, dP_dt]
-        return delP
-
-    def del2Pf(self, xyzt):
-        """Network coefficient function Laplacian"""
-        (x, y, z, t) = xyzt
-        d2P_dx2 = -2*y*(1 - y)*z*(1 - z)*t
-        d2P_dy2 = -2*x*(1 - x)*z*(1 - z)*t
-        d2P_dz2 = -2*x*(1 - x)*y*(1 - y)*t
-        d2P_dt2 = 0
-        del2P = [d2P_dx2, d2P_dy2, d2P_dz2, d2P_dt2]
-        return del2P
-
-    def Ytf(self, xyzt, N):
-        """Trial function"""
-        A = self.Af(xyzt)
-        P = self.Pf(xyzt)
-        Yt = A + P*N
-        return Yt
-
-    def delYtf(self, xyzt, N, delN):
-        """Trial function gradient"""
-        (x, y, z, t) = xyzt
-        (dN_dx, dN_dy, dN_dz, dN_dt) = delN
-        (dA_dx, dA_dy, dA_dz, dA_dt) = self.delAf(xyzt)
-        P = self.Pf(xyzt)
-        (dP_dx, dP_dy, dP_dz, dP_dt) = self.delPf(xyzt)
-        dYt_dx = dA_dx + P*dN_dx + dP_dx*N
-        dYt_dy = dA_dy + P*dN_dy + dP_dy*N
-        dYt_dz = dA_dz + P*dN_dz + dP_dz*N
-        dYt_dt = dA_dt + P*dN_dt + dP_dt*N
-        delYt = [dYt_dx, dYt_dy, dYt_dz, dYt_dt]
-        return delYt
-
-    def del2Ytf(self, xyzt, N, delN, del2N):
-        """Trial function Laplacian"""
-        (x, y, z, t) = xyzt
-        (dN_dx, dN_dy, dN_dz, dN_dt) = delN
-        (d2N_dx2, d2N_dy2, d2N_dz2, d2N_dt2) = del2N
-        (d2A_dx2, d2A_dy2, d2A_dz2, d2A_dt2) = self.del2Af(xyzt)
-        P = self.Pf(xyzt)
-        (dP_dx, dP_dy, dP_dz, dP_dt) = self.delPf(xyzt)
-        (d2P_dx2, d2P_dy2, d2P_dz2, d2P_dt2) = self.del2Pf(xyzt)
-        d2Yt_dx2 = d2A_dx2 + P*d2N_dx2 + 2*dP_dx*dN_dx + d2P_dx2*N
-        d2Yt_dy2 = d2A_dy2 + P*d2N_dy2 + 2*dP_dy*dN_dy + d2P_dy2*N
-        d2Yt_dz2 = d2A_dz2 + P*d2N_dz2 + 2*dP_dz*dN_dz + d2P_dz2*N
-        d2Yt_dt2 = d2A_dt2 + P*d2N_dt2 + 2*dP_dt*dN_dt + d2P_dt2*N
-        del2Yt = [d2Yt_dx2, d2Yt_dy2, d2Yt_dz2, d2Yt_dt2]
-        return del2Yt
+        super().__init__(bcf, delbcf, del2bcf)
+        assert self.m == 4
 
 #################
 
@@ -534,3 +303,30 @@ if __name__ == '__main__':
     for (i, del2Yt_t) in enumerate(del2Yt_test):
         if not np.isclose(del2Yt_t, del2Yt_ref[i]):
             print("ERROR: del2Yt[%d] = %s, vs ref %s" % (i, del2Yt_t, del2Yt_ref[i]))
+
+    # Test the batched methods against the scalar methods at a set of
+    # points which includes the test point.
+    X_test = np.vstack((xyzt_test, np.linspace(0, 1, 5*len(xyzt_test)).reshape(5, -1)))
+    n = len(X_test)
+    N_v_test = np.full(n, N_test)
+    delN_v_test = np.tile(delN_test, (n, 1))
+    del2N_v_test = np.tile(del2N_test, (n, 1))
+    for (name, f, f_v, args, args_v) in (
+        ('A', tf.Af, tf.Af_v, (), ()),
+        ('delA', tf.delAf, tf.delAf_v, (), ()),
+        ('del2A', tf.del2Af, tf.del2Af_v, (), ()),
+        ('P', tf.Pf, tf.Pf_v, (), ()),
+        ('delP', tf.delPf, tf.delPf_v, (), ()),
+        ('del2P', tf.del2Pf, tf.del2Pf_v, (), ()),
+        ('Yt', tf.Ytf, tf.Ytf_v, (N_test,), (N_v_test,)),
+        ('delYt', tf.delYtf, tf.delYtf_v, (N_test, delN_test),
+         (N_v_test, delN_v_test)),
+        ('del2Yt', tf.del2Ytf, tf.del2Ytf_v,
+         (N_test, delN_test, del2N_test),
+         (N_v_test, delN_v_test, del2N_v_test))
+        ):
+        print("Testing batched %s." % name)
+        ref = np.array([f(xx, *args) for xx in X_test], dtype=float)
+        test = f_v(X_test, *args_v)
+        if test.shape != ref.shape or not np.allclose(test, ref):
+            print("ERROR: %s_v = %s, vs ref %s" % (name, test, ref))
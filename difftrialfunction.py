@@ -0,0 +1,432 @@
+###############################################################################
+"""
+DiffTrialFunction - Class implementing the trial function for diffusion
+problems in any number of spatial dimensions
+
+The trial function takes the form:
+
+Yt(x) = A(x) + P(x)N(x, p)
+
+where:
+
+x = [x1, ..., x(m-1), t] = point in the unit hypercube, with time last
+A(x) = boundary condition function that reduces to BC at boundaries
+P(x) = network coefficient function that vanishes at boundaries
+N(x, p) = scalar output of neural network with parameter vector p
+
+A(x) is built by transfinite interpolation, as the Boolean sum of the
+linear blending projections along each axis. Expanded, this is a sum of
+terms, one for each non-empty set S of axes and each choice of the 0|1 face
+of each axis in S:
+
+A(x) = sum((-1)**(|S| + 1)*W(x)*f(x|S))
+
+where W(x) is the product of the blending weights (1 - x_i) or x_i for the
+axes in S, x|S is x with the coordinates in S moved onto their faces, and f
+is the BC function for the chosen face of the last axis in S. Only the
+initial condition (t=0) is used along the time axis.
+
+The BC values are computed by a BoundaryCache, which calls each BC
+function once for each distinct face point, rather than once for every
+point, and saves a limited number of values for later calls. BC values at
+the corners of the domain do not depend on the points at all, so each is
+computed once and shared by all points.
+
+Example:
+    Create a DiffTrialFunction object for a 3-D diffusion problem
+        Yt_obj = DiffTrialFunction(bcf, delbcf, del2bcf)
+
+    Compute the value of the trial function at a given point
+        Yt = Yt_obj.Ytf([x, y, z, t], N)
+
+    Compute the value of the boundary condition function at an array of
+    points
+        A = Yt_obj.Af_v(X)
+
+Notes:
+    Variables that end in 'f' are usually functions or arrays of functions.
+
+Attributes:
+    bcf - mx2 array of BC functions at x[i]=0|1
+    delbcf - mx2xm array of BC gradient functions at x[i]=0|1
+    del2bcf - mx2xm array of BC Laplacian component functions at x[i]=0|1
+    m - Number of independent variables, including time
+    terms - List of (S, faces, sign) for the terms of A
+    bcache - BoundaryCache of BC values at face points
+
+Methods:
+    Af(xv) - Compute boundary condition function at xv
+
+    delAf(xv) - Compute boundary condition function gradient at xv
+
+    del2Af(xv) - Compute boundary condition function Laplacian components
+        at xv
+
+    Pf(xv) - Compute network coefficient function at xv
+
+    delPf(xv) - Compute network coefficient function gradient at xv
+
+    del2Pf(xv) - Compute network coefficient function Laplacian components
+        at xv
+
+    Ytf(xv, N) - Compute trial function at xv with network output N
+
+    delYtf(xv, N, delN) - Compute trial function gradient at xv with network
+        output N and network output gradient delN.
+
+    del2Ytf(xv, N, delN, del2N) - Compute trial function Laplacian components
+        at xv with network output N, network output gradient delN, and
+        network output Laplacian components del2N
+
+    Af_v(X), delAf_v(X), del2Af_v(X), Pf_v(X), delPf_v(X), del2Pf_v(X),
+    Ytf_v(X, N), delYtf_v(X, N, delN), del2Ytf_v(X, N, delN, del2N) - Batched
+        versions of the above methods for an (n, m) array X of points, with
+        N (n,), delN (n, m) and del2N (n, m) arrays of network outputs
+
+Todo:
+
+"""
+
+
+from itertools import combinations, product
+
+import numpy as np
+
+from boundarycache import BoundaryCache
+
+
+class DiffTrialFunction():
+    """Trial function for diffusion problems in any number of dimensions."""
+
+
+    # Public methods
+
+    def __init__(self, bcf, delbcf, del2bcf):
+        """Constructor"""
+        self.bcf = bcf
+        self.delbcf = delbcf
+        self.del2bcf = del2bcf
+        self.m = len(bcf)
+        assert self.m >= 2
+        self.terms = _transfinite_terms(self.m)
+        self.bcache = BoundaryCache(self.m)
+
+    def Af(self, xv):
+        """Boundary condition function"""
+        return self.Af_v(_point(xv))[0]
+
+    def delAf(self, xv):
+        """Gradient of boundary condition function"""
+        return self.delAf_v(_point(xv))[0]
+
+    def del2Af(self, xv):
+        """Laplacian components of boundary condition function"""
+        return self.del2Af_v(_point(xv))[0]
+
+    def Pf(self, xv):
+        """Network coefficient function"""
+        return self.Pf_v(_point(xv))[0]
+
+    def delPf(self, xv):
+        """Network coefficient function gradient"""
+        return self.delPf_v(_point(xv))[0]
+
+    def del2Pf(self, xv):
+        """Network coefficient function Laplacian"""
+        return self.del2Pf_v(_point(xv))[0]
+
+    def Ytf(self, xv, N):
+        """Trial function"""
+        A = self.Af(xv)
+        P = self.Pf(xv)
+        Yt = A + P*N
+        return Yt
+
+    def delYtf(self, xv, N, delN):
+        """Trial function gradient"""
+        delA = self.delAf(xv)
+        P = self.Pf(xv)
+        delP = self.delPf(xv)
+        delYt = delA + P*np.asarray(delN) + delP*N
+        return delYt
+
+    def del2Ytf(self, xv, N, delN, del2N):
+        """Trial function Laplacian"""
+        del2A = self.del2Af(xv)
+        P = self.Pf(xv)
+        delP = self.delPf(xv)
+        del2P = self.del2Pf(xv)
+        del2Yt = (del2A + P*np.asarray(del2N) + 2*delP*np.asarray(delN) +
+                  del2P*N)
+        return del2Yt
+
+    # Batched versions of the methods above. Each takes an (n, m) array X
+    # of points, one point per row, and returns an (n,) array for scalar
+    # quantities, or an (n, m) array for gradients and Laplacians.
+
+    def Af_v(self, X):
+        """Boundary condition function for an array of points"""
+        index = self.bcache.index(X)
+        A = np.zeros(len(X))
+        for (S, bits, sign) in self.terms:
+            f = self.bcf[S[-1]][bits[-1]]
+            W = np.prod(_blend(X, S, bits), axis=0)
+            A += sign*W*self.bcache.face_values(f, S, bits, index)
+        return A
+
+    def delAf_v(self, X):
+        """Boundary condition function gradient for an array of points"""
+        index = self.bcache.index(X)
+        delA = np.zeros(X.shape)
+        for (S, bits, sign) in self.terms:
+            (j, b) = (S[-1], bits[-1])
+            phi = _blend(X, S, bits)
+            W = np.prod(phi, axis=0)
+            g = self.bcache.face_values(self.bcf[j][b], S, bits, index)
+            for k in range(self.m):
+                if k in S:
+
+                    # The BC is constant along this axis, so only the
+                    # blending weight varies.
+                    i = S.index(k)
+                    dphi = 1 if bits[i] else -1
+                    dW = dphi*np.prod(np.delete(phi, i, axis=0), axis=0)
+                    delA[:, k] += sign*dW*g
+                else:
+                    df = self.delbcf[j][b][k]
+                    dg = self.bcache.face_values(df, S, bits, index)
+                    delA[:, k] += sign*W*dg
+        return delA
+
+    def del2Af_v(self, X):
+        """Boundary condition function Laplacian for an array of points"""
+        index = self.bcache.index(X)
+        del2A = np.zeros(X.shape)
+        for (S, bits, sign) in self.terms:
+            (j, b) = (S[-1], bits[-1])
+            W = np.prod(_blend(X, S, bits), axis=0)
+            for k in range(self.m):
+
+                # The blending weights are linear, so the terms for the axes
+                # in S vanish.
+                if k not in S:
+                    d2f = self.del2bcf[j][b][k]
+                    g = self.bcache.face_values(d2f, S, bits, index)
+                    del2A[:, k] += sign*W*g
+        return del2A
+
+    def Pf_v(self, X):
+        """Network coefficient function for an array of points"""
+        (p, dp, d2p) = _coefficient_factors(X)
+        P = np.prod(p, axis=0)
+        return P
+
+    def delPf_v(self, X):
+        """Network coefficient function gradient for an array of points"""
+        (p, dp, d2p) = _coefficient_factors(X)
+        delP = np.empty(X.shape)
+        for k in range(self.m):
+            delP[:, k] = dp[k]*np.prod(np.delete(p, k, axis=0), axis=0)
+        return delP
+
+    def del2Pf_v(self, X):
+        """Network coefficient function Laplacian for an array of points"""
+        (p, dp, d2p) = _coefficient_factors(X)
+        del2P = np.empty(X.shape)
+        for k in range(self.m):
+            del2P[:, k] = d2p[k]*np.prod(np.delete(p, k, axis=0), axis=0)
+        return del2P
+
+    def Ytf_v(self, X, N):
+        """Trial function for an array of points"""
+        A = self.Af_v(X)
+        P = self.Pf_v(X)
+        Yt = A + P*N
+        return Yt
+
+    def delYtf_v(self, X, N, delN):
+        """Trial function gradient for an array of points"""
+        delA = self.delAf_v(X)
+        P = self.Pf_v(X)
+        delP = self.delPf_v(X)
+        delYt = delA + P[:, np.newaxis]*delN + delP*N[:, np.newaxis]
+        return delYt
+
+    def del2Ytf_v(self, X, N, delN, del2N):
+        """Trial function Laplacian for an array of points"""
+        del2A = self.del2Af_v(X)
+        P = self.Pf_v(X)
+        delP = self.delPf_v(X)
+        del2P = self.del2Pf_v(X)
+        del2Yt = (del2A + P[:, np.newaxis]*del2N + 2*delP*delN +
+                  del2P*N[:, np.newaxis])
+        return del2Yt
+
+
+
+def _transfinite_terms(m):
+    """Return a list of (S, faces, sign) for the terms of the transfinite
+    interpolation in m dimensions. S is a tuple of axes, and faces is a
+    tuple of the 0|1 face of each axis in S. Only the t=0 face is used for
+    the last (time) axis."""
+    terms = []
+    for r in range(1, m + 1):
+        for S in combinations(range(m), r):
+            choices = [(0,) if i == m - 1 else (0, 1) for i in S]
+            for bits in product(*choices):
+                terms.append((S, bits, (-1)**(r + 1)))
+    return terms
+
+
+def _blend(X, S, bits):
+    """Return the linear blending weights for the faces of the axes in S,
+    as an (len(S), n) array."""
+    return np.array([X[:, i] if b else 1 - X[:, i] for (i, b) in zip(S, bits)])
+
+
+def _coefficient_factors(X):
+    """Return the per-axis factors of the network coefficient function P,
+    and their derivatives, as (m, n) arrays. P vanishes at both faces of the
+    spatial axes, and at t=0."""
+    c = X.T
+    p = c*(1 - c)
+    dp = 1 - 2*c
+    d2p = np.full(c.shape, -2.0)
+    p[-1] = c[-1]
+    dp[-1] = 1
+    d2p[-1] = 0
+    return (p, dp, d2p)
+
+
+def _point(xv):
+    """Convert a single point to a (1, m) array."""
+    return np.array([xv], dtype=float)
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    from math import cos, exp, sin
+
+    print("Testing transfinite interpolation terms.")
+    for (m, nterms) in ((2, 5), (3, 17), (4, 53)):
+        terms = _transfinite_terms(m)
+        if len(terms) != nterms:
+            print("ERROR: %d terms for m = %d, vs ref %d!" %
+                  (len(terms), m, nterms))
+
+    # Test with a 3-D problem with a different, smooth BC on each face,
+    # consistent at the edges and corners. The BCs are the traces of
+    # Y(x, y, z, t) = exp(-t)*(1 + x*y + y*z**2 + sin(x + z)).
+    m = 4
+
+    def Yf(xv):
+        (x, y, z, t) = xv
+        return exp(-t)*(1 + x*y + y*z**2 + sin(x + z))
+
+    def delYf(xv):
+        (x, y, z, t) = xv
+        e = exp(-t)
+        return [e*(y + cos(x + z)), e*(x + z**2), e*(2*y*z + cos(x + z)),
+                -Yf(xv)]
+
+    def del2Yf(xv):
+        (x, y, z, t) = xv
+        e = exp(-t)
+        return [-e*sin(x + z), 0, e*(2*y - sin(x + z)), Yf(xv)]
+
+    def on_face(f, i, b):
+        def g(xv):
+            xv = list(xv)
+            xv[i] = b
+            return f(xv)
+        return g
+
+    bcf = [[on_face(Yf, i, b) for b in (0, 1)] for i in range(m)]
+    delbcf = [[[on_face(lambda xv, k=k: delYf(xv)[k], i, b)
+                for k in range(m)] for b in (0, 1)] for i in range(m)]
+    del2bcf = [[[on_face(lambda xv, k=k: del2Yf(xv)[k], i, b)
+                 for k in range(m)] for b in (0, 1)] for i in range(m)]
+    tf = DiffTrialFunction(bcf, delbcf, del2bcf)
+
+    rng = np.random.RandomState(0)
+    X = rng.uniform(0, 1, (20, m))
+    h = 1e-5
+    E = np.eye(m)*h
+
+    print("Testing boundary condition function on the boundaries.")
+    for i in range(m):
+        for b in (0, 1) if i < m - 1 else (0,):
+            Xb = X.copy()
+            Xb[:, i] = b
+            A = tf.Af_v(Xb)
+            Y = np.array([Yf(xx) for xx in Xb])
+            if not np.allclose(A, Y):
+                print("ERROR: A does not match BC at x[%d] = %d!" % (i, b))
+
+    print("Testing boundary condition function gradient.")
+    delA = tf.delAf_v(X)
+    delA_fd = np.array([(tf.Af_v(X + e) - tf.Af_v(X - e))/(2*h)
+                        for e in E]).T
+    if not np.allclose(delA, delA_fd, atol=1e-6):
+        print("ERROR: delA does not match finite differences!")
+
+    print("Testing boundary condition function Laplacian.")
+    del2A = tf.del2Af_v(X)
+    del2A_fd = np.array([(tf.delAf_v(X + e)[:, k] - tf.delAf_v(X - e)[:, k])
+                         /(2*h) for (k, e) in enumerate(E)]).T
+    if not np.allclose(del2A, del2A_fd, atol=1e-6):
+        print("ERROR: del2A does not match finite differences!")
+
+    print("Testing network coefficient function.")
+    P = tf.Pf_v(X)
+    delP_fd = np.array([(tf.Pf_v(X + e) - tf.Pf_v(X - e))/(2*h)
+                        for e in E]).T
+    if not np.allclose(tf.delPf_v(X), delP_fd, atol=1e-6):
+        print("ERROR: delP does not match finite differences!")
+    del2P_fd = np.array([(tf.delPf_v(X + e)[:, k] - tf.delPf_v(X - e)[:, k])
+                         /(2*h) for (k, e) in enumerate(E)]).T
+    if not np.allclose(tf.del2Pf_v(X), del2P_fd, atol=1e-6):
+        print("ERROR: del2P does not match finite differences!")
+
+    print("Testing scalar methods.")
+    N = 0.5
+    delN = [0.61, 0.62, 0.63, 0.64]
+    del2N = [0.71, 0.72, 0.73, 0.74]
+    Yt = tf.Ytf_v(X, np.full(len(X), N))
+    delYt = tf.delYtf_v(X, np.full(len(X), N), np.tile(delN, (len(X), 1)))
+    del2Yt = tf.del2Ytf_v(X, np.full(len(X), N), np.tile(delN, (len(X), 1)),
+                          np.tile(del2N, (len(X), 1)))
+    for (i, xv) in enumerate(X):
+        if (not np.isclose(tf.Ytf(xv, N), Yt[i]) or
+            not np.allclose(tf.delYtf(xv, N, delN), delYt[i]) or
+            not np.allclose(tf.del2Ytf(xv, N, delN, del2N), del2Yt[i])):
+            print("ERROR: Scalar and batched trial functions differ at %s!"
+                  % xv)
+
+    print("Testing boundary condition evaluation counts.")
+    calls = []
+    counted = [[lambda xv, f=f: calls.append(1) or f(xv) for f in bcf_i]
+               for bcf_i in bcf]
+    tf = DiffTrialFunction(counted, delbcf, del2bcf)
+    ng = 5
+    g = np.linspace(0, 1, ng)
+    X = np.array(list(product(g, repeat=m)))
+
+    # One call per distinct face point of each term, and one call per
+    # corner term, made only on the first use. The saved values are reused
+    # for the same points.
+    ncorners = sum(1 for (S, bits, sign) in tf.terms if len(S) == m)
+    nfaces = sum(ng**(m - len(S)) for (S, bits, sign) in tf.terms
+                 if len(S) < m)
+    tf.Af_v(X)
+    if len(calls) != nfaces + ncorners:
+        print("ERROR: %d BC calls, vs ref %d!" %
+              (len(calls), nfaces + ncorners))
+    del calls[:]
+    tf.Af_v(np.vstack((X, X)))
+    if len(calls) != 0:
+        print("ERROR: %d BC calls on reuse, vs ref 0!" % len(calls))
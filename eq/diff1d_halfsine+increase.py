@@ -75,6 +75,13 @@ def dG_d2Y_dt2f(xt, Y, delY, del2Y):
 dG_ddel2Yf = [dG_d2Y_dx2f, dG_d2Y_dt2f]
 
 
+# Constant values of the derivatives above, so they need not be evaluated
+# at each point.
+dG_dY_const = 0
+dG_ddelY_const = [0, 1]
+dG_ddel2Y_const = [-D, 0]
+
+
 def f0f(xt):
     """Boundary condition at (x,t) = (0,t)"""
     (x, t) = xt
@@ -257,6 +264,91 @@ def d2Ya_dt2f(xt):
 del2Yaf = [d2Ya_dx2f, d2Ya_dt2f]
 
 
+# Array versions of the equation functions, for n points at once. Each
+# takes the (n, m) array of points, and the matching (n,) Y, (n, m) delY and
+# (n, m) del2Y arrays.
+
+def Gf_v(xt, Y, delY, del2Y):
+    """Vectorized version of the differential equation"""
+    (dY_dx, dY_dt) = delY.T
+    (d2Y_dx2, d2Y_dt2) = del2Y.T
+    return dY_dt - D*d2Y_dx2
+
+def dG_dYf_v(xt, Y, delY, del2Y):
+    """Vectorized partial of PDE wrt Y"""
+    return np.zeros(len(xt))
+
+def dG_ddelYf_v(xt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt delY"""
+    return np.tile((0.0, 1.0), (len(xt), 1))
+
+def dG_ddel2Yf_v(xt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt del2Y"""
+    return np.tile((-D, 0.0), (len(xt), 1))
+
+
+def Af_v(xt):
+    """Vectorized version of boundary condition function"""
+    (x, t) = xt.T
+    return a*t*x + (1 - t)*np.sin(pi*x)
+
+def delAf_v(xt):
+    """Vectorized version of boundary condition function gradient"""
+    (x, t) = xt.T
+    dA_dx = a*t + pi*(1 - t)*np.cos(pi*x)
+    dA_dt = a*x - np.sin(pi*x)
+    return np.stack((dA_dx, dA_dt), axis=1)
+
+def del2Af_v(xt):
+    """Vectorized version of boundary condition function Laplacian"""
+    (x, t) = xt.T
+    d2A_dx2 = pi**2*(t - 1)*np.sin(pi*x)
+    d2A_dt2 = np.zeros_like(t)
+    return np.stack((d2A_dx2, d2A_dt2), axis=1)
+
+
+def Yaf_v(xt):
+    """Vectorized analytical solution"""
+    (x, t) = xt.T
+    k = np.arange(1, kmax + 1)
+    xk = np.outer(x, k)
+    tk2 = np.outer(t, k**2)
+    Ya = a*t*x + np.sin(pi*x)*(np.cosh(pi**2*t*D) - np.sinh(pi**2*t*D))
+    Ya += np.sum(2*(-1)**k*a*(1 - np.exp(-pi**2*tk2*D))*np.sin(pi*xk)/
+                 (pi**3*k**3), axis=1)
+    return Ya
+
+def delYaf_v(xt):
+    """Vectorized analytical gradient"""
+    (x, t) = xt.T
+    k = np.arange(1, kmax + 1)
+    xk = np.outer(x, k)
+    tk2 = np.outer(t, k**2)
+    dYa_dx = a*t + pi*np.cos(pi*x)*(np.cosh(pi**2*t*D) - np.sinh(pi**2*t*D))
+    dYa_dx += np.sum(2*(-1)**k*a*(1 - np.exp(-tk2*pi**2*D))*np.cos(pi*xk)/
+                     (k**2*pi**2), axis=1)
+    dYa_dt = a*x + np.sin(pi*x)*pi**2*D*(np.sinh(pi**2*t*D) -
+                                         np.cosh(pi**2*t*D))
+    dYa_dt += np.sum(2*(-1)**k*a*np.exp(-tk2*pi**2*D)*D*np.sin(pi*xk)/
+                     (k*pi), axis=1)
+    return np.stack((dYa_dx, dYa_dt), axis=1)
+
+def del2Yaf_v(xt):
+    """Vectorized analytical Laplacian"""
+    (x, t) = xt.T
+    k = np.arange(1, kmax + 1)
+    xk = np.outer(x, k)
+    tk2 = np.outer(t, k**2)
+    d2Ya_dx2 = -pi**2*np.sin(pi*x)*(np.cosh(pi**2*t*D) - np.sinh(pi**2*t*D))
+    d2Ya_dx2 += np.sum(-2*(-1)**k*a*(1 - np.exp(-pi**2*tk2*D))*
+                       np.sin(pi*xk)/(pi*k), axis=1)
+    d2Ya_dt2 = np.sin(pi*x)*pi**4*D**2*(np.cosh(pi**2*t*D) -
+                                        np.sinh(pi**2*t*D))
+    d2Ya_dt2 += np.sum(-2*(-1)**k*a*np.exp(-pi**2*tk2*D)*k*pi*D**2*
+                       np.sin(pi*xk), axis=1)
+    return np.stack((d2Ya_dx2, d2Ya_dt2), axis=1)
+
+
 if __name__ == '__main__':
 
     # Test values
@@ -356,3 +448,28 @@ if __name__ == '__main__':
             assert f(xt) is None
         else:
             assert np.isclose(f(xt), del2Ya_ref[i])
+
+    print("Testing vectorized differential equation functions.")
+    np.random.seed(0)
+    X = np.random.rand(4, len(xt))
+    Y = np.random.rand(4)
+    delY = np.random.rand(4, len(xt))
+    del2Y = np.random.rand(4, len(xt))
+    args = list(zip(X, Y, delY, del2Y))
+    assert np.allclose(Gf_v(X, Y, delY, del2Y), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(X, Y, delY, del2Y),
+                       [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddelYf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddelYf] for a in args])
+    assert np.allclose(dG_ddel2Yf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddel2Yf] for a in args])
+
+    print("Testing vectorized optimized BC functions.")
+    assert np.allclose(Af_v(X), [Af(x) for x in X])
+    assert np.allclose(delAf_v(X), [delAf(x) for x in X])
+    assert np.allclose(del2Af_v(X), [del2Af(x) for x in X])
+
+    print("Testing vectorized analytical solution.")
+    assert np.allclose(Yaf_v(X), [Yaf(x) for x in X])
+    assert np.allclose(delYaf_v(X), [[f(x) for f in delYaf] for x in X])
+    assert np.allclose(del2Yaf_v(X), [[f(x) for f in del2Yaf] for x in X])
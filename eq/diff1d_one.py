@@ -14,6 +14,9 @@ Y(x,0) = C = 1
 """
 
 
+import numpy as np
+
+
 # Diffusion coefficient
 D = 0.1
 
@@ -69,6 +72,13 @@ def dG_d2Y_dt2f(xt, Y, delY, del2Y):
 dG_ddel2Yf = [dG_d2Y_dx2f, dG_d2Y_dt2f]
 
 
+# Constant values of the derivatives above, so they need not be evaluated
+# at each point.
+dG_dY_const = 0
+dG_ddelY_const = [0, 1]
+dG_ddel2Y_const = [-D, 0]
+
+
 def f0f(xt):
     """Boundary condition at (x,t) = (0,t)"""
     (x, t) = xt
@@ -229,7 +239,53 @@ def d2Ya_dt2f(xt):
 del2Yaf = [d2Ya_dx2f, d2Ya_dt2f]
 
 
-import numpy as np
+# Array versions of the equation functions, for n points at once. Each
+# takes the (n, m) array of points, and the matching (n,) Y, (n, m) delY and
+# (n, m) del2Y arrays.
+
+def Gf_v(xt, Y, delY, del2Y):
+    """Vectorized version of the differential equation"""
+    (dY_dx, dY_dt) = delY.T
+    (d2Y_dx2, d2Y_dt2) = del2Y.T
+    return dY_dt - D*d2Y_dx2
+
+def dG_dYf_v(xt, Y, delY, del2Y):
+    """Vectorized partial of PDE wrt Y"""
+    return np.zeros(len(xt))
+
+def dG_ddelYf_v(xt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt delY"""
+    return np.tile((0.0, 1.0), (len(xt), 1))
+
+def dG_ddel2Yf_v(xt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt del2Y"""
+    return np.tile((-D, 0.0), (len(xt), 1))
+
+
+def Af_v(xt):
+    """Vectorized version of boundary condition function"""
+    return np.full(len(xt), C, dtype=float)
+
+def delAf_v(xt):
+    """Vectorized version of boundary condition function gradient"""
+    return np.zeros(xt.shape)
+
+def del2Af_v(xt):
+    """Vectorized version of boundary condition function Laplacian"""
+    return np.zeros(xt.shape)
+
+
+def Yaf_v(xt):
+    """Vectorized analytical solution"""
+    return np.full(len(xt), C, dtype=float)
+
+def delYaf_v(xt):
+    """Vectorized analytical gradient"""
+    return np.zeros(xt.shape)
+
+def del2Yaf_v(xt):
+    """Vectorized analytical Laplacian"""
+    return np.zeros(xt.shape)
 
 
 if __name__ == '__main__':
@@ -331,3 +387,28 @@ if __name__ == '__main__':
             assert f(xt) is None
         else:
             assert np.isclose(f(xt), del2Ya_ref[i])
+
+    print("Testing vectorized differential equation functions.")
+    np.random.seed(0)
+    X = np.random.rand(4, len(xt))
+    Y = np.random.rand(4)
+    delY = np.random.rand(4, len(xt))
+    del2Y = np.random.rand(4, len(xt))
+    args = list(zip(X, Y, delY, del2Y))
+    assert np.allclose(Gf_v(X, Y, delY, del2Y), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(X, Y, delY, del2Y),
+                       [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddelYf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddelYf] for a in args])
+    assert np.allclose(dG_ddel2Yf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddel2Yf] for a in args])
+
+    print("Testing vectorized optimized BC functions.")
+    assert np.allclose(Af_v(X), [Af(x) for x in X])
+    assert np.allclose(delAf_v(X), [delAf(x) for x in X])
+    assert np.allclose(del2Af_v(X), [del2Af(x) for x in X])
+
+    print("Testing vectorized analytical solution.")
+    assert np.allclose(Yaf_v(X), [Yaf(x) for x in X])
+    assert np.allclose(delYaf_v(X), [[f(x) for f in delYaf] for x in X])
+    assert np.allclose(del2Yaf_v(X), [[f(x) for f in del2Yaf] for x in X])
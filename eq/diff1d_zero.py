@@ -249,6 +249,19 @@ def dG_dY_dxf(xv, Y, delY, deldelY):
 # del2Yaf = [d2Ya_dx2f, d2Ya_dt2f]
 
 
+# Array versions of the equation functions, for n points at once. Each
+# takes the (n, m) array of points, and the matching (n,) Y, (n, m) delY and
+# (n, m, m) deldelY arrays.
+
+def Gf_v(xv, Y, delY, deldelY):
+    """Vectorized version of the differential equation"""
+    (dY_dx, dY_dt) = delY.T
+    d2Y_dx2 = deldelY[:, 0, 0]
+    return dY_dt - D*d2Y_dx2
+
+def dG_dYf_v(xv, Y, delY, deldelY):
+    """Vectorized partial of PDE wrt Y"""
+    return np.zeros(len(xv))
 
 
 if __name__ == '__main__':
@@ -354,3 +367,14 @@ if __name__ == '__main__':
     #         assert f(xt) is None
     #     else:
     #         assert np.isclose(f(xt), del2Ya_ref[i])
+
+    print("Testing vectorized differential equation functions.")
+    np.random.seed(0)
+    X = np.random.rand(4, 2)
+    Y = np.random.rand(4)
+    delY = np.random.rand(4, 2)
+    deldelY = np.random.rand(4, 2, 2)
+    args = list(zip(X, Y, delY, deldelY))
+    assert np.allclose(Gf_v(X, Y, delY, deldelY), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(X, Y, delY, deldelY),
+                       [dG_dYf(*a) for a in args])
@@ -15,6 +15,9 @@ Y(x,y,0) = C = 0
 """
 
 
+import numpy as np
+
+
 # Diffusion coefficient
 D = 0.1
 
@@ -84,6 +87,13 @@ def dG_d2Y_dt2f(xyt, Y, delY, del2Y):
 dG_ddel2Yf = [dG_d2Y_dx2f, dG_d2Y_dy2f, dG_d2Y_dt2f]
 
 
+# Constant values of the derivatives above, so they need not be evaluated
+# at each point.
+dG_dY_const = 0
+dG_ddelY_const = [0, 0, 1]
+dG_ddel2Y_const = [-D, -D, 0]
+
+
 def f0f(xyt):
     """Boundary condition at (x,y,t) = (0,y,t)."""
     (x, y, t) = xyt
@@ -362,7 +372,53 @@ def d2Ya_dt2f(xyt):
 del2Yaf = [d2Ya_dx2f, d2Ya_dy2f, d2Ya_dt2f]
 
 
-import numpy as np
+# Array versions of the equation functions, for n points at once. Each
+# takes the (n, m) array of points, and the matching (n,) Y, (n, m) delY and
+# (n, m) del2Y arrays.
+
+def Gf_v(xyt, Y, delY, del2Y):
+    """Vectorized version of the differential equation"""
+    (dY_dx, dY_dy, dY_dt) = delY.T
+    (d2Y_dx2, d2Y_dy2, d2Y_dt2) = del2Y.T
+    return dY_dt - D*(d2Y_dx2 + d2Y_dy2)
+
+def dG_dYf_v(xyt, Y, delY, del2Y):
+    """Vectorized partial of PDE wrt Y"""
+    return np.zeros(len(xyt))
+
+def dG_ddelYf_v(xyt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt delY"""
+    return np.tile((0.0, 0.0, 1.0), (len(xyt), 1))
+
+def dG_ddel2Yf_v(xyt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt del2Y"""
+    return np.tile((-D, -D, 0.0), (len(xyt), 1))
+
+
+def Af_v(xyt):
+    """Vectorized version of boundary condition function"""
+    return np.full(len(xyt), C, dtype=float)
+
+def delAf_v(xyt):
+    """Vectorized version of boundary condition function gradient"""
+    return np.zeros(xyt.shape)
+
+def del2Af_v(xyt):
+    """Vectorized version of boundary condition function Laplacian"""
+    return np.zeros(xyt.shape)
+
+
+def Yaf_v(xyt):
+    """Vectorized analytical solution"""
+    return np.full(len(xyt), C, dtype=float)
+
+def delYaf_v(xyt):
+    """Vectorized analytical gradient"""
+    return np.zeros(xyt.shape)
+
+def del2Yaf_v(xyt):
+    """Vectorized analytical Laplacian"""
+    return np.zeros(xyt.shape)
 
 
 if __name__ == '__main__':
@@ -473,3 +529,28 @@ if __name__ == '__main__':
             assert f(xyt) is None
         else:
             assert np.isclose(f(xyt), del2Ya_ref[i])
+
+    print("Testing vectorized differential equation functions.")
+    np.random.seed(0)
+    X = np.random.rand(4, len(xyt))
+    Y = np.random.rand(4)
+    delY = np.random.rand(4, len(xyt))
+    del2Y = np.random.rand(4, len(xyt))
+    args = list(zip(X, Y, delY, del2Y))
+    assert np.allclose(Gf_v(X, Y, delY, del2Y), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(X, Y, delY, del2Y),
+                       [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddelYf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddelYf] for a in args])
+    assert np.allclose(dG_ddel2Yf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddel2Yf] for a in args])
+
+    print("Testing vectorized optimized BC functions.")
+    assert np.allclose(Af_v(X), [Af(x) for x in X])
+    assert np.allclose(delAf_v(X), [delAf(x) for x in X])
+    assert np.allclose(del2Af_v(X), [del2Af(x) for x in X])
+
+    print("Testing vectorized analytical solution.")
+    assert np.allclose(Yaf_v(X), [Yaf(x) for x in X])
+    assert np.allclose(delYaf_v(X), [[f(x) for f in delYaf] for x in X])
+    assert np.allclose(del2Yaf_v(X), [[f(x) for f in del2Yaf] for x in X])
@@ -18,6 +18,7 @@ Y(x,y,z,0) = sin(pi*x)*sin(pi*y)*sin(pi*z)
 
 
 from math import cos, exp, pi, sin
+import numpy as np
 
 
 # Diffusion coefficient
@@ -100,6 +101,13 @@ def dG_d2Y_dt2f(xyzt, Y, delY, del2Y):
 dG_ddel2Yf = [dG_d2Y_dx2f, dG_d2Y_dy2f, dG_d2Y_dz2f, dG_d2Y_dt2f]
 
 
+# Constant values of the derivatives above, so they need not be evaluated
+# at each point.
+dG_dY_const = 0
+dG_ddelY_const = [0, 0, 0, 1]
+dG_ddel2Y_const = [-D, -D, -D, 0]
+
+
 def f0f(xyzt):
     """Boundary condition at (x,y,z,t) = (0,y,z,t)"""
     (x, y, z, t) = xyzt
@@ -552,7 +560,75 @@ def d2Ya_dt2f(xyzt):
 del2Yaf = [d2Ya_dx2f, d2Ya_dy2f, d2Ya_dz2f, d2Ya_dt2f]
 
 
-import numpy as np
+# Array versions of the equation functions, for n points at once. Each
+# takes the (n, m) array of points, and the matching (n,) Y, (n, m) delY and
+# (n, m) del2Y arrays.
+
+def Gf_v(xyzt, Y, delY, del2Y):
+    """Vectorized version of the differential equation"""
+    (dY_dx, dY_dy, dY_dz, dY_dt) = delY.T
+    (d2Y_dx2, d2Y_dy2, d2Y_dz2, d2Y_dt2) = del2Y.T
+    return dY_dt - D*(d2Y_dx2 + d2Y_dy2 + d2Y_dz2)
+
+def dG_dYf_v(xyzt, Y, delY, del2Y):
+    """Vectorized partial of PDE wrt Y"""
+    return np.zeros(len(xyzt))
+
+def dG_ddelYf_v(xyzt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt delY"""
+    return np.tile((0.0, 0.0, 0.0, 1.0), (len(xyzt), 1))
+
+def dG_ddel2Yf_v(xyzt, Y, delY, del2Y):
+    """Vectorized partials of PDE wrt del2Y"""
+    return np.tile((-D, -D, -D, 0.0), (len(xyzt), 1))
+
+
+def Af_v(xyzt):
+    """Vectorized version of boundary condition function"""
+    (x, y, z, t) = xyzt.T
+    return (1 - t)*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+
+def delAf_v(xyzt):
+    """Vectorized version of boundary condition function gradient"""
+    (x, y, z, t) = xyzt.T
+    dA_dx = pi*(1 - t)*np.cos(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    dA_dy = pi*(1 - t)*np.sin(pi*x)*np.cos(pi*y)*np.sin(pi*z)
+    dA_dz = pi*(1 - t)*np.sin(pi*x)*np.sin(pi*y)*np.cos(pi*z)
+    dA_dt = -np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    return np.stack((dA_dx, dA_dy, dA_dz, dA_dt), axis=1)
+
+def del2Af_v(xyzt):
+    """Vectorized version of boundary condition function Laplacian"""
+    (x, y, z, t) = xyzt.T
+    d2A_dx2 = pi**2*(t - 1)*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    d2A_dy2 = pi**2*(t - 1)*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    d2A_dz2 = pi**2*(t - 1)*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    d2A_dt2 = np.zeros_like(t)
+    return np.stack((d2A_dx2, d2A_dy2, d2A_dz2, d2A_dt2), axis=1)
+
+
+def Yaf_v(xyzt):
+    """Vectorized analytical solution"""
+    (x, y, z, t) = xyzt.T
+    return np.exp(-3*pi**2*D*t)*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+
+def delYaf_v(xyzt):
+    """Vectorized analytical gradient"""
+    (x, y, z, t) = xyzt.T
+    dYa_dx = np.exp(-3*pi**2*D*t)*pi*np.cos(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    dYa_dy = np.exp(-3*pi**2*D*t)*pi*np.sin(pi*x)*np.cos(pi*y)*np.sin(pi*z)
+    dYa_dz = np.exp(-3*pi**2*D*t)*pi*np.sin(pi*x)*np.sin(pi*y)*np.cos(pi*z)
+    dYa_dt = -3*np.exp(-3*pi**2*D*t)*pi**2*D*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    return np.stack((dYa_dx, dYa_dy, dYa_dz, dYa_dt), axis=1)
+
+def del2Yaf_v(xyzt):
+    """Vectorized analytical Laplacian"""
+    (x, y, z, t) = xyzt.T
+    d2Ya_dx2 = -np.exp(-3*pi**2*D*t)*pi**2*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    d2Ya_dy2 = -np.exp(-3*pi**2*D*t)*pi**2*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    d2Ya_dz2 = -np.exp(-3*pi**2*D*t)*pi**2*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    d2Ya_dt2 = 9*np.exp(-3*pi**2*D*t)*pi**4*D**2*np.sin(pi*x)*np.sin(pi*y)*np.sin(pi*z)
+    return np.stack((d2Ya_dx2, d2Ya_dy2, d2Ya_dz2, d2Ya_dt2), axis=1)
 
 
 if __name__ == '__main__':
@@ -679,3 +755,28 @@ if __name__ == '__main__':
             assert f(xyzt) is None
         else:
             assert np.isclose(f(xyzt), del2Ya_ref[i])
+
+    print("Testing vectorized differential equation functions.")
+    np.random.seed(0)
+    X = np.random.rand(4, len(xyzt))
+    Y = np.random.rand(4)
+    delY = np.random.rand(4, len(xyzt))
+    del2Y = np.random.rand(4, len(xyzt))
+    args = list(zip(X, Y, delY, del2Y))
+    assert np.allclose(Gf_v(X, Y, delY, del2Y), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(X, Y, delY, del2Y),
+                       [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddelYf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddelYf] for a in args])
+    assert np.allclose(dG_ddel2Yf_v(X, Y, delY, del2Y),
+                       [[f(*a) for f in dG_ddel2Yf] for a in args])
+
+    print("Testing vectorized optimized BC functions.")
+    assert np.allclose(Af_v(X), [Af(x) for x in X])
+    assert np.allclose(delAf_v(X), [delAf(x) for x in X])
+    assert np.allclose(del2Af_v(X), [del2Af(x) for x in X])
+
+    print("Testing vectorized analytical solution.")
+    assert np.allclose(Yaf_v(X), [Yaf(x) for x in X])
+    assert np.allclose(delYaf_v(X), [[f(x) for f in delYaf] for x in X])
+    assert np.allclose(del2Yaf_v(X), [[f(x) for f in del2Yaf] for x in X])
@@ -56,9 +56,43 @@ def dYa_dx(x):
     """Derivative of analytical solution"""
     return 2*x - exp(-x**2/2)*(1 + x + 4*x**2 + x**4)/(1 + x + x**3)**2
 
+
+# Array versions of the equation functions, for arrays of x, Y and dY/dx.
+
+def G_v(x, Y, dY_dx):
+    """Vectorized code for differential equation"""
+    return G(x, Y, dY_dx)
+
+def dG_dY_v(x, Y, dY_dx):
+    """Vectorized derivative of G wrt Y"""
+    return dG_dY(x, Y, dY_dx)
+
+def dG_ddYdx_v(x, y, dY_dx):
+    """Vectorized derivative of G wrt dy/dx"""
+    return np.ones(len(x))
+
+def Ya_v(x):
+    """Vectorized analytical solution"""
+    return np.exp(-x**2/2)/(1 + x + x**3) + x**2
+
+def dYa_dx_v(x):
+    """Vectorized derivative of analytical solution"""
+    return 2*x - np.exp(-x**2/2)*(1 + x + 4*x**2 + x**4)/(1 + x + x**3)**2
+
+
 if __name__ == '__main__':
     assert G(0, 0, 0) == 0
     assert dG_dY(0, 0, 0) == 1
     assert dG_ddYdx(0, 0, 0) == 1
     assert np.isclose(Ya(0), ic)
     assert np.isclose(dYa_dx(0), -1)
+
+    x = np.linspace(0, 1, 5)
+    Y = np.linspace(1, 2, 5)
+    dY_dx = np.linspace(-1, 1, 5)
+    args = list(zip(x, Y, dY_dx))
+    assert np.allclose(G_v(x, Y, dY_dx), [G(*a) for a in args])
+    assert np.allclose(dG_dY_v(x, Y, dY_dx), [dG_dY(*a) for a in args])
+    assert np.allclose(dG_ddYdx_v(x, Y, dY_dx), [dG_ddYdx(*a) for a in args])
+    assert np.allclose(Ya_v(x), [Ya(xx) for xx in x])
+    assert np.allclose(dYa_dx_v(x), [dYa_dx(xx) for xx in x])
@@ -51,9 +51,44 @@ def dYa_dxf(x):
     """Derivative of analytical solution"""
     return 1/5*exp(-x/5)*(5*cos(x) - sin(x))
 
+
+# Array versions of the equation functions, for arrays of x, Y and dY/dx.
+
+def Gf_v(x, Y, dY_dx):
+    """Vectorized code for differential equation"""
+    return dY_dx + Y/5 - np.exp(-x/5)*np.cos(x)
+
+def dG_dYf_v(x, Y, dY_dx):
+    """Vectorized derivative of G wrt Y"""
+    return np.full(len(x), 1/5)
+
+def dG_ddYdxf_v(x, y, dY_dx):
+    """Vectorized derivative of G wrt dy/dx"""
+    return np.ones(len(x))
+
+def Yaf_v(x):
+    """Vectorized analytical solution"""
+    return np.exp(-x/5)*np.sin(x)
+
+def dYa_dxf_v(x):
+    """Vectorized derivative of analytical solution"""
+    return 1/5*np.exp(-x/5)*(5*np.cos(x) - np.sin(x))
+
+
 if __name__ == '__main__':
     assert Gf(0, 0, 0) == -1
     assert dG_dYf(0, 0, 0) == 1/5
     assert dG_ddYdxf(0, 0, 0) == 1
     assert np.isclose(Yaf(0), ic)
     assert np.isclose(dYa_dxf(0), 1)
+
+    x = np.linspace(0, 1, 5)
+    Y = np.linspace(1, 2, 5)
+    dY_dx = np.linspace(-1, 1, 5)
+    args = list(zip(x, Y, dY_dx))
+    assert np.allclose(Gf_v(x, Y, dY_dx), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(x, Y, dY_dx), [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddYdxf_v(x, Y, dY_dx),
+                       [dG_ddYdxf(*a) for a in args])
+    assert np.allclose(Yaf_v(x), [Yaf(xx) for xx in x])
+    assert np.allclose(dYa_dxf_v(x), [dYa_dxf(xx) for xx in x])
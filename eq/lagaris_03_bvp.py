@@ -68,8 +68,62 @@ def d2Ya_dx2f(x):
     return -2/25*exp(-x/5)*(5*cos(x) + 12*sin(x))
 
 
+# Array versions of the equation functions, for arrays of x, Y, dY/dx and
+# d2Y/dx2.
+
+def Gf_v(x, Y, dY_dx, d2Y_dx2):
+    """Vectorized code for differential equation"""
+    return d2Y_dx2 + 1/5*dY_dx + Y + 1/5*np.exp(-x/5)*np.cos(x)
+
+
+def dG_dYf_v(x, Y, dY_dx, d2Y_dx2):
+    """Vectorized derivative of G wrt Y"""
+    return np.ones(len(x))
+
+
+def dG_ddYdxf_v(x, Y, dY_dx, d2Y_dx2):
+    """Vectorized derivative of G wrt dY/dx"""
+    return np.full(len(x), 1/5)
+
+
+def dG_dd2Ydx2f_v(x, Y, dY_dx, d2Y_dx2):
+    """Vectorized derivative of G wrt d2Y/dx2"""
+    return np.ones(len(x))
+
+
+def Yaf_v(x):
+    """Vectorized analytical solution"""
+    return np.exp(-x/5)*np.sin(x)
+
+
+def dYa_dxf_v(x):
+    """Vectorized derivative of analytical solution"""
+    return 1/5*np.exp(-x/5)*(5*np.cos(x) - np.sin(x))
+
+
+def d2Ya_dx2f_v(x):
+    """Vectorized 2nd derivative of analytical solution"""
+    return -2/25*np.exp(-x/5)*(5*np.cos(x) + 12*np.sin(x))
+
+
 if __name__ == '__main__':
     assert np.isclose(Gf(0, 0, 0, 0), 1/5)
     assert np.isclose(dG_dYf(0, 0, 0, 0), 1)
     assert np.isclose(dG_ddYdxf(0, 0, 0, 0), 1/5)
     assert np.isclose(dG_dd2Ydx2f(0, 0, 0, 0), 1)
+
+    x = np.linspace(0, 1, 5)
+    Y = np.linspace(1, 2, 5)
+    dY_dx = np.linspace(-1, 1, 5)
+    d2Y_dx2 = np.linspace(2, 3, 5)
+    args = list(zip(x, Y, dY_dx, d2Y_dx2))
+    assert np.allclose(Gf_v(x, Y, dY_dx, d2Y_dx2), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(x, Y, dY_dx, d2Y_dx2),
+                       [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddYdxf_v(x, Y, dY_dx, d2Y_dx2),
+                       [dG_ddYdxf(*a) for a in args])
+    assert np.allclose(dG_dd2Ydx2f_v(x, Y, dY_dx, d2Y_dx2),
+                       [dG_dd2Ydx2f(*a) for a in args])
+    assert np.allclose(Yaf_v(x), [Yaf(xx) for xx in x])
+    assert np.allclose(dYa_dxf_v(x), [dYa_dxf(xx) for xx in x])
+    assert np.allclose(d2Ya_dx2f_v(x), [d2Ya_dx2f(xx) for xx in x])
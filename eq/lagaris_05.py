@@ -278,6 +278,57 @@ deldelYaf = ((d2Ya_dxdxf, d2Ya_dxdyf),
              (d2Ya_dydxf, d2Ya_dydyf))
 
 
+# Array versions of the equation functions, for n points at once. Each
+# takes the (n, m) array of points, and the matching (n,) Y, (n, m) delY and
+# (n, m, m) deldelY arrays.
+
+def Gf_v(xv, Y, delY, deldelY):
+    """Vectorized code for differential equation"""
+    (x, y) = xv.T
+    d2Y_dxdx = deldelY[:, 0, 0]
+    d2Y_dydy = deldelY[:, 1, 1]
+    return d2Y_dxdx + d2Y_dydy - np.exp(-x)*(x - 2 + y**3 + 6*y)
+
+
+def dG_dYf_v(xv, Y, delY, deldelY):
+    """Vectorized dG/dY"""
+    return np.zeros(len(xv))
+
+
+def dG_ddelYf_v(xv, Y, delY, deldelY):
+    """Vectorized dG/d(delY)"""
+    return np.zeros((len(xv), 2))
+
+
+def dG_ddeldelYf_v(xv, Y, delY, deldelY):
+    """Vectorized dG/d(deldelY)"""
+    return np.tile(np.eye(2), (len(xv), 1, 1))
+
+
+def Yaf_v(xv):
+    """Vectorized analytical solution"""
+    (x, y) = xv.T
+    return np.exp(-x)*(x + y**3)
+
+
+def delYaf_v(xv):
+    """Vectorized analytical gradient"""
+    (x, y) = xv.T
+    dYa_dx = np.exp(-x)*(1 - x - y**3)
+    dYa_dy = 3*np.exp(-x)*y**2
+    return np.stack((dYa_dx, dYa_dy), axis=1)
+
+
+def deldelYaf_v(xv):
+    """Vectorized analytical Hessian"""
+    (x, y) = xv.T
+    d2Ya_dxdx = np.exp(-x)*(x + y**3 - 2)
+    d2Ya_dxdy = -3*np.exp(-x)*y**2
+    d2Ya_dydy = 6*np.exp(-x)*y
+    return np.stack((np.stack((d2Ya_dxdx, d2Ya_dxdy), axis=1),
+                     np.stack((d2Ya_dxdy, d2Ya_dydy), axis=1)), axis=1)
+
+
 if __name__ == '__main__':
 
     # Values to use in computing test values
@@ -347,3 +398,25 @@ if __name__ == '__main__':
     for j1 in range(m):
         for j2 in range(m):
             assert np.isclose(deldelYaf[j1][j2](xv_test), deldelYa_ref[j1][j2])
+
+    print('Testing vectorized differential equation and derivatives.')
+    np.random.seed(0)
+    X = np.random.rand(4, m)
+    Y = np.random.rand(4)
+    delY = np.random.rand(4, m)
+    deldelY = np.random.rand(4, m, m)
+    args = list(zip(X, Y, delY, deldelY))
+    assert np.allclose(Gf_v(X, Y, delY, deldelY), [Gf(*a) for a in args])
+    assert np.allclose(dG_dYf_v(X, Y, delY, deldelY),
+                       [dG_dYf(*a) for a in args])
+    assert np.allclose(dG_ddelYf_v(X, Y, delY, deldelY),
+                       [[f(*a) for f in dG_ddelYf] for a in args])
+    assert np.allclose(dG_ddeldelYf_v(X, Y, delY, deldelY),
+                       [[[f(*a) for f in ff] for ff in dG_ddeldelYf]
+                        for a in args])
+
+    print('Testing vectorized analytical solution and derivatives.')
+    assert np.allclose(Yaf_v(X), [Yaf(x) for x in X])
+    assert np.allclose(delYaf_v(X), [[f(x) for f in delYaf] for x in X])
+    assert np.allclose(deldelYaf_v(X),
+                       [[[f(x) for f in ff] for ff in deldelYaf] for x in X])
@@ -0,0 +1,447 @@
+###############################################################################
+"""
+eqgen - Generate diffusion equation definition modules from sympy expressions
+
+This module creates the source code for an equation definition module of the
+form used by PDE2DIFF, from sympy expressions for the differential equation
+G, the boundary conditions, and (optionally) the analytical solution. All of
+the derivative functions are computed symbolically. The generated module
+contains:
+
+    * The scalar functions Gf, dG_dYf, dG_ddelYf, dG_ddel2Yf, bcf, delbcf,
+      del2bcf, and Yaf, delYaf, del2Yaf if an analytical solution is given.
+
+    * The values dG_dY_const, dG_ddelY_const and dG_ddel2Y_const of the
+      derivatives of G which do not depend on the point or on Y.
+
+    * The optimized boundary condition function Af and its gradient and
+      Laplacian components, delAf and del2Af, computed from the boundary
+      conditions with the transfinite interpolation used by the trial
+      functions.
+
+    * Array versions (suffix '_v') of the equation, A, and analytical
+      solution functions, evaluated with NumPy after common subexpression
+      elimination.
+
+The source can be written to a file, or compiled into a module which can
+then be loaded by name with PDE2DIFF.
+
+Example:
+    Define a 1-D diffusion problem and load it.
+        (x, t) = sp.symbols('x t')
+        (Y, delY, del2Y) = pde2diff_symbols((x, t))
+        D = sp.Symbol('D')
+        G = delY[1] - D*del2Y[0]
+        bc = [[0, 0], [sp.sin(sp.pi*x), None]]
+        src = pde2diff_source((x, t), G, bc, params={'D': 0.1})
+        build_module('diff1d_gen', src)
+        eq = PDE2DIFF('diff1d_gen')
+
+    Write the generated module to a file.
+        write_module('eq/diff1d_gen.py', src)
+
+Attributes:
+    None
+
+Methods:
+    pde2diff_symbols(xv) - Create the sympy symbols for Y, delY and del2Y
+    pde2diff_source(xv, G, bc, Ya, params, doc) - Create the source code
+        for an equation module
+    build_module(name, source) - Compile source into a module importable
+        as name
+    write_module(path, source) - Write source to a file
+
+Notes:
+    sympy is only needed to generate a module. The generated modules only
+    use math and numpy.
+
+    The last coordinate is time, for which only the boundary condition at
+    t=0 is used.
+
+Todo:
+
+"""
+
+
+import sys
+import types
+
+try:
+    import sympy as sp
+    from sympy.printing.numpy import NumPyPrinter
+    from sympy.printing.pycode import PythonCodePrinter
+except ImportError:
+    sp = None
+
+
+# Names of the boundary condition functions for each spatial dimension.
+BC_NAMES = ('f', 'g', 'h')
+
+
+def pde2diff_symbols(xv):
+    """Create the symbols for Y and its gradient and Laplacian components."""
+    assert sp is not None, "sympy is required to generate equation modules."
+    names = [str(c) for c in xv]
+    Y = sp.Symbol('Y')
+    delY = sp.symbols(['dY_d%s' % c for c in names])
+    del2Y = sp.symbols(['d2Y_d%s2' % c for c in names])
+    return (Y, delY, del2Y)
+
+
+def pde2diff_source(xv, G, bc, Ya=None, params=None, doc=None):
+    """Create the source code for a diffusion equation module."""
+    assert sp is not None, "sympy is required to generate equation modules."
+    m = len(xv)
+    assert 2 <= m <= 4
+    assert len(bc) == m
+    params = params or {}
+    (Y, delY, del2Y) = pde2diff_symbols(xv)
+    names = [str(c) for c in xv]
+    xvar = ''.join(names)
+    gen = _Generator(xv, xvar, Y, delY, del2Y)
+
+    # Boundary condition expressions, with the face coordinate fixed.
+    bcx = []
+    for (j, (b0, b1)) in enumerate(bc):
+        f0 = sp.sympify(b0).subs(xv[j], 0)
+        f1 = None if j == m - 1 else sp.sympify(b1).subs(xv[j], 1)
+        bcx.append((f0, f1))
+    A = _transfinite(xv, bcx)
+
+    # Module docstring and parameters.
+    lines = ['"""']
+    lines.append(doc.strip() if doc else '%d-D diffusion PDE' % (m - 1))
+    lines.append('')
+    lines.append('Generated from the sympy expressions:')
+    lines.append('')
+    lines.append('G = %s' % G)
+    for (j, (f0, f1)) in enumerate(bcx):
+        lines.append('Y(%s) = %s' % (_face(names, j, 0), f0))
+        if f1 is not None:
+            lines.append('Y(%s) = %s' % (_face(names, j, 1), f1))
+    if Ya is not None:
+        lines.append('Ya = %s' % Ya)
+    lines += ['"""', '', '', 'import math', 'import numpy as np', '']
+    for (k, v) in params.items():
+        lines.append('%s = %r' % (k, v))
+    if params:
+        lines.append('')
+    src = '\n'.join(lines) + '\n'
+
+    # Differential equation and derivatives.
+    dG_dY = sp.diff(G, Y)
+    dG_ddelY = [sp.diff(G, d) for d in delY]
+    dG_ddel2Y = [sp.diff(G, d) for d in del2Y]
+    src += '\n' + gen.G_scalar('Gf', G, 'The differential equation')
+    src += '\n' + gen.G_scalar('dG_dYf', dG_dY, 'Partial of PDE wrt Y')
+    for (j, c) in enumerate(names):
+        src += '\n' + gen.G_scalar('dG_dY_d%sf' % c, dG_ddelY[j],
+                                   'Partial of PDE wrt dY/d%s' % c)
+    src += '\ndG_ddelYf = [%s]\n\n' % \
+        ', '.join('dG_dY_d%sf' % c for c in names)
+    for (j, c) in enumerate(names):
+        src += '\n' + gen.G_scalar('dG_d2Y_d%s2f' % c, dG_ddel2Y[j],
+                                   'Partial of PDE wrt d2Y/d%s2' % c)
+    src += '\ndG_ddel2Yf = [%s]\n\n' % \
+        ', '.join('dG_d2Y_d%s2f' % c for c in names)
+    src += gen.G_constants((('dG_dY_const', dG_dY),
+                            ('dG_ddelY_const', dG_ddelY),
+                            ('dG_ddel2Y_const', dG_ddel2Y)))
+
+    # Boundary conditions and derivatives.
+    bcnames = [BC_NAMES[j] for j in range(m - 1)] + ['Y']
+    for (j, (f0, f1)) in enumerate(bcx):
+        for (k, f) in enumerate((f0, f1)):
+            src += '\n' + gen.x_scalar(
+                '%s%df' % (bcnames[j], k), f,
+                'Boundary condition at (%s)' % _face(names, j, k))
+    src += '\nbcf = [%s]\n\n' % ', '.join(
+        '[%s0f, %s1f]' % (b, b) for b in bcnames)
+    for (order, prefix) in ((1, 'd'), (2, 'd2')):
+        for (j, (f0, f1)) in enumerate(bcx):
+            for (k, f) in enumerate((f0, f1)):
+                for c in xv:
+                    fn = '%s%s%d_d%s%sf' % (prefix, bcnames[j], k, c,
+                                            '2' if order == 2 else '')
+                    df = None if f is None else sp.diff(f, c, order)
+                    src += '\n' + gen.x_scalar(
+                        fn, df, '%s derivative of BC wrt %s at (%s)' %
+                        ('1st' if order == 1 else '2nd', c,
+                         _face(names, j, k)))
+        listname = 'delbcf' if order == 1 else 'del2bcf'
+        src += '\n%s = [%s]\n\n' % (listname, ',\n    '.join(
+            '[%s]' % ', '.join(
+                '[%s]' % ', '.join(
+                    '%s%s%d_d%s%sf' % (prefix, b, k, c,
+                                       '2' if order == 2 else '')
+                    for c in names)
+                for k in (0, 1))
+            for b in bcnames))
+
+    # Optimized boundary condition function.
+    delA = [sp.diff(A, c) for c in xv]
+    del2A = [sp.diff(A, c, 2) for c in xv]
+    src += '\n' + gen.x_scalar('Af', A, 'Optimized version of boundary '
+                               'condition function')
+    src += '\n' + gen.x_scalar('delAf', delA, 'Optimized version of '
+                               'boundary condition function gradient')
+    src += '\n' + gen.x_scalar('del2Af', del2A, 'Optimized version of '
+                               'boundary condition function Laplacian')
+
+    # Analytical solution.
+    if Ya is not None:
+        delYa = [sp.diff(Ya, c) for c in xv]
+        del2Ya = [sp.diff(Ya, c, 2) for c in xv]
+        src += '\n\n' + gen.x_scalar('Yaf', Ya, 'Analytical solution')
+        for (j, c) in enumerate(names):
+            src += '\n' + gen.x_scalar('dYa_d%sf' % c, delYa[j],
+                                       'Analytical %s-gradient' % c)
+        src += '\ndelYaf = [%s]\n\n' % \
+            ', '.join('dYa_d%sf' % c for c in names)
+        for (j, c) in enumerate(names):
+            src += '\n' + gen.x_scalar('d2Ya_d%s2f' % c, del2Ya[j],
+                                       'Analytical %s-Laplacian' % c)
+        src += '\ndel2Yaf = [%s]\n\n' % \
+            ', '.join('d2Ya_d%s2f' % c for c in names)
+
+    # Array versions.
+    src += ('\n# Array versions of the equation functions, for n points at '
+            'once.\n\n')
+    src += gen.G_vector('Gf_v', G, 'Vectorized version of the differential '
+                        'equation')
+    src += '\n' + gen.G_vector('dG_dYf_v', dG_dY,
+                               'Vectorized partial of PDE wrt Y')
+    src += '\n' + gen.G_vector('dG_ddelYf_v', dG_ddelY,
+                               'Vectorized partials of PDE wrt delY')
+    src += '\n' + gen.G_vector('dG_ddel2Yf_v', dG_ddel2Y,
+                               'Vectorized partials of PDE wrt del2Y')
+    src += '\n\n' + gen.x_vector('Af_v', A, 'Vectorized version of boundary '
+                                 'condition function')
+    src += '\n' + gen.x_vector('delAf_v', delA, 'Vectorized version of '
+                               'boundary condition function gradient')
+    src += '\n' + gen.x_vector('del2Af_v', del2A, 'Vectorized version of '
+                               'boundary condition function Laplacian')
+    if Ya is not None:
+        src += '\n\n' + gen.x_vector('Yaf_v', Ya,
+                                     'Vectorized analytical solution')
+        src += '\n' + gen.x_vector('delYaf_v', delYa,
+                                   'Vectorized analytical gradient')
+        src += '\n' + gen.x_vector('del2Yaf_v', del2Ya,
+                                   'Vectorized analytical Laplacian')
+    return src
+
+
+def build_module(name, source):
+    """Compile source into a module which can be imported as name."""
+    mod = types.ModuleType(name)
+    mod.__file__ = '<eqgen:%s>' % name
+    exec(compile(source, mod.__file__, 'exec'), mod.__dict__)
+    sys.modules[name] = mod
+    return mod
+
+
+def write_module(path, source):
+    """Write the source for a generated module to a file."""
+    with open(path, 'w') as f:
+        f.write(source)
+
+
+# Internal functions below this point
+
+def _face(names, j, k):
+    """Describe the boundary face x[j] = k, e.g. '0,y,t'."""
+    return ','.join(str(k) if i == j else c for (i, c) in enumerate(names))
+
+
+def _transfinite(xv, bcx):
+    """Compute the transfinite boundary condition function A."""
+
+    def project(g, k):
+        """Interpolate g from its values on the faces of the first k axes."""
+        if k == 0:
+            return sp.Integer(0)
+        h = project(g, k - 1)
+        c = xv[k - 1]
+        return (h + (1 - c)*(g.subs(c, 0) - h.subs(c, 0)) +
+                c*(g.subs(c, 1) - h.subs(c, 1)))
+
+    A = sp.Integer(0)
+    for (j, (f0, f1)) in enumerate(bcx):
+        c = xv[j]
+        A += (1 - c)*(f0 - project(f0, j).subs(c, 0))
+        if f1 is not None:
+            A += c*(f1 - project(f1, j).subs(c, 1))
+    return A
+
+
+class _Generator():
+    """Source code printer for scalar and array equation functions"""
+
+    def __init__(self, xv, xvar, Y, delY, del2Y):
+        self.xv = xv
+        self.xvar = xvar
+        self.Gargs = '%s, Y, delY, del2Y' % xvar
+        self.xunpack = '(%s)' % ', '.join(str(c) for c in xv)
+        self.delunpack = '(%s)' % ', '.join(str(d) for d in delY)
+        self.del2unpack = '(%s)' % ', '.join(str(d) for d in del2Y)
+        self.vars = set(xv) | {Y} | set(delY) | set(del2Y)
+        self.scalar = PythonCodePrinter()
+        self.vector = NumPyPrinter()
+
+    def G_scalar(self, name, expr, doc):
+        """Scalar function of (x, Y, delY, del2Y)"""
+        head = ['%s = %s' % (self.xunpack, self.xvar),
+                '%s = delY' % self.delunpack,
+                '%s = del2Y' % self.del2unpack]
+        return self.__function(name, self.Gargs, doc, head, expr, False)
+
+    def G_vector(self, name, expr, doc):
+        """Array function of (X, Y, delY, del2Y)"""
+        head = ['%s = %s.T' % (self.xunpack, self.xvar),
+                '%s = delY.T' % self.delunpack,
+                '%s = del2Y.T' % self.del2unpack]
+        return self.__function(name, self.Gargs, doc, head, expr, True)
+
+    def G_constants(self, derivs):
+        """Declarations of the (name, expr) derivatives which are
+        constant"""
+        lines = []
+        for (name, expr) in derivs:
+            exprs = expr if isinstance(expr, list) else [expr]
+            exprs = [sp.sympify(e) for e in exprs]
+            if any(e.free_symbols & self.vars for e in exprs):
+                continue
+            values = [self.__print(e, False) for e in exprs]
+            if isinstance(expr, list):
+                lines.append('%s = [%s]' % (name, ', '.join(values)))
+            else:
+                lines.append('%s = %s' % (name, values[0]))
+        if not lines:
+            return ''
+        return '\n' + '\n'.join(lines) + '\n\n'
+
+    def x_scalar(self, name, expr, doc):
+        """Scalar function of the point x"""
+        head = ['%s = %s' % (self.xunpack, self.xvar)]
+        return self.__function(name, self.xvar, doc, head, expr, False)
+
+    def x_vector(self, name, expr, doc):
+        """Array function of the points X"""
+        head = ['%s = %s.T' % (self.xunpack, self.xvar)]
+        return self.__function(name, self.xvar, doc, head, expr, True)
+
+    def __function(self, name, args, doc, head, expr, vector):
+        """Print a function computing an expression or list of them."""
+        lines = ['def %s(%s):' % (name, args), '    """%s"""' % doc]
+        lines += ['    ' + h for h in head]
+        if expr is None:
+            lines.append('    return None')
+            return '\n'.join(lines) + '\n'
+        exprs = expr if isinstance(expr, list) else [expr]
+        exprs = [sp.sympify(e) for e in exprs]
+        (reps, reduced) = sp.cse(exprs, symbols=sp.numbered_symbols('cse'))
+        varying = set(self.vars)
+        for (s, e) in reps:
+            lines.append('    %s = %s' % (s, self.__print(e, vector)))
+            if e.free_symbols & varying:
+                varying.add(s)
+        values = []
+        for e in reduced:
+            value = self.__print(e, vector)
+            if vector and not (e.free_symbols & varying):
+                value = 'np.full(len(%s), %s, dtype=float)' % \
+                    (self.xvar, value)
+            values.append(value)
+        if not isinstance(expr, list):
+            lines.append('    return %s' % values[0])
+        elif vector:
+            lines.append('    return np.stack((%s), axis=1)' %
+                         ', '.join(values))
+        else:
+            lines.append('    return [%s]' % ', '.join(values))
+        return '\n'.join(lines) + '\n'
+
+    def __print(self, expr, vector):
+        """Print an expression as Python code."""
+        if vector:
+            return self.vector.doprint(expr).replace('numpy.', 'np.')
+        return self.scalar.doprint(expr)
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    import numpy as np
+
+    # Regenerate the 2-D diffusion problem eq/diff2d_halfsine.py.
+    (x, y, t) = sp.symbols('x y t')
+    (Y, delY, del2Y) = pde2diff_symbols((x, y, t))
+    D = sp.Symbol('D')
+    G = delY[2] - D*(del2Y[0] + del2Y[1])
+    bc = [[0, 0], [0, 0], [sp.sin(sp.pi*x)*sp.sin(sp.pi*y), None]]
+    Ya = sp.exp(-2*sp.pi**2*D*t)*sp.sin(sp.pi*x)*sp.sin(sp.pi*y)
+    src = pde2diff_source((x, y, t), G, bc, Ya=Ya, params={'D': 0.1})
+    gen = build_module('diff2d_halfsine_eqgen', src)
+
+    import diff2d_halfsine as ref
+
+    np.random.seed(0)
+    X = np.random.rand(5, 3)
+    Yv = np.random.rand(5)
+    delYv = np.random.rand(5, 3)
+    del2Yv = np.random.rand(5, 3)
+    args = (X, Yv, delYv, del2Yv)
+
+    print("Testing generated differential equation functions.")
+    for f in ('Gf_v', 'dG_dYf_v', 'dG_ddelYf_v', 'dG_ddel2Yf_v'):
+        if not np.allclose(getattr(gen, f)(*args), getattr(ref, f)(*args)):
+            print("ERROR: Generated %s() is incorrect!" % f)
+    for (i, xx) in enumerate(X):
+        a = (xx, Yv[i], delYv[i], del2Yv[i])
+        if not np.isclose(gen.Gf(*a), ref.Gf(*a)):
+            print("ERROR: Generated Gf() is incorrect!")
+        for j in range(3):
+            if not np.isclose(gen.dG_ddel2Yf[j](*a), ref.dG_ddel2Yf[j](*a)):
+                print("ERROR: Generated dG_ddel2Yf[%d]() is incorrect!" % j)
+
+    print("Testing generated boundary conditions.")
+    for xx in X:
+        for j in range(3):
+            for k in range(2):
+                if ref.bcf[j][k](xx) is None:
+                    if gen.bcf[j][k](xx) is not None:
+                        print("ERROR: Generated bcf[%d][%d]() is not None!" %
+                              (j, k))
+                    continue
+                if not np.isclose(gen.bcf[j][k](xx), ref.bcf[j][k](xx)):
+                    print("ERROR: Generated bcf[%d][%d]() is incorrect!" %
+                          (j, k))
+                for l in range(3):
+                    if not np.isclose(gen.delbcf[j][k][l](xx),
+                                      ref.delbcf[j][k][l](xx)):
+                        print("ERROR: Generated delbcf[%d][%d][%d]() is "
+                              "incorrect!" % (j, k, l))
+                    if not np.isclose(gen.del2bcf[j][k][l](xx),
+                                      ref.del2bcf[j][k][l](xx)):
+                        print("ERROR: Generated del2bcf[%d][%d][%d]() is "
+                              "incorrect!" % (j, k, l))
+
+    print("Testing generated boundary condition function.")
+    for f in ('Af_v', 'delAf_v', 'del2Af_v', 'Yaf_v', 'delYaf_v',
+              'del2Yaf_v'):
+        if not np.allclose(getattr(gen, f)(X), getattr(ref, f)(X)):
+            print("ERROR: Generated %s() is incorrect!" % f)
+    if not np.allclose([gen.Af(xx) for xx in X], gen.Af_v(X)):
+        print("ERROR: Generated Af() does not match Af_v()!")
+
+    print("Testing generated module with PDE2DIFF.")
+    from pde2diff import PDE2DIFF
+    eq = PDE2DIFF('diff2d_halfsine_eqgen')
+    if not np.allclose(eq.Gf_v(*args), ref.Gf_v(*args)):
+        print("ERROR: PDE2DIFF did not load the generated module!")
+    for c in ('dG_dY_const', 'dG_ddelY_const', 'dG_ddel2Y_const'):
+        if not np.allclose(getattr(eq, c), getattr(ref, c)):
+            print("ERROR: Generated %s is incorrect!" % c)
@@ -0,0 +1,308 @@
+###############################################################################
+"""
+kernels - Training kernels for the single-hidden-layer network, with an
+optional Numba JIT-compiled backend
+
+For a network with m inputs and H hidden nodes:
+
+z = x.w + u
+N = s(z).v
+
+the training algorithms need the network output N, its gradient delN and
+the diagonal second derivatives del2N at each training point, and then
+parameter derivatives of these terms, weighted by coefficients computed
+from the differential equation and the trial function. These kernels
+compute both steps for an (n, m) array of points x, with w an (m, H) array,
+and u and v (H,) arrays. The parameter derivatives are ordered as in the
+packed parameter vector p = [w.flatten(), u, v].
+
+The 'numpy' kernels are vectorized, and create several (n, H)
+temporaries. The 'numba' kernels are explicit loops over the points and
+hidden nodes, compiled with Numba, which compute everything for one point
+and hidden node at a time, so they create no temporaries larger than their
+results. They release the GIL, so they can be run on a thread pool.
+
+Example:
+    Compute the network output and its derivatives with the compiled
+    kernels.
+        kern = get_kernels('numba')
+        (N, delN, del2N) = kern.forward(x, w, u, v)
+
+    Compute the gradient of sum(a0*N + a1*delN + a2*del2N) wrt the network
+    parameters.
+        g = kern.gradient(x, w, u, v, a0, a1, a2)
+
+Attributes:
+    BACKENDS - Tuple of the backend names
+    HAVE_NUMBA - True if Numba is installed
+    Kernels - Named tuple of the (forward, gradient, jacobian) kernels
+
+Methods:
+    get_kernels(backend) - Return the kernels for a backend
+    forward(x, w, u, v) - Compute N, delN and del2N with loop kernels
+    gradient(x, w, u, v, a0, a1, a2) - Compute the weighted sum over points
+        of the parameter derivatives of N, delN and del2N with loop kernels
+    jacobian(x, w, u, v, c0, c1, c2) - Compute the weighted parameter
+        derivatives for each point with loop kernels
+
+Notes:
+    Numba is optional. If it is not installed, get_kernels('numba') warns,
+    and returns the NumPy kernels, and the loop kernels forward(),
+    gradient() and jacobian() run as (slow) pure Python.
+
+    The first call of each compiled kernel includes the compilation time.
+    The compiled code is cached on disk for later runs.
+
+Todo:
+    * Add a parallel (prange) version of the loop kernels.
+"""
+
+
+from collections import namedtuple
+from math import exp
+import warnings
+
+import numpy as np
+
+from sigma import sigma_derivatives_v
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Backend names
+BACKENDS = ('numpy', 'numba')
+
+# True if the compiled kernels are available.
+HAVE_NUMBA = numba is not None
+
+# The kernels for one backend
+Kernels = namedtuple('Kernels', ('forward', 'gradient', 'jacobian'))
+
+
+def get_kernels(backend='numpy'):
+    """Return the Kernels for the named backend. The NumPy kernels are
+    returned for 'numba' if Numba is not installed."""
+    assert backend in BACKENDS
+    if backend == 'numba' and not HAVE_NUMBA:
+        warnings.warn('Numba is not installed, using the NumPy kernels.')
+        backend = 'numpy'
+    return _KERNELS[backend]
+
+
+# Vectorized kernels
+
+def _forward_numpy(x, w, u, v):
+    """Compute N, delN and del2N at each point, vectorized."""
+    (s, s1, s2) = sigma_derivatives_v(x.dot(w) + u, 2)
+    return (s.dot(v), s1.dot((w*v).T), s2.dot((w**2*v).T))
+
+
+def _gradient_numpy(x, w, u, v, a0, a1, a2):
+    """Compute the weighted parameter derivatives summed over the points,
+    vectorized."""
+    (s, s1, s2, s3) = sigma_derivatives_v(x.dot(w) + u, 3)
+    b1 = a1.dot(w)
+    b2 = a2.dot(w**2)
+    q = a0[:, np.newaxis]*s1 + s2*b1 + s3*b2
+    g_w = v*(x.T.dot(q) + a1.T.dot(s1) + 2*w*a2.T.dot(s2))
+    g_u = v*np.sum(q, axis=0)
+    g_v = np.sum(a0[:, np.newaxis]*s + s1*b1 + s2*b2, axis=0)
+    return np.hstack((g_w.flatten(), g_u, g_v))
+
+
+def _jacobian_numpy(x, w, u, v, c0, c1, c2):
+    """Compute the weighted parameter derivatives at each point,
+    vectorized."""
+    (n, m) = x.shape
+    H = len(v)
+    (s, s1, s2, s3) = sigma_derivatives_v(x.dot(w) + u, 3)
+    b1 = c1.dot(w)
+    b2 = c2.dot(w**2)
+    q = c0[:, np.newaxis]*s1 + s2*b1 + s3*b2
+    J_w = v*(x[:, :, np.newaxis]*q[:, np.newaxis, :] +
+             c1[:, :, np.newaxis]*s1[:, np.newaxis, :] +
+             2*w*c2[:, :, np.newaxis]*s2[:, np.newaxis, :])
+    J_u = v*q
+    J_v = c0[:, np.newaxis]*s + s1*b1 + s2*b2
+    return np.hstack((J_w.reshape((n, m*H)), J_u, J_v))
+
+
+# Loop kernels, compiled if Numba is installed
+
+def _sigma(z):
+    """Compute sigma and its first 3 derivatives for a scalar z."""
+    if z >= 0:
+        s = 1/(1 + exp(-z))
+    else:
+        e = exp(z)
+        s = e/(1 + e)
+    s1 = s*(1 - s)
+    return (s, s1, s1*(1 - 2*s), s1*(1 - 6*s1))
+
+
+def _forward_loops(x, w, u, v):
+    """Compute N, delN and del2N at each point, with loops."""
+    (n, m) = x.shape
+    H = v.shape[0]
+    N = np.zeros(n)
+    delN = np.zeros((n, m))
+    del2N = np.zeros((n, m))
+    for i in range(n):
+        for k in range(H):
+            z = u[k]
+            for j in range(m):
+                z += x[i, j]*w[j, k]
+            (s, s1, s2, s3) = _sigma(z)
+            N[i] += v[k]*s
+            for j in range(m):
+                delN[i, j] += v[k]*s1*w[j, k]
+                del2N[i, j] += v[k]*s2*w[j, k]**2
+    return (N, delN, del2N)
+
+
+def _gradient_loops(x, w, u, v, a0, a1, a2):
+    """Compute the weighted parameter derivatives summed over the points,
+    with loops."""
+    (n, m) = x.shape
+    H = v.shape[0]
+    g = np.zeros((m + 2)*H)
+    for i in range(n):
+        for k in range(H):
+            z = u[k]
+            b1 = 0.0
+            b2 = 0.0
+            for j in range(m):
+                z += x[i, j]*w[j, k]
+                b1 += a1[i, j]*w[j, k]
+                b2 += a2[i, j]*w[j, k]**2
+            (s, s1, s2, s3) = _sigma(z)
+            q = a0[i]*s1 + s2*b1 + s3*b2
+            for j in range(m):
+                g[j*H + k] += v[k]*(x[i, j]*q + a1[i, j]*s1 +
+                                    2*w[j, k]*a2[i, j]*s2)
+            g[m*H + k] += v[k]*q
+            g[(m + 1)*H + k] += a0[i]*s + s1*b1 + s2*b2
+    return g
+
+
+def _jacobian_loops(x, w, u, v, c0, c1, c2):
+    """Compute the weighted parameter derivatives at each point, with
+    loops."""
+    (n, m) = x.shape
+    H = v.shape[0]
+    J = np.zeros((n, (m + 2)*H))
+    for i in range(n):
+        for k in range(H):
+            z = u[k]
+            b1 = 0.0
+            b2 = 0.0
+            for j in range(m):
+                z += x[i, j]*w[j, k]
+                b1 += c1[i, j]*w[j, k]
+                b2 += c2[i, j]*w[j, k]**2
+            (s, s1, s2, s3) = _sigma(z)
+            q = c0[i]*s1 + s2*b1 + s3*b2
+            for j in range(m):
+                J[i, j*H + k] = v[k]*(x[i, j]*q + c1[i, j]*s1 +
+                                      2*w[j, k]*c2[i, j]*s2)
+            J[i, m*H + k] = v[k]*q
+            J[i, (m + 1)*H + k] = c0[i]*s + s1*b1 + s2*b2
+    return J
+
+
+if HAVE_NUMBA:
+    # The loop kernels look up _sigma() when they are compiled, so it must
+    # be compiled first.
+    _jit = numba.njit(cache=True, nogil=True)
+    _sigma = _jit(_sigma)
+    forward = _jit(_forward_loops)
+    gradient = _jit(_gradient_loops)
+    jacobian = _jit(_jacobian_loops)
+else:
+    forward = _forward_loops
+    gradient = _gradient_loops
+    jacobian = _jacobian_loops
+
+_KERNELS = {
+    'numpy': Kernels(_forward_numpy, _gradient_numpy, _jacobian_numpy),
+    'numba': Kernels(forward, gradient, jacobian)
+    }
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    from time import time
+
+    # Small random problem to check the loop kernels.
+    rng = np.random.RandomState(0)
+    (n, m, H) = (20, 3, 5)
+    x = rng.uniform(0, 1, (n, m))
+    w = rng.uniform(-1, 1, (m, H))
+    u = rng.uniform(-1, 1, H)
+    v = rng.uniform(-1, 1, H)
+    a0 = rng.uniform(-1, 1, n)
+    a1 = rng.uniform(-1, 1, (n, m))
+    a2 = rng.uniform(-1, 1, (n, m))
+    knp = get_kernels('numpy')
+
+    print("Testing forward kernels.")
+    for (r_loop, r_np) in zip(_forward_loops(x, w, u, v),
+                              knp.forward(x, w, u, v)):
+        if not np.allclose(r_loop, r_np):
+            print("ERROR: Loop and NumPy forward kernels differ!")
+
+    print("Testing gradient kernels against finite differences.")
+    p = np.hstack((w.flatten(), u, v))
+
+    def objective(p):
+        (N, delN, del2N) = knp.forward(x, p[:m*H].reshape((m, H)),
+                                       p[m*H:(m + 1)*H], p[(m + 1)*H:])
+        return a0.dot(N) + np.sum(a1*delN) + np.sum(a2*del2N)
+
+    h = 1e-6
+    g_fd = np.array([(objective(p + h*e) - objective(p - h*e))/(2*h)
+                     for e in np.eye(len(p))])
+    if not np.allclose(knp.gradient(x, w, u, v, a0, a1, a2), g_fd,
+                       atol=1e-6):
+        print("ERROR: NumPy gradient kernel is incorrect!")
+    if not np.allclose(_gradient_loops(x, w, u, v, a0, a1, a2), g_fd,
+                       atol=1e-6):
+        print("ERROR: Loop gradient kernel is incorrect!")
+
+    print("Testing Jacobian kernels.")
+    J_np = knp.jacobian(x, w, u, v, a0, a1, a2)
+    if not np.allclose(_jacobian_loops(x, w, u, v, a0, a1, a2), J_np):
+        print("ERROR: Loop and NumPy Jacobian kernels differ!")
+    if not np.allclose(J_np.sum(axis=0), g_fd, atol=1e-6):
+        print("ERROR: Jacobian rows do not sum to the gradient!")
+
+    # Benchmark the backends for a 3-D problem.
+    (n, H) = (100000, 10)
+    x = rng.uniform(0, 1, (n, m))
+    a0 = rng.uniform(-1, 1, n)
+    a1 = rng.uniform(-1, 1, (n, m))
+    a2 = rng.uniform(-1, 1, (n, m))
+    w = rng.uniform(-1, 1, (m, H))
+    u = rng.uniform(-1, 1, H)
+    v = rng.uniform(-1, 1, H)
+    if not HAVE_NUMBA:
+        print("Numba is not installed, benchmarking the NumPy kernels only.")
+    for backend in BACKENDS:
+        if backend == 'numba' and not HAVE_NUMBA:
+            continue
+        kern = get_kernels(backend)
+        kern.gradient(x[:10], w, u, v, a0[:10], a1[:10], a2[:10])
+        t0 = time()
+        kern.forward(x, w, u, v)
+        t1 = time()
+        kern.gradient(x, w, u, v, a0, a1, a2)
+        t2 = time()
+        print("%s kernels, n = %d, H = %d: forward %.4f s, gradient %.4f s" %
+              (backend, n, H, t1 - t0, t2 - t1))
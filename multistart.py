@@ -0,0 +1,163 @@
+###############################################################################
+"""
+multistart - Train independent copies of a network from different random
+starting parameters in parallel, and keep the best
+
+The result of training depends strongly on the random initial network
+parameters. train_multistart() trains n_starts networks, each created by
+net_factory(), in a pool of worker processes. Each start uses its own
+random number stream, spawned from a single seed, so the results are
+reproducible and do not depend on the number of workers. The training
+points are placed in shared memory once, rather than being copied to each
+task.
+
+Example:
+    Train 8 networks for a diffusion problem in 4 processes, and keep the
+    one with the smallest RMS residual.
+        def factory():
+            return NNPDE2DIFF(PDE2DIFF('diff2d_halfsine'))
+        (net, stats) = train_multistart(factory, x, 8, workers=4,
+                                        trainalg='BFGS', seed=0)
+
+Attributes:
+    None
+
+Methods:
+    train_multistart(net_factory, x, n_starts, workers, trainalg, opts,
+        options, seed, score) - Train networks from n_starts random starts
+        and return the best network and the statistics for each start
+
+Notes:
+    net_factory and score must be picklable, e.g. module-level functions.
+
+    The networks are trained in the worker processes, and only their
+    parameters are returned, so the best network is recreated in the
+    calling process with net_factory().
+
+    By default, a network is scored by the RMS of net.residual(x), so
+    networks without a residual() method need a score function.
+
+Todo:
+
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from time import time
+
+import numpy as np
+
+from slffnn import random_generator
+
+
+def train_multistart(net_factory, x, n_starts, workers=None,
+                     trainalg=None, opts=None, options=None, seed=None,
+                     score=None):
+    """Train n_starts networks from net_factory() on points x, using
+    workers processes, and return (net, stats), where net is the network
+    with the lowest score and stats is a list of per-start dictionaries
+    with keys 'start', 'seed', 'score' and 'time'."""
+    assert n_starts > 0
+    x = np.ascontiguousarray(x, dtype=float)
+
+    # Create an independent, reproducible seed for each start.
+    seeds = [s.generate_state(1)[0]
+             for s in np.random.SeedSequence(seed).spawn(n_starts)]
+    tasks = [(net_factory, start, int(seeds[start]), trainalg, opts,
+              options, score) for start in range(n_starts)]
+
+    # Train in this process, or share the training points with a pool of
+    # worker processes.
+    if workers == 1:
+        results = [_train_start(x, *task) for task in tasks]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(x.nbytes, 1))
+        try:
+            np.ndarray(x.shape, dtype=x.dtype, buffer=shm.buf)[...] = x
+            xinfo = (shm.name, x.shape, x.dtype.str)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_train_start_shared, xinfo, *task)
+                           for task in tasks]
+                results = [f.result() for f in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    # Recreate the best network from its parameters.
+    stats = [r[0] for r in results]
+    best = int(np.argmin([s['score'] for s in stats]))
+    net = net_factory()
+    (net.w, net.u, net.v) = results[best][1]
+    return (net, stats)
+
+
+# Internal functions below this point
+
+def _train_start_shared(xinfo, *task):
+    """Train one start in a worker, using the shared training points."""
+    (name, shape, dtype) = xinfo
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return _train_start(np.ndarray(shape, dtype=dtype, buffer=shm.buf),
+                            *task)
+    finally:
+        shm.close()
+
+
+def _train_start(x, net_factory, start, seed, trainalg, opts, options,
+                 score):
+    """Train one network from the random start given by seed."""
+
+    # Give the network its own random generator for this start.
+    net = net_factory()
+    net.rng = random_generator(seed)
+    kwargs = {}
+    if trainalg is not None:
+        kwargs['trainalg'] = trainalg
+    if opts is not None:
+        kwargs['opts'] = opts
+    if options is not None:
+        kwargs['options'] = options
+    t0 = time()
+    net.train(x, **kwargs)
+    t1 = time()
+    if score is None:
+        value = np.sqrt(np.mean(net.residual(x)**2))
+    else:
+        value = score(net, x)
+    stats = {'start': start, 'seed': seed, 'score': float(value),
+             'time': t1 - t0}
+    return (stats, (net.w, net.u, net.v))
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    from pde2diff import PDE2DIFF
+    from nnpde2diff import NNPDE2DIFF
+    from trainingdata import create_training_grid
+
+    def factory():
+        return NNPDE2DIFF(PDE2DIFF('diff1d_halfsine'))
+
+    x = create_training_grid([6, 6])
+    args = dict(trainalg='BFGS', options={'maxiter': 20}, seed=1)
+
+    print("Testing serial multistart training.")
+    (net1, stats1) = train_multistart(factory, x, 4, workers=1, **args)
+    scores1 = [s['score'] for s in stats1]
+    if not np.isclose(np.sqrt(np.mean(net1.residual(x)**2)), min(scores1)):
+        print("ERROR: Returned network is not the best network!")
+    if len(set(scores1)) != 4:
+        print("ERROR: Starts are not independent!")
+
+    print("Testing parallel multistart training.")
+    (net2, stats2) = train_multistart(factory, x, 4, workers=2, **args)
+    if [s['score'] for s in stats2] != scores1:
+        print("ERROR: Parallel results differ from serial results!")
+    if not np.array_equal(net1.v, net2.v):
+        print("ERROR: Parallel best network differs from serial!")
@@ -12,6 +12,9 @@ Example:
         net = NNODE1IVP(ode1ivp_obj)
     Create an NNODE1IVP object for a ODE1IVP object, with 20 hidden nodes.
         net = NNODE1IVP(ode1ivp_obj, nhid=20)
+    Create an NNODE1IVP object which draws its initial parameters from its
+    own random generator, seeded with 1.
+        net = NNODE1IVP(ode1ivp_obj, rng=1)
 
 Attributes:
     None
@@ -29,12 +32,15 @@ Todo:
 
 from math import sqrt
 import numpy as np
-from scipy.optimize import minimize
+from scipy.optimize import least_squares, minimize
 
 from kdelta import kdelta
 from ode1ivp import ODE1IVP
+from ode1ivptrialfunction import ODE1IVPTrialFunction
 import sigma
+from sigma import s_v, s1_v, s2_v
 from slffnn import SLFFNN
+from stochastic import minimize_stochastic
 from trainingdata import create_training_grid
 
 
@@ -66,19 +72,13 @@ DEFAULT_OPTS = {
     }
 
 
-# Vectorize sigma functions for speed.
-s_v = np.vectorize(sigma.s)
-s1_v = np.vectorize(sigma.s1)
-s2_v = np.vectorize(sigma.s2)
-
-
 class NNODE1IVP(SLFFNN):
     """Solve a 1st-order ODE IVP with a single-layer feedforward neural network."""
 
     # Public methods
 
-    def __init__(self, eq, nhid=DEFAULT_NHID):
-        super().__init__()
+    def __init__(self, eq, nhid=DEFAULT_NHID, rng=None):
+        super().__init__(rng)
 
         # Save the differential equation object.
         self.eq = eq
@@ -94,12 +94,16 @@ class NNODE1IVP(SLFFNN):
         # Initialize iteration counter.
         self.nit = 0
 
-        # Pre-vectorize (_v suffix) functions for efficiency.
-        self.G_v = np.vectorize(self.eq.G)
-        self.dG_dY_v = np.vectorize(self.eq.dG_dY)
-        self.dG_ddYdx_v = np.vectorize(self.eq.dG_ddYdx)
-        self.Yt_v = np.vectorize(self.__Yt)
-        self.dYt_dx_v = np.vectorize(self.__dYt_dx)
+        # Create the trial function Yt(x) = ic + x*N(x).
+        self.tf = ODE1IVPTrialFunction([lambda x: eq.ic], [[lambda x: 0]])
+
+        # Array (_v suffix) versions of the equation and trial functions,
+        # which evaluate all of the points at once.
+        self.G_v = self.eq.G_v
+        self.dG_dY_v = self.eq.dG_dY_v
+        self.dG_ddYdx_v = self.eq.dG_ddYdx_v
+        self.Yt_v = self.__Yt_v
+        self.dYt_dx_v = self.__dYt_dx_v
 
     def __str__(self):
         s = ''
@@ -109,7 +113,8 @@ class NNODE1IVP(SLFFNN):
         s += "v = %s\n" % self.v
         return s.rstrip()
 
-    def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS):
+    def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS,
+              options=None):
         """Train the network to solve a 1st-order ODE IVP. """
         my_opts = dict(DEFAULT_OPTS)
         my_opts.update(opts)
@@ -118,6 +123,10 @@ class NNODE1IVP(SLFFNN):
             self.__train_delta(x, my_opts)
         elif trainalg in ('Nelder-Mead', 'Powell', 'CG', 'BFGS', 'Newton-CG'):
             self.__train_minimize(x, trainalg, my_opts)
+        elif trainalg in ('lm', 'trf'):
+            self.__train_least_squares(x, trainalg, my_opts)
+        elif trainalg in ('sgd', 'momentum', 'adam'):
+            self.__train_stochastic(x, trainalg, my_opts, options)
         else:
             print('ERROR: Invalid training algorithm (%s)!' % trainalg)
             exit(1)
@@ -222,11 +231,20 @@ class NNODE1IVP(SLFFNN):
 
     def __Yt(self, x, N):
         """Trial function"""
-        return self.eq.ic + x*N
+        return self.tf.Ytf([x], N)
 
     def __dYt_dx(self, x, N, dN_dx):
         """First derivative of trial function"""
-        return x*dN_dx + N
+        return self.tf.delYtf([x], N, [dN_dx])[0]
+
+    def __Yt_v(self, x, N):
+        """Trial function for an array of points"""
+        return self.tf.Ytf_v(x[:, np.newaxis], N)
+
+    def __dYt_dx_v(self, x, N, dN_dx):
+        """First derivative of trial function for an array of points"""
+        dYt_dx = self.tf.delYtf_v(x[:, np.newaxis], N, dN_dx[:, np.newaxis])
+        return dYt_dx[:, 0]
 
     def __train_delta(self, x, opts=DEFAULT_OPTS):
         """Train the network using the delta method. """
@@ -258,9 +276,9 @@ class NNODE1IVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros(H)
@@ -375,9 +393,9 @@ class NNODE1IVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros(H)
@@ -589,9 +607,9 @@ class NNODE1IVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Assemble the network parameters into a single 1-D vector for
         # use by the minimize() method.
@@ -616,6 +634,151 @@ class NNODE1IVP(SLFFNN):
         self.u = res.x[H:2*H]
         self.v = res.x[2*H:3*H]
 
+    def __train_least_squares(self, x, trainalg, opts=DEFAULT_OPTS):
+        """Train the network using the SciPy least_squares() function. """
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert len(x) > 0
+        assert opts['vmin'] < opts['vmax']
+        assert opts['wmin'] < opts['wmax']
+        assert opts['umin'] < opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        H = len(self.v)
+        w = self.rng.uniform(my_opts['wmin'], my_opts['wmax'], H)
+        u = self.rng.uniform(my_opts['umin'], my_opts['umax'], H)
+        v = self.rng.uniform(my_opts['vmin'], my_opts['vmax'], H)
+
+        # Assemble the network parameters into a single 1-D vector for
+        # use by the least_squares() method.
+        p = np.hstack((w, u, v))
+
+        # The 'lm' method needs at least one residual per parameter.
+        assert trainalg != 'lm' or len(x) >= len(p), \
+            "The 'lm' algorithm needs at least %d training points, one per " \
+            "network parameter." % len(p)
+
+        # Minimize the sum of the squared residuals, using the residual
+        # Jacobian.
+        verbose = 2 if my_opts['verbose'] else 0
+        res = least_squares(self.__compute_residual, p,
+                            jac=self.__compute_residual_jacobian,
+                            method=trainalg, args=(x,), verbose=verbose)
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[0:H]
+        self.u = res.x[H:2*H]
+        self.v = res.x[2*H:3*H]
+
+    def __train_stochastic(self, x, trainalg, opts=DEFAULT_OPTS,
+                           options=None):
+        """Train the network using a mini-batch stochastic gradient method.
+        Any options are passed through to minimize_stochastic(). """
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert len(x) > 0
+        assert my_opts['maxepochs'] > 0
+        assert my_opts['eta'] > 0
+        assert my_opts['vmin'] < my_opts['vmax']
+        assert my_opts['wmin'] < my_opts['wmax']
+        assert my_opts['umin'] < my_opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        H = len(self.v)
+        w = self.rng.uniform(my_opts['wmin'], my_opts['wmax'], H)
+        u = self.rng.uniform(my_opts['umin'], my_opts['umax'], H)
+        v = self.rng.uniform(my_opts['vmin'], my_opts['vmax'], H)
+
+        # Assemble the network parameters into a single 1-D vector.
+        p = np.hstack((w, u, v))
+
+        # Minimize the error function, one batch of training points at a
+        # time.
+        x = np.asarray(x)
+
+        def fun(p, i):
+            return (self.__compute_error(p, x[i]),
+                    self.__compute_error_gradient(p, x[i]))
+
+        callback = None
+        if my_opts['verbose']:
+            callback = lambda p, E2: print('E2 =', E2)
+        res = minimize_stochastic(fun, p, len(x), trainalg, my_opts['eta'],
+                                  my_opts['maxepochs'], options=options,
+                                  callback=callback, rng=self.rng)
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[0:H]
+        self.u = res.x[H:2*H]
+        self.v = res.x[2*H:3*H]
+
+    def __compute_residual(self, p, x):
+        """Compute the differential equation residual at each point."""
+
+        # Unpack the network parameters (hsplit() returns views, so no copies made).
+        (w, u, v) = np.hsplit(p, 3)
+
+        # Compute the forward pass through the network.
+        z = np.outer(x, w) + u
+        s = s_v(z)
+        s1 = s1_v(s)
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        Yt = self.Yt_v(x, N)
+        dYt_dx = self.dYt_dx_v(x, N, dN_dx)
+        G = self.G_v(x, Yt, dYt_dx)
+
+        return G
+
+    def __compute_residual_jacobian(self, p, x):
+        """Compute the Jacobian of the residual wrt network parameters."""
+
+        # Unpack the network parameters (hsplit() returns views, so no copies made).
+        (w, u, v) = np.hsplit(p, 3)
+
+        # Compute the forward pass through the network.
+        z = np.outer(x, w) + u
+        s = s_v(z)
+        s1 = s1_v(s)
+        s2 = s2_v(s)
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        dN_dw = s1*np.outer(x, v)
+        dN_du = s1*v
+        dN_dv = s
+        d2N_dwdx = v*(s1 + s2*np.outer(x, w))
+        d2N_dudx = v*s2*w
+        d2N_dvdx = s1*w
+
+        # Yt = ic + x*N, so dYt/dp = x*dN/dp.
+        Yt = self.Yt_v(x, N)
+        dYt_dx = self.dYt_dx_v(x, N, dN_dx)
+        x_b = x[:, np.newaxis]
+        dYt_dw = x_b*dN_dw
+        dYt_du = x_b*dN_du
+        dYt_dv = x_b*dN_dv
+        d2Yt_dwdx = x_b*d2N_dwdx + dN_dw
+        d2Yt_dudx = x_b*d2N_dudx + dN_du
+        d2Yt_dvdx = x_b*d2N_dvdx + dN_dv
+
+        dG_dYt = self.dG_dY_v(x, Yt, dYt_dx)[:, np.newaxis]
+        dG_dYtdx = self.dG_ddYdx_v(x, Yt, dYt_dx)[:, np.newaxis]
+        dG_dw = dG_dYt*dYt_dw + dG_dYtdx*d2Yt_dwdx
+        dG_du = dG_dYt*dYt_du + dG_dYtdx*d2Yt_dudx
+        dG_dv = dG_dYt*dYt_dv + dG_dYtdx*d2Yt_dvdx
+
+        jac = np.hstack((dG_dw, dG_du, dG_dv))
+
+        return jac
+
     def __compute_error(self, p, x):
         """Compute the error function using the current parameter values."""
 
@@ -685,11 +848,7 @@ class NNODE1IVP(SLFFNN):
         """Compute the gradient of the error function wrt network
         parameters."""
 
-        # Fetch the number of training points.
-        n = len(x)
-
         # Unpack the network parameters (hsplit() returns views, so no copies made).
-        H = len(self.v)
         (w, u, v) = np.hsplit(p, 3)
 
         # Compute the forward pass through the network.
@@ -697,60 +856,36 @@ class NNODE1IVP(SLFFNN):
         s = s_v(z)
         s1 = s1_v(s)
         s2 = s2_v(s)
-
-        # WARNING: Numpy and loop code below can give different results with Newton-CG after
-        # a few iterations. The differences are very slight, but they result in significantly
-        # different values for the weights and biases. To avoid this for now, loop code has been
-        # retained for some computations below.
-
-        # N = s.dot(v)
-        N = np.zeros(n)
-        for i in range(n):
-            for k in range(H):
-                N[i] += s[i, k]*v[k]
-
-        # dN_dx = s1.dot(v*w)
-        dN_dx = np.zeros(n)
-        for i in range(n):
-            for k in range(H):
-                dN_dx[i] += s1[i, k]*v[k]*w[k]
-
-        # dN_dw = s1*np.outer(x, v)
-        dN_dw = np.zeros((n, H))
-        for i in range(n):
-            for k in range(H):
-                dN_dw[i, k] = s1[i, k]*x[i]*v[k]
-
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        dN_dw = s1*np.outer(x, v)
         dN_du = s1*v
         dN_dv = s
-
-        # d2N_dwdx = v*(s1 + s2*np.outer(x, w))
-        d2N_dwdx = np.zeros((n, H))
-        for i in range(n):
-            for k in range(H):
-                d2N_dwdx[i, k] = v[k]*(s1[i, k] + s2[i, k]*x[i]*w[k])
-
+        d2N_dwdx = v*(s1 + s2*np.outer(x, w))
         d2N_dudx = v*s2*w
         d2N_dvdx = s1*w
-        Yt = self.__Yt(x, N)
-        dYt_dx = self.__dYt_dx(x, N, dN_dx)
-        dYt_dw = np.broadcast_to(x, (H, n)).T*dN_dw
-        dYt_du = np.broadcast_to(x, (H, n)).T*dN_du
-        dYt_dv = np.broadcast_to(x, (H, n)).T*dN_dv
-        d2Yt_dwdx = np.broadcast_to(x, (H, n)).T*d2N_dwdx + dN_dw
-        d2Yt_dudx = np.broadcast_to(x, (H, n)).T*d2N_dudx + dN_du
-        d2Yt_dvdx = np.broadcast_to(x, (H, n)).T*d2N_dvdx + dN_dv
+
+        # Yt = ic + x*N, so dYt/dp = x*dN/dp.
+        Yt = self.Yt_v(x, N)
+        dYt_dx = self.dYt_dx_v(x, N, dN_dx)
+        x_b = x[:, np.newaxis]
+        dYt_dw = x_b*dN_dw
+        dYt_du = x_b*dN_du
+        dYt_dv = x_b*dN_dv
+        d2Yt_dwdx = x_b*d2N_dwdx + dN_dw
+        d2Yt_dudx = x_b*d2N_dudx + dN_du
+        d2Yt_dvdx = x_b*d2N_dvdx + dN_dv
 
         G = self.G_v(x, Yt, dYt_dx)
-        dG_dYt = self.dG_dY_v(x, Yt, dYt_dx)
-        dG_dYtdx = self.dG_ddYdx_v(x, Yt, dYt_dx)
-        dG_dw = np.broadcast_to(dG_dYt, (H, n)).T*dYt_dw + np.broadcast_to(dG_dYtdx, (H, n)).T*d2Yt_dwdx
-        dG_du = np.broadcast_to(dG_dYt, (H, n)).T*dYt_du + np.broadcast_to(dG_dYtdx, (H, n)).T*d2Yt_dudx
-        dG_dv = np.broadcast_to(dG_dYt, (H, n)).T*dYt_dv + np.broadcast_to(dG_dYtdx, (H, n)).T*d2Yt_dvdx
+        dG_dYt = self.dG_dY_v(x, Yt, dYt_dx)[:, np.newaxis]
+        dG_dYtdx = self.dG_ddYdx_v(x, Yt, dYt_dx)[:, np.newaxis]
+        dG_dw = dG_dYt*dYt_dw + dG_dYtdx*d2Yt_dwdx
+        dG_du = dG_dYt*dYt_du + dG_dYtdx*d2Yt_dudx
+        dG_dv = dG_dYt*dYt_dv + dG_dYtdx*d2Yt_dvdx
 
-        dE_dw = 2*np.sum(np.broadcast_to(G, (H, n)).T*dG_dw, axis=0)
-        dE_du = 2*np.sum(np.broadcast_to(G, (H, n)).T*dG_du, axis=0)
-        dE_dv = 2*np.sum(np.broadcast_to(G, (H, n)).T*dG_dv, axis=0)
+        dE_dw = 2*G.dot(dG_dw)
+        dE_du = 2*G.dot(dG_du)
+        dE_dv = 2*G.dot(dG_dv)
 
         jac = np.hstack((dE_dw, dE_du, dE_dv))
 
@@ -962,13 +1097,18 @@ if __name__ == '__main__':
         print()
 
         # Create and train the networks.
-        for trainalg in ('delta', 'Nelder-Mead', 'Powell', 'CG', 'BFGS', 'Newton-CG'):
+        for trainalg in ('delta', 'Nelder-Mead', 'Powell', 'CG', 'BFGS', 'Newton-CG',
+                         'lm', 'trf'):
             print('Training using %s algorithm.' % trainalg)
             net = NNODE1IVP(ode1ivp)
             print(net)
             np.random.seed(0)  # Use same seed for reproducibility.
+            # 'lm' needs at least one training point per network parameter.
+            x = x_train
+            if trainalg == 'lm':
+                x = np.array(create_training_grid([3*DEFAULT_NHID]))
             try:
-                net.train(x_train, trainalg=trainalg, opts=training_opts)
+                net.train(x, trainalg=trainalg, opts=training_opts)
             except (OverflowError, ValueError) as e:
                 print('Error using %s algorithm on %s!' % (trainalg, eq))
                 print(e)
@@ -990,3 +1130,14 @@ if __name__ == '__main__':
             if ode1ivp.dYa_dx:
                 print('The error in the trained derivative is:')
                 print(dYt_dx - dYa_dx)
+
+    # Benchmark the vectorized forward, residual and gradient pass with
+    # delta training, which makes one pass per epoch, on 1000 points.
+    from time import time
+    x_bench = np.linspace(0, 1, 1000)
+    net = NNODE1IVP(ODE1IVP('lagaris_01'), rng=0)
+    t0 = time()
+    net.train(x_bench, trainalg='delta', opts={'maxepochs': 100})
+    t1 = time()
+    print('Delta training on %d points: %.2f ms per epoch' %
+          (len(x_bench), (t1 - t0)/100*1000))
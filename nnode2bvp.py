@@ -10,6 +10,9 @@ Example:
         net = NNODE2BVP()
     Create an NNODE2BVP object for a ODE2BVP object.
         net = NNODE2BVP(ode2bvp_obj)
+    Create an NNODE2BVP object which draws its initial parameters from its
+    own random generator, seeded with 1.
+        net = NNODE2BVP(ode2bvp_obj, rng=1)
 
 Attributes:
 
@@ -21,15 +24,19 @@ Todo:
 
 from math import sqrt
 import numpy as np
-from scipy.optimize import minimize
+from scipy.optimize import least_squares, minimize
 
 from kdelta import kdelta
+from kernels import get_kernels
 from ode2bvp import ODE2BVP
 import sigma
+from sigma import s_v, s1_v, s2_v, s3_v
 from slffnn import SLFFNN
+from stochastic import minimize_stochastic
 
 
 # Default values for method parameters
+DEFAULT_BACKEND = 'numpy'
 DEFAULT_DEBUG = False
 DEFAULT_ETA = 0.01
 DEFAULT_MAXEPOCHS = 1000
@@ -43,6 +50,7 @@ DEFAULT_VMIN = -1
 DEFAULT_WMAX = 1
 DEFAULT_WMIN = -1
 DEFAULT_OPTS = {
+    'backend':   DEFAULT_BACKEND,
     'debug':     DEFAULT_DEBUG,
     'eta':       DEFAULT_ETA,
     'maxepochs': DEFAULT_MAXEPOCHS,
@@ -57,20 +65,13 @@ DEFAULT_OPTS = {
     }
 
 
-# Vectorize sigma functions for speed.
-s_v = np.vectorize(sigma.s)
-s1_v = np.vectorize(sigma.s1)
-s2_v = np.vectorize(sigma.s2)
-s3_v = np.vectorize(sigma.s3)
-
-
 class NNODE2BVP(SLFFNN):
     """Solve a 2nd-order ODE BVP with a single-layer feedforward neural network."""
 
     # Public methods
 
-    def __init__(self, eq, nhid=DEFAULT_NHID):
-        super().__init__()
+    def __init__(self, eq, nhid=DEFAULT_NHID, rng=None):
+        super().__init__(rng)
 
         # Save the differential equation object.
         self.eq = eq
@@ -86,14 +87,20 @@ class NNODE2BVP(SLFFNN):
         # Initialize iteration counter.
         self.nit = 0
 
-        # Pre-vectorize (_v suffix) functions for efficiency.
-        self.Gf_v = np.vectorize(self.eq.Gf)
-        self.dG_dYf_v = np.vectorize(self.eq.dG_dYf)
-        self.dG_ddYdxf_v = np.vectorize(self.eq.dG_ddYdxf)
-        self.dG_dd2Ydx2f_v = np.vectorize(self.eq.dG_dd2Ydx2f)
-        self.Ytf_v = np.vectorize(self.__Ytf)
-        self.dYt_dxf_v = np.vectorize(self.__dYt_dxf)
-        self.d2Yt_dx2f_v = np.vectorize(self.__d2Yt_dx2f)
+        # Training kernels selected by the 'backend' option, or None for
+        # the vectorized code.
+        self.kernels = None
+
+        # Array (_v suffix) versions of the equation and trial functions,
+        # which evaluate all of the points at once. The trial functions
+        # work for arrays as written.
+        self.Gf_v = self.eq.Gf_v
+        self.dG_dYf_v = self.eq.dG_dYf_v
+        self.dG_ddYdxf_v = self.eq.dG_ddYdxf_v
+        self.dG_dd2Ydx2f_v = self.eq.dG_dd2Ydx2f_v
+        self.Ytf_v = self.__Ytf
+        self.dYt_dxf_v = self.__dYt_dxf
+        self.d2Yt_dx2f_v = self.__d2Yt_dx2f
 
     def __str__(self):
         s = ''
@@ -103,15 +110,26 @@ class NNODE2BVP(SLFFNN):
         s += "v = %s\n" % self.v
         return s.rstrip()
 
-    def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS):
+    def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS,
+              options=None):
         """Train the network to solve a 2nd-order ODE BVP. """
         my_opts = dict(DEFAULT_OPTS)
         my_opts.update(opts)
 
+        # Use the training kernels for any backend other than the default
+        # vectorized code.
+        self.kernels = None
+        if my_opts['backend'] != 'numpy':
+            self.kernels = get_kernels(my_opts['backend'])
+
         if trainalg == 'delta':
             self.__train_delta(x, my_opts)
         elif trainalg in ('Nelder-Mead', 'Powell', 'CG', 'BFGS', 'Newton-CG'):
             self.__train_minimize(x, trainalg, my_opts)
+        elif trainalg in ('lm', 'trf'):
+            self.__train_least_squares(x, trainalg, my_opts)
+        elif trainalg in ('sgd', 'momentum', 'adam'):
+            self.__train_stochastic(x, trainalg, my_opts, options)
         else:
             print('ERROR: Invalid training algorithm (%s)!' % trainalg)
             exit(1)
@@ -323,9 +341,9 @@ class NNODE2BVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros(H)
@@ -342,6 +360,16 @@ class NNODE2BVP(SLFFNN):
             u -= eta*dE_du
             v -= eta*dE_dv
 
+            # Compute the error and its gradient with the training kernels,
+            # if selected.
+            if self.kernels is not None:
+                (E, dE_dp) = self.__compute_error_and_gradient_kernels(
+                    np.hstack((w, u, v)), x)
+                (dE_dw, dE_du, dE_dv) = np.hsplit(dE_dp, 3)
+                if verbose:
+                    print(epoch, sqrt(E/n))
+                continue
+
             # Compute the input, the sigmoid function, and its derivatives, for
             # each hidden node and training point.
             # x is nx1, w, u are 1xH
@@ -453,9 +481,9 @@ class NNODE2BVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros(H)
@@ -712,9 +740,9 @@ class NNODE2BVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Assemble the network parameters into a single 1-D vector for
         # use by the minimize() method.
@@ -739,6 +767,167 @@ class NNODE2BVP(SLFFNN):
         self.u = res.x[H:2*H]
         self.v = res.x[2*H:3*H]
 
+    def __train_least_squares(self, x, trainalg, opts=DEFAULT_OPTS):
+        """Train the network using the SciPy least_squares() function. """
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert len(x) > 0
+        assert opts['vmin'] < opts['vmax']
+        assert opts['wmin'] < opts['wmax']
+        assert opts['umin'] < opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        H = len(self.v)
+        w = self.rng.uniform(my_opts['wmin'], my_opts['wmax'], H)
+        u = self.rng.uniform(my_opts['umin'], my_opts['umax'], H)
+        v = self.rng.uniform(my_opts['vmin'], my_opts['vmax'], H)
+
+        # Assemble the network parameters into a single 1-D vector for
+        # use by the least_squares() method.
+        p = np.hstack((w, u, v))
+
+        # The 'lm' method needs at least one residual per parameter.
+        assert trainalg != 'lm' or len(x) >= len(p), \
+            "The 'lm' algorithm needs at least %d training points, one per " \
+            "network parameter." % len(p)
+
+        # Minimize the sum of the squared residuals, using the residual
+        # Jacobian.
+        verbose = 2 if my_opts['verbose'] else 0
+        res = least_squares(self.__compute_residual, p,
+                            jac=self.__compute_residual_jacobian,
+                            method=trainalg, args=(x,), verbose=verbose)
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[0:H]
+        self.u = res.x[H:2*H]
+        self.v = res.x[2*H:3*H]
+
+    def __train_stochastic(self, x, trainalg, opts=DEFAULT_OPTS,
+                           options=None):
+        """Train the network using a mini-batch stochastic gradient method.
+        Any options are passed through to minimize_stochastic(). """
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert len(x) > 0
+        assert my_opts['maxepochs'] > 0
+        assert my_opts['eta'] > 0
+        assert my_opts['vmin'] < my_opts['vmax']
+        assert my_opts['wmin'] < my_opts['wmax']
+        assert my_opts['umin'] < my_opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        H = len(self.v)
+        w = self.rng.uniform(my_opts['wmin'], my_opts['wmax'], H)
+        u = self.rng.uniform(my_opts['umin'], my_opts['umax'], H)
+        v = self.rng.uniform(my_opts['vmin'], my_opts['vmax'], H)
+
+        # Assemble the network parameters into a single 1-D vector.
+        p = np.hstack((w, u, v))
+
+        # Minimize the error function, one batch of training points at a
+        # time.
+        x = np.asarray(x)
+
+        def fun(p, i):
+            return (self.__compute_error(p, x[i]),
+                    self.__compute_error_gradient(p, x[i]))
+
+        callback = None
+        if my_opts['verbose']:
+            callback = lambda p, E2: print('E2 =', E2)
+        res = minimize_stochastic(fun, p, len(x), trainalg, my_opts['eta'],
+                                  my_opts['maxepochs'], options=options,
+                                  callback=callback, rng=self.rng)
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[0:H]
+        self.u = res.x[H:2*H]
+        self.v = res.x[2*H:3*H]
+
+    def __compute_residual(self, p, x):
+        """Compute the differential equation residual at each point."""
+
+        # Unpack the network parameters (hsplit() returns views, so no copies made).
+        (w, u, v) = np.hsplit(p, 3)
+
+        # Compute the forward pass through the network.
+        z = np.outer(x, w) + u
+        s = s_v(z)
+        s1 = s1_v(s)
+        s2 = s2_v(s)
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        d2N_dx2 = s2.dot(v*w**2)
+        Yt = self.Ytf_v(x, N)
+        dYt_dx = self.dYt_dxf_v(x, N, dN_dx)
+        d2Yt_dx2 = self.d2Yt_dx2f_v(x, N, dN_dx, d2N_dx2)
+        G = self.Gf_v(x, Yt, dYt_dx, d2Yt_dx2)
+
+        return G
+
+    def __compute_residual_jacobian(self, p, x):
+        """Compute the Jacobian of the residual wrt network parameters."""
+        if self.kernels is not None:
+            return self.__compute_residual_jacobian_kernels(p, x)
+
+        # Unpack the network parameters (hsplit() returns views, so no copies made).
+        (w, u, v) = np.hsplit(p, 3)
+
+        # Compute the forward pass through the network.
+        z = np.outer(x, w) + u
+        s = s_v(z)
+        s1 = s1_v(s)
+        s2 = s2_v(s)
+        s3 = s3_v(s)
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        d2N_dx2 = s2.dot(v*w**2)
+        dN_dw = s1*np.outer(x, v)
+        dN_du = s1*v
+        dN_dv = s
+        d2N_dwdx = v*(s1 + s2*np.outer(x, w))
+        d2N_dudx = v*s2*w
+        d2N_dvdx = s1*w
+        d3N_dwdx2 = v*(2*s2*w + s3*np.outer(x, w**2))
+        d3N_dudx2 = v*s3*w**2
+        d3N_dvdx2 = s2*w**2
+        Yt = self.__Ytf(x, N)
+        dYt_dx = self.__dYt_dxf(x, N, dN_dx)
+        d2Yt_dx2 = self.__d2Yt_dx2f(x, N, dN_dx, d2N_dx2)
+        P_b = (x*(1 - x))[:, np.newaxis]
+        dP_dx_b = (1 - 2*x)[:, np.newaxis]
+        d2P_dx2_b = -2
+        dYt_dw = P_b*dN_dw
+        dYt_du = P_b*dN_du
+        dYt_dv = P_b*dN_dv
+        d2Yt_dwdx = P_b*d2N_dwdx + dP_dx_b*dN_dw
+        d2Yt_dudx = P_b*d2N_dudx + dP_dx_b*dN_du
+        d2Yt_dvdx = P_b*d2N_dvdx + dP_dx_b*dN_dv
+        d3Yt_dwdx2 = P_b*d3N_dwdx2 + 2*dP_dx_b*d2N_dwdx + d2P_dx2_b*dN_dw
+        d3Yt_dudx2 = P_b*d3N_dudx2 + 2*dP_dx_b*d2N_dudx + d2P_dx2_b*dN_du
+        d3Yt_dvdx2 = P_b*d3N_dvdx2 + 2*dP_dx_b*d2N_dvdx + d2P_dx2_b*dN_dv
+
+        dG_dYt_b = self.dG_dYf_v(x, Yt, dYt_dx, d2Yt_dx2)[:, np.newaxis]
+        dG_ddYtdx_b = self.dG_ddYdxf_v(x, Yt, dYt_dx, d2Yt_dx2)[:, np.newaxis]
+        dG_dd2Ytdx2_b = \
+            self.dG_dd2Ydx2f_v(x, Yt, dYt_dx, d2Yt_dx2)[:, np.newaxis]
+        dG_dw = dG_dYt_b*dYt_dw + dG_ddYtdx_b*d2Yt_dwdx + dG_dd2Ytdx2_b*d3Yt_dwdx2
+        dG_du = dG_dYt_b*dYt_du + dG_ddYtdx_b*d2Yt_dudx + dG_dd2Ytdx2_b*d3Yt_dudx2
+        dG_dv = dG_dYt_b*dYt_dv + dG_ddYtdx_b*d2Yt_dvdx + dG_dd2Ytdx2_b*d3Yt_dvdx2
+
+        jac = np.hstack((dG_dw, dG_du, dG_dv))
+
+        return jac
+
     def __compute_error(self, p, x):
         """Compute the error function using the current parameter values."""
 
@@ -822,6 +1011,8 @@ class NNODE2BVP(SLFFNN):
     def __compute_error_gradient(self, p, x):
         """Compute the gradient of the error function wrt network
         parameters."""
+        if self.kernels is not None:
+            return self.__compute_error_and_gradient_kernels(p, x)[1]
 
         # Fetch the number of training points.
         n = len(x)
@@ -837,40 +1028,13 @@ class NNODE2BVP(SLFFNN):
         s2 = s2_v(s)
         s3 = s3_v(s)
 
-        # WARNING: Numpy and loop code below can give different results with Newton-CG after
-        # a few iterations. The differences are very slight, but they result in significantly
-        # different values for the weights and biases. To avoid this for now, loop code has been
-        # retained for some computations below.
-
-        # N = s.dot(v)
-        N = np.zeros(n)
-        for i in range(n):
-            for k in range(H):
-                N[i] += s[i, k]*v[k]
-
-        # dN_dx = s1.dot(v*w)
-        dN_dx = np.zeros(n)
-        for i in range(n):
-            for k in range(H):
-                dN_dx[i] += s1[i, k]*v[k]*w[k]
-
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
         d2N_dx2 = s2.dot(v*w**2)
-
-        # dN_dw = s1*np.outer(x, v)
-        dN_dw = np.zeros((n, H))
-        for i in range(n):
-            for k in range(H):
-                dN_dw[i, k] = s1[i, k]*x[i]*v[k]
-
+        dN_dw = s1*np.outer(x, v)
         dN_du = s1*v
         dN_dv = s
-
-        # d2N_dwdx = v*(s1 + s2*np.outer(x, w))
-        d2N_dwdx = np.zeros((n, H))
-        for i in range(n):
-            for k in range(H):
-                d2N_dwdx[i, k] = v[k]*(s1[i, k] + s2[i, k]*x[i]*w[k])
-
+        d2N_dwdx = v*(s1 + s2*np.outer(x, w))
         d2N_dudx = v*s2*w
         d2N_dvdx = s1*w
         d3N_dwdx2 = v*(2*s2*w + s3*np.outer(x, w**2))
@@ -1123,6 +1287,49 @@ class NNODE2BVP(SLFFNN):
 
         return jac
 
+    def __compute_error_and_gradient_kernels(self, p, x):
+        """Compute the error function and its gradient with the training
+        kernels."""
+        (w, u, v) = np.hsplit(p, 3)
+        (G, c0, c1, c2) = self.__compute_coefficients_kernels(p, x)
+        grad = self.kernels.gradient(x[:, np.newaxis], w[np.newaxis], u, v,
+                                     2*G*c0, (2*G*c1)[:, np.newaxis],
+                                     (2*G*c2)[:, np.newaxis])
+        return np.sum(G**2), grad
+
+    def __compute_residual_jacobian_kernels(self, p, x):
+        """Compute the residual Jacobian with the training kernels."""
+        (w, u, v) = np.hsplit(p, 3)
+        (G, c0, c1, c2) = self.__compute_coefficients_kernels(p, x)
+        return self.kernels.jacobian(x[:, np.newaxis], w[np.newaxis], u, v,
+                                     c0, c1[:, np.newaxis], c2[:, np.newaxis])
+
+    def __compute_coefficients_kernels(self, p, x):
+        """Compute the residual, and the coefficients of N, dN_dx and
+        d2N_dx2 in dG/dp, using the training kernels for the network."""
+        (w, u, v) = np.hsplit(p, 3)
+        (N, dN_dx, d2N_dx2) = self.kernels.forward(x[:, np.newaxis],
+                                                   w[np.newaxis], u, v)
+        dN_dx = dN_dx[:, 0]
+        d2N_dx2 = d2N_dx2[:, 0]
+        Yt = self.__Ytf(x, N)
+        dYt_dx = self.__dYt_dxf(x, N, dN_dx)
+        d2Yt_dx2 = self.__d2Yt_dx2f(x, N, dN_dx, d2N_dx2)
+        G = self.Gf_v(x, Yt, dYt_dx, d2Yt_dx2)
+        dG_dYt = self.dG_dYf_v(x, Yt, dYt_dx, d2Yt_dx2)
+        dG_ddYtdx = self.dG_ddYdxf_v(x, Yt, dYt_dx, d2Yt_dx2)
+        dG_dd2Ytdx2 = self.dG_dd2Ydx2f_v(x, Yt, dYt_dx, d2Yt_dx2)
+
+        # Since Yt = A + P*N, with P = x*(1 - x), collect the coefficients of
+        # the parameter derivatives of N, dN_dx and d2N_dx2 in dG/dp.
+        P = x*(1 - x)
+        dP_dx = 1 - 2*x
+        d2P_dx2 = -2
+        c0 = dG_dYt*P + dG_ddYtdx*dP_dx + dG_dd2Ytdx2*d2P_dx2
+        c1 = dG_ddYtdx*P + 2*dG_dd2Ytdx2*dP_dx
+        c2 = dG_dd2Ytdx2*P
+        return (G, c0, c1, c2)
+
     def __print_progress(self, xk):
         """Callback to print progress message from optimizer"""
         print('nit =', self.nit)
@@ -1173,13 +1380,18 @@ if __name__ == '__main__':
         print()
 
         # Create and train the networks.
-        for trainalg in ('delta', 'Nelder-Mead', 'Powell', 'CG', 'BFGS', 'Newton-CG'):
+        for trainalg in ('delta', 'Nelder-Mead', 'Powell', 'CG', 'BFGS', 'Newton-CG',
+                         'lm', 'trf'):
             print('Training using %s algorithm.' % trainalg)
             net = NNODE2BVP(ode2bvp)
             print(net)
             np.random.seed(0)  # Use same seed for reproducibility.
+            # 'lm' needs at least one training point per network parameter.
+            x = x_train
+            if trainalg == 'lm':
+                x = np.linspace(0, 1, 3*DEFAULT_NHID)
             try:
-                net.train(x_train, trainalg=trainalg, opts=training_opts)
+                net.train(x, trainalg=trainalg, opts=training_opts)
             except (OverflowError, ValueError) as e:
                 print('Error using %s algorithm on %s!' % (trainalg, eq))
                 print(e)
@@ -1207,3 +1419,14 @@ if __name__ == '__main__':
             if ode2bvp.d2Ya_dx2f:
                 print('The error in the trained 2nd derivative is:')
                 print(d2Yt_dx2 - d2Ya_dx2)
+
+    # Benchmark the vectorized forward, residual and gradient pass with
+    # delta training, which makes one pass per epoch, on 1000 points.
+    from time import time
+    x_bench = np.linspace(0, 1, 1000)
+    net = NNODE2BVP(ODE2BVP('eq.lagaris_03_bvp'), rng=0)
+    t0 = time()
+    net.train(x_bench, trainalg='delta', opts={'maxepochs': 100})
+    t1 = time()
+    print('Delta training on %d points: %.2f ms per epoch' %
+          (len(x_bench), (t1 - t0)/100*1000))
@@ -10,6 +10,9 @@ Example:
         net = NNODE2IVP()
     Create an NNODE2IVP object for a ODE2IVP object.
         net = NNODE2IVP(ode2ivp_obj)
+    Create an NNODE2IVP object which draws its initial parameters from its
+    own random generator, seeded with 1.
+        net = NNODE2IVP(ode2ivp_obj, rng=1)
 
 Attributes:
     None
@@ -29,11 +32,12 @@ Todo:
 
 from math import sqrt
 import numpy as np
-from scipy.optimize import minimize
+from scipy.optimize import least_squares, minimize
 
 from ode2ivp import ODE2IVP
-from sigma import sigma, dsigma_dz, d2sigma_dz2, d3sigma_dz3
+from sigma import sigma_v, dsigma_dz_v, d2sigma_dz2_v, d3sigma_dz3_v
 from slffnn import SLFFNN
+from stochastic import minimize_stochastic
 
 # Default values for method parameters
 DEFAULT_DEBUG = False
@@ -62,30 +66,24 @@ DEFAULT_OPTS = {
     'wmin':      DEFAULT_WMIN
     }
 
-# Vectorize sigma functions.
-sigma_v = np.vectorize(sigma)
-dsigma_dz_v = np.vectorize(dsigma_dz)
-d2sigma_dz2_v = np.vectorize(d2sigma_dz2)
-d3sigma_dz3_v = np.vectorize(d3sigma_dz3)
-
-
 class NNODE2IVP(SLFFNN):
     """Solve a 2nd-order ODE IVP with a neural network."""
 
     # Public methods
 
-    def __init__(self, eq, nhid=DEFAULT_NHID):
-        super().__init__()
+    def __init__(self, eq, nhid=DEFAULT_NHID, rng=None):
+        super().__init__(rng)
         self.eq = eq
         self.w = np.zeros(nhid)
         self.u = np.zeros(nhid)
         self.v = np.zeros(nhid)
 
-        # Pre-vectorize functions for efficiency.
-        self.Gf_v = np.vectorize(self.eq.Gf)
-        self.dG_dyf_v = np.vectorize(self.eq.dG_dyf)
-        self.dG_dydxf_v = np.vectorize(self.eq.dG_dydxf)
-        self.dG_d2ydx2f_v = np.vectorize(self.eq.dG_d2ydx2f)
+        # Array (_v suffix) versions of the equation functions, which
+        # evaluate all of the points at once.
+        self.Gf_v = self.eq.Gf_v
+        self.dG_dyf_v = self.eq.dG_dyf_v
+        self.dG_dydxf_v = self.eq.dG_dydxf_v
+        self.dG_d2ydx2f_v = self.eq.dG_d2ydx2f_v
 
     def __str__(self):
         s = ''
@@ -96,7 +94,8 @@ class NNODE2IVP(SLFFNN):
         s += "v = %s\n" % self.v
         return s.rstrip()
 
-    def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS):
+    def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS,
+              options=None):
         """Train the network. """
         my_opts = dict(DEFAULT_OPTS)
         my_opts.update(opts)
@@ -105,6 +104,10 @@ class NNODE2IVP(SLFFNN):
         elif trainalg in ('Nelder-Mead', 'Powell', 'CG', 'BFGS',
                           'Newton-CG', 'L-BFGS-B', 'TNC', 'SLSQP'):
             self.__train_minimize(x, trainalg, my_opts)
+        elif trainalg in ('lm', 'trf'):
+            self.__train_least_squares(x, trainalg, my_opts)
+        elif trainalg in ('sgd', 'momentum', 'adam'):
+            self.__train_stochastic(x, trainalg, my_opts, options)
         else:
             print('ERROR: Invalid training algorithm (%s)!' % trainalg)
             exit(0)
@@ -175,9 +178,9 @@ class NNODE2IVP(SLFFNN):
         H = opts['nhid']
 
         # Create the hidden node weights, biases, and output node weights.
-        self.w = np.random.uniform(opts['wmin'], opts['wmax'], H)
-        self.u = np.random.uniform(opts['umin'], opts['umax'], H)
-        self.v = np.random.uniform(opts['vmin'], opts['vmax'], H)
+        self.w = self.rng.uniform(opts['wmin'], opts['wmax'], H)
+        self.u = self.rng.uniform(opts['umin'], opts['umax'], H)
+        self.v = self.rng.uniform(opts['vmin'], opts['vmax'], H)
 
         # Initial parameter deltas are 0.
         dE_dv = np.zeros(H)
@@ -285,9 +288,9 @@ class NNODE2IVP(SLFFNN):
 
         # Create the hidden node weights, biases, and output node weights.
         H = opts['nhid']
-        self.w = np.random.uniform(opts['wmin'], opts['wmax'], H)
-        self.u = np.random.uniform(opts['umin'], opts['umax'], H)
-        self.v = np.random.uniform(opts['vmin'], opts['vmax'], H)
+        self.w = self.rng.uniform(opts['wmin'], opts['wmax'], H)
+        self.u = self.rng.uniform(opts['umin'], opts['umax'], H)
+        self.v = self.rng.uniform(opts['vmin'], opts['vmax'], H)
 
         # Assemble the network parameters into a single 1-D vector for
         # use by the minimize() method.
@@ -306,6 +309,166 @@ class NNODE2IVP(SLFFNN):
         self.u = res.x[H:2*H]
         self.v = res.x[2*H:3*H]
 
+    def __train_least_squares(self, x, trainalg, opts=DEFAULT_OPTS):
+        """Train the network with least_squares(). """
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert x.any()
+        assert opts['vmin'] < opts['vmax']
+        assert opts['wmin'] < opts['wmax']
+        assert opts['umin'] < opts['umax']
+
+        # ---------------------------------------------------------------------
+
+        # Create the hidden node weights, biases, and output node weights.
+        H = opts['nhid']
+        self.w = self.rng.uniform(opts['wmin'], opts['wmax'], H)
+        self.u = self.rng.uniform(opts['umin'], opts['umax'], H)
+        self.v = self.rng.uniform(opts['vmin'], opts['vmax'], H)
+
+        # Assemble the network parameters into a single 1-D vector for
+        # use by the least_squares() method.
+        p = np.hstack((self.w, self.u, self.v))
+
+        # The 'lm' method needs at least one residual per parameter.
+        assert trainalg != 'lm' or len(x) >= len(p), \
+            "The 'lm' algorithm needs at least %d training points, one per " \
+            "network parameter." % len(p)
+
+        # Minimize the sum of the squared residuals, using the residual
+        # Jacobian.
+        verbose = 2 if my_opts['verbose'] else 0
+        res = least_squares(self.__compute_residual, p,
+                            jac=self.__compute_residual_jacobian,
+                            method=trainalg, args=(x,), verbose=verbose)
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[0:H]
+        self.u = res.x[H:2*H]
+        self.v = res.x[2*H:3*H]
+
+    def __train_stochastic(self, x, trainalg, opts=DEFAULT_OPTS,
+                           options=None):
+        """Train the network using a mini-batch stochastic gradient method.
+        Any options are passed through to minimize_stochastic(). """
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert len(x) > 0
+        assert my_opts['maxepochs'] > 0
+        assert my_opts['eta'] > 0
+        assert my_opts['vmin'] < my_opts['vmax']
+        assert my_opts['wmin'] < my_opts['wmax']
+        assert my_opts['umin'] < my_opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        H = my_opts['nhid']
+        w = self.rng.uniform(my_opts['wmin'], my_opts['wmax'], H)
+        u = self.rng.uniform(my_opts['umin'], my_opts['umax'], H)
+        v = self.rng.uniform(my_opts['vmin'], my_opts['vmax'], H)
+
+        # Assemble the network parameters into a single 1-D vector.
+        p = np.hstack((w, u, v))
+
+        # Minimize the error function, one batch of training points at a
+        # time.
+        x = np.asarray(x)
+
+        def fun(p, i):
+            return (self.__compute_error(p, x[i]),
+                    self.__compute_error_gradient(p, x[i]))
+
+        callback = None
+        if my_opts['verbose']:
+            callback = lambda p, E2: print('E2 =', E2)
+        res = minimize_stochastic(fun, p, len(x), trainalg, my_opts['eta'],
+                                  my_opts['maxepochs'], options=options,
+                                  callback=callback, rng=self.rng)
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[0:H]
+        self.u = res.x[H:2*H]
+        self.v = res.x[2*H:3*H]
+
+    def __compute_residual(self, p, x):
+        """Compute the differential equation residual at each point."""
+
+        # Unpack the network parameters.
+        H = len(self.w)
+        w = p[0:H]
+        u = p[H:2*H]
+        v = p[2*H:3*H]
+
+        # Compute the forward pass through the network.
+        z = np.outer(x, w) + u
+        s = sigma_v(z)
+        s1 = dsigma_dz_v(z)
+        s2 = d2sigma_dz2_v(z)
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        d2N_dx2 = s2.dot(v*w**2)
+        yt = self.__ytf(x, N)
+        dyt_dx = self.__dyt_dxf(x, N, dN_dx)
+        d2yt_dx2 = self.__d2yt_dx2f(x, N, dN_dx, d2N_dx2)
+        G = self.Gf_v(x, yt, dyt_dx, d2yt_dx2)
+        return G
+
+    def __compute_residual_jacobian(self, p, x):
+        """Compute the Jacobian of the residual wrt network parameters."""
+
+        # Unpack the network parameters.
+        H = len(self.w)
+        w = p[0:H]
+        u = p[H:2*H]
+        v = p[2*H:3*H]
+
+        # Compute the forward pass through the network.
+        z = np.outer(x, w) + u
+        s = sigma_v(z)
+        s1 = dsigma_dz_v(z)
+        s2 = d2sigma_dz2_v(z)
+        s3 = d3sigma_dz3_v(z)
+        N = s.dot(v)
+        dN_dx = s1.dot(v*w)
+        d2N_dx2 = s2.dot(v*w**2)
+        dN_dw = s1*np.outer(x, v)
+        dN_du = s1*v
+        dN_dv = s
+        d2N_dwdx = v*(s1 + s2*np.outer(x, w))
+        d2N_dudx = v*s2*w
+        d2N_dvdx = s1*w
+        d3N_dwdx2 = v*(2*s2*w + s3*np.outer(x, w**2))
+        d3N_dudx2 = v*s3*w**2
+        d3N_dvdx2 = s2*w**2
+        yt = self.__ytf(x, N)
+        dyt_dx = self.__dyt_dxf(x, N, dN_dx)
+        d2yt_dx2 = self.__d2yt_dx2f(x, N, dN_dx, d2N_dx2)
+        x_b = x[:, np.newaxis]
+        dyt_dw = x_b**2*dN_dw
+        dyt_du = x_b**2*dN_du
+        dyt_dv = x_b**2*dN_dv
+        d2yt_dwdx = x_b**2*d2N_dwdx + 2*x_b*dN_dw
+        d2yt_dudx = x_b**2*d2N_dudx + 2*x_b*dN_du
+        d2yt_dvdx = x_b**2*d2N_dvdx + 2*x_b*dN_dv
+        d3yt_dwdx2 = x_b**2*d3N_dwdx2 + 4*x_b*d2N_dwdx + 2*dN_dw
+        d3yt_dudx2 = x_b**2*d3N_dudx2 + 4*x_b*d2N_dudx + 2*dN_du
+        d3yt_dvdx2 = x_b**2*d3N_dvdx2 + 4*x_b*d2N_dvdx + 2*dN_dv
+        dG_dyt = self.dG_dyf_v(x, yt, dyt_dx, d2yt_dx2)[:, np.newaxis]
+        dG_dytdx = self.dG_dydxf_v(x, yt, dyt_dx, d2yt_dx2)[:, np.newaxis]
+        dG_d2ytdx2 = self.dG_d2ydx2f_v(x, yt, dyt_dx, d2yt_dx2)[:, np.newaxis]
+        dG_dw = dG_dyt*dyt_dw + dG_dytdx*d2yt_dwdx + dG_d2ytdx2*d3yt_dwdx2
+        dG_du = dG_dyt*dyt_du + dG_dytdx*d2yt_dudx + dG_d2ytdx2*d3yt_dudx2
+        dG_dv = dG_dyt*dyt_dv + dG_dytdx*d2yt_dvdx + dG_d2ytdx2*d3yt_dvdx2
+        jac = np.hstack((dG_dw, dG_du, dG_dv))
+        return jac
+
     def __compute_error(self, p, x):
         """Compute the error function using the current parameter values."""
 
@@ -427,7 +590,8 @@ if __name__ == '__main__':
 
         # Create and train the networks.
         for trainalg in ('delta', 'Nelder-Mead', 'Powell', 'CG', 'BFGS',
-                         'Newton-CG', 'L-BFGS-B', 'TNC', 'SLSQP'):
+                         'Newton-CG', 'L-BFGS-B', 'TNC', 'SLSQP', 'lm',
+                         'trf'):
             print('Training using %s algorithm.' % trainalg)
             net = NNODE2IVP(ode2ivp)
             np.random.seed(0)
@@ -10,6 +10,9 @@ Example:
         net = NNPDE2BVP()
     Create an NNPDE2BVP object for a PDE2BVP object.
         net = NNPDE2BVP(pde2bvp_obj)
+    Create an NNPDE2BVP object which draws its initial parameters from its
+    own random generator, seeded with 1.
+        net = NNPDE2BVP(pde2bvp_obj, rng=1)
 
 Attributes:
 
@@ -26,6 +29,7 @@ from scipy.optimize import minimize
 from kdelta import kdelta
 from pde2bvp import PDE2BVP
 import sigma
+from sigma import s_v, s1_v, s2_v, s3_v
 from slffnn import SLFFNN
 
 
@@ -57,20 +61,13 @@ DEFAULT_OPTS = {
     }
 
 
-# Vectorize sigma functions for speed.
-s_v = np.vectorize(sigma.s)
-s1_v = np.vectorize(sigma.s1)
-s2_v = np.vectorize(sigma.s2)
-s3_v = np.vectorize(sigma.s3)
-
-
 class NNPDE2BVP(SLFFNN):
     """Solve a 2nd-order PDE BVP with a single-layer feedforward neural network."""
 
     # Public methods
 
-    def __init__(self, eq, nhid=DEFAULT_NHID):
-        super().__init__()
+    def __init__(self, eq, nhid=DEFAULT_NHID, rng=None):
+        super().__init__(rng)
 
         # Save the differential equation object.
         self.eq = eq
@@ -335,9 +332,9 @@ class NNPDE2BVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros(H)
@@ -465,9 +462,9 @@ class NNPDE2BVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros(H)
@@ -724,9 +721,9 @@ class NNPDE2BVP(SLFFNN):
         vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, H)
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        w = self.rng.uniform(wmin, wmax, H)
+        u = self.rng.uniform(umin, umax, H)
+        v = self.rng.uniform(vmin, vmax, H)
 
         # Assemble the network parameters into a single 1-D vector for
         # use by the minimize() method.
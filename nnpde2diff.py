@@ -1,10 +1,13 @@
 ###############################################################################
 """
-NNPDE2DIFF2D - Class to solve 1-, 2-, and 3D diffusion problems using a 
+NNPDE2DIFF - Class to solve 1-, 2-, and 3-D diffusion problems using a
 neural network
 
 This module provides the functionality to solve 1-, 2-, and 3-D diffusion
-problems using a neural network.
+problems using a neural network. The dimension of the problem is taken
+from the equation object, and every training algorithm works for every
+dimension. NNPDE2DIFF1D and NNPDE2DIFF2D are thin subclasses restricted
+to one dimension.
 
 Example:
     Create an empty NNPDE2DIFF object.
@@ -18,6 +21,12 @@ Example:
     Create an NNPDE2DIFF object for a PDE2DIFF2D object, with 20 hidden
               nodes.
         net = NNPDE2DIFF(pde2diff2d_obj, nhid=20)
+    Create an NNPDE2DIFF object which draws its initial parameters from its
+    own random generator, seeded with 1.
+        net = NNPDE2DIFF(pde2diff2d_obj, rng=1)
+    Compute the trained solution on a tensor-product grid, without creating
+    the full array of grid points. The result has shape grid.shape.
+        Yt = net.run(TensorGrid([xg, yg, tg]))
 
 Attributes:
     TBD
@@ -29,57 +38,77 @@ Todo:
     * Expand base functionality.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from math import sqrt
 import numpy as np
-from scipy.optimize import minimize
+from scipy.optimize import least_squares, minimize
 import sys
 import types
 
-from diff1dtrialfunction import Diff1DTrialFunction
-from diff2dtrialfunction import Diff2DTrialFunction
-from diff3dtrialfunction import Diff3DTrialFunction
+from difftrialfunction import DiffTrialFunction
 from kdelta import kdelta
-from pde2diff import PDE2DIFF
-from sigma import sigma, dsigma_dz, d2sigma_dz2, d3sigma_dz3
+from kernels import get_kernels
+from paramhistory import DiskParameterHistory, ParameterHistory
+from pde2diff import PDE2DIFF, VARIABLE, ZERO
+from sigma import sigma_v, sigma_derivatives_v
 from slffnn import SLFFNN
+from stochastic import minimize_stochastic
+from tensorgrid import TensorGrid
+from trialfunctioncache import TrialFunctionCache
 
 
 # Default values for method parameters
+DEFAULT_BACKEND = 'numpy'
+DEFAULT_BLOCKSIZE = 65536
 DEFAULT_DEBUG = False
+DEFAULT_DROP_TOL = None
 DEFAULT_ETA = 0.1
 DEFAULT_MAXEPOCHS = 1000
+DEFAULT_NADD = 20
 DEFAULT_NHID = 10
+DEFAULT_NREFINE = 5
+DEFAULT_NTHREADS = 1
+DEFAULT_PHIST = True
+DEFAULT_PHIST_FILE = None
+DEFAULT_PHIST_STRIDE = 1
+DEFAULT_RMSEHIST_FILE = None
 DEFAULT_TRAINALG = 'delta'
 DEFAULT_UMAX = 1
 DEFAULT_UMIN = -1
+DEFAULT_USE_JACOBIAN = True
 DEFAULT_VERBOSE = False
 DEFAULT_VMAX = 1
 DEFAULT_VMIN = -1
+DEFAULT_WARM_START = False
 DEFAULT_WMAX = 1
 DEFAULT_WMIN = -1
 DEFAULT_OPTS = {
-    'debug':        DEFAULT_DEBUG,
-    'eta':          DEFAULT_ETA,
-    'maxepochs':    DEFAULT_MAXEPOCHS,
-    'nhid':         DEFAULT_NHID,
-    'umax':         DEFAULT_UMAX,
-    'umin':         DEFAULT_UMIN,
-    'verbose':      DEFAULT_VERBOSE,
-    'vmax':         DEFAULT_VMAX,
-    'vmin':         DEFAULT_VMIN,
-    'wmax':         DEFAULT_WMAX,
-    'wmin':         DEFAULT_WMIN
+    'backend':       DEFAULT_BACKEND,
+    'debug':         DEFAULT_DEBUG,
+    'drop_tol':      DEFAULT_DROP_TOL,
+    'eta':           DEFAULT_ETA,
+    'maxepochs':     DEFAULT_MAXEPOCHS,
+    'nadd':          DEFAULT_NADD,
+    'nhid':          DEFAULT_NHID,
+    'nrefine':       DEFAULT_NREFINE,
+    'nthreads':      DEFAULT_NTHREADS,
+    'phist':         DEFAULT_PHIST,
+    'phist_file':    DEFAULT_PHIST_FILE,
+    'phist_stride':  DEFAULT_PHIST_STRIDE,
+    'rmsehist_file': DEFAULT_RMSEHIST_FILE,
+    'umax':          DEFAULT_UMAX,
+    'umin':          DEFAULT_UMIN,
+    'use_jacobian':  DEFAULT_USE_JACOBIAN,
+    'verbose':       DEFAULT_VERBOSE,
+    'vmax':          DEFAULT_VMAX,
+    'vmin':          DEFAULT_VMIN,
+    'warm_start':    DEFAULT_WARM_START,
+    'wmax':          DEFAULT_WMAX,
+    'wmin':          DEFAULT_WMIN
     }
 
 
-# Vectorize sigma functions for speed.
-sigma_v = np.vectorize(sigma)
-dsigma_dz_v = np.vectorize(dsigma_dz)
-d2sigma_dz2_v = np.vectorize(d2sigma_dz2)
-d3sigma_dz3_v = np.vectorize(d3sigma_dz3)
-
-
 class NNPDE2DIFF(SLFFNN):
     """Solve a diffusion problem with a neural network"""
 
@@ -89,21 +118,116 @@ class NNPDE2DIFF(SLFFNN):
 
     def train(self, x, trainalg=DEFAULT_TRAINALG, opts=DEFAULT_OPTS,
               options=None):
-        """Train the network to solve a 2-D diffusion problem"""
+        """Train the network to solve a diffusion problem"""
         my_opts = dict(DEFAULT_OPTS)
         my_opts.update(opts)
 
+        # Use the training kernels for any backend other than the default
+        # vectorized code.
+        self.kernels = None
+        if my_opts['backend'] != 'numpy':
+            self.kernels = get_kernels(my_opts['backend'])
+
         if trainalg == 'delta':
             self.__train_delta(x, opts=my_opts)
         elif trainalg in ('Nelder-Mead', 'Powell', 'CG', 'BFGS'):
             self.__train_minimize(x, trainalg, opts=my_opts, options=options)
+        elif trainalg in ('lm', 'trf'):
+            self.__train_least_squares(x, trainalg, opts=my_opts,
+                                       options=options)
+        elif trainalg in ('sgd', 'momentum', 'adam'):
+            self.__train_stochastic(x, trainalg, opts=my_opts,
+                                    options=options)
         else:
             print('ERROR: Invalid training algorithm (%s)!' % trainalg)
             exit(1)
 
-    def run(self, x):
+    def train_adaptive(self, x, xc, trainalg=DEFAULT_TRAINALG,
+                       opts=DEFAULT_OPTS, options=None):
+        """Train the network, then repeatedly add the candidate points in
+        xc with the largest residuals to the training points x, and continue
+        training from the current parameters. For 'lm', x must have at least
+        one point per network parameter, and drop_tol never drops the
+        training points below that number."""
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+        assert my_opts['nrefine'] >= 0
+        assert my_opts['nadd'] > 0
+        verbose = my_opts['verbose']
+        drop_tol = my_opts['drop_tol']
+
+        # 'lm' needs at least one residual per network parameter.
+        nmin = 0
+        if trainalg == 'lm':
+            nmin = (len(x[0]) + 2)*my_opts['nhid']
+
+        # Train on the initial points.
+        x = np.array(x, dtype=float)
+        xc = np.array(xc, dtype=float)
+        self.train(x, trainalg, opts=my_opts, options=options)
+
+        # Continue training from the current parameters after each
+        # refinement.
+        my_opts['warm_start'] = True
+        for refinement in range(my_opts['nrefine']):
+            if len(xc) == 0:
+                break
+
+            # Move the worst-resolved candidates to the training points.
+            Gc = np.abs(self.residual(xc))
+            k = min(my_opts['nadd'], len(xc))
+            worst = np.argpartition(-Gc, k - 1)[:k]
+            x_add = xc[worst]
+            xc = np.delete(xc, worst, axis=0)
+
+            # Optionally drop the well-resolved training points, keeping
+            # the worst-resolved ones if too few would remain.
+            if drop_tol is not None:
+                G = np.abs(self.residual(x))
+                nkeep = max(np.count_nonzero(G >= drop_tol), nmin - k)
+                x = x[np.sort(np.argsort(-G, kind='stable')[:nkeep])]
+            x = np.vstack((x, x_add))
+            if verbose:
+                print('Refinement %d: max |G| = %s, %d training points.' %
+                      (refinement, Gc[worst].max(), len(x)))
+
+            self.train(x, trainalg, opts=my_opts, options=options)
+
+        # Save the final training points.
+        self.x_train = x
+
+    def residual(self, x):
+        """Compute the differential equation residual for the trained
+        network."""
+
+        # Get references to the network parameters for convenience.
+        w = self.w
+        u = self.u
+        v = self.v
+
+        # Compute the network output and its derivatives.
+        z = x.dot(w) + u
+        (s, s1, s2) = sigma_derivatives_v(z, 2)
+        N = s.dot(v)
+        delN = s1.dot((w*v).T)
+        del2N = s2.dot((w**2*v).T)
+
+        # Compute the trial function and its derivatives, and the
+        # differential equation.
+        Yt = self.tf.Ytf_v(x, N)
+        delYt = self.tf.delYtf_v(x, N, delN)
+        del2Yt = self.tf.del2Ytf_v(x, N, delN, del2N)
+        G = self.eq.Gf_v(x, Yt, delYt, del2Yt)
+
+        return G
+
+    def run(self, x, blocksize=DEFAULT_BLOCKSIZE):
         """Compute the trained solution."""
 
+        # Evaluate tensor-product grids in blocks of points.
+        if isinstance(x, TensorGrid):
+            return self.__run_grid(x, 0, blocksize)
+
         # Get references to the network parameters for convenience.
         w = self.w
         u = self.u
@@ -119,21 +243,17 @@ class NNPDE2DIFF(SLFFNN):
         N = np.dot(s, v)
 
         # Compute the value of the trial function for each input point.
-        n = len(x)
-        Yt = np.zeros(n)
-        for i in range(n):
-            Yt[i] = self.tf.Ytf(x[i], N[i])
+        Yt = self.tf.Ytf_v(x, N)
 
         # Return the trial function values for each input point.
         return Yt
 
-    def run_gradient(self, x):
+    def run_gradient(self, x, blocksize=DEFAULT_BLOCKSIZE):
         """Compute the trained gradient."""
 
-        # Fetch the number n of input points at which to calculate the
-        # output, and the number m of components of each point.
-        n = len(x)
-        m = len(x[0])
+        # Evaluate tensor-product grids in blocks of points.
+        if isinstance(x, TensorGrid):
+            return self.__run_grid(x, 1, blocksize)
 
         # Get references to the network parameters for convenience.
         w = self.w
@@ -143,12 +263,9 @@ class NNPDE2DIFF(SLFFNN):
         # Compute the activation for each input point and hidden node.
         z = x.dot(w) + u
 
-        # Compute the sigma function for each input point and hidden node.
-        s = sigma_v(z)
-
-        # Compute the sigma function 1st derivative for each input point
-        # and hidden node.
-        s1 = dsigma_dz_v(z)
+        # Compute the sigma function and its 1st derivative for each input
+        # point and hidden node.
+        (s, s1) = sigma_derivatives_v(z, 1)
 
         # Compute the network output for each input point.
         N = s.dot(v)
@@ -157,19 +274,16 @@ class NNPDE2DIFF(SLFFNN):
         delN = np.dot(s1, (w*v).T)
 
         # Compute the gradient of the trial solution for each input point.
-        delYt = np.zeros((n, m))
-        for i in range(n):
-            delYt[i] = self.tf.delYtf(x[i], N[i], delN[i])
+        delYt = self.tf.delYtf_v(x, N, delN)
 
         return delYt
 
-    def run_laplacian(self, x):
+    def run_laplacian(self, x, blocksize=DEFAULT_BLOCKSIZE):
         """Compute the trained Laplacian."""
 
-        # Fetch the number n of input points at which to calculate the
-        # output, and the number m of components of each point.
-        n = len(x)
-        m = len(x[0])
+        # Evaluate tensor-product grids in blocks of points.
+        if isinstance(x, TensorGrid):
+            return self.__run_grid(x, 2, blocksize)
 
         # Get references to the network parameters for convenience.
         w = self.w
@@ -179,9 +293,7 @@ class NNPDE2DIFF(SLFFNN):
         # Compute the net input, the sigmoid function and its
         # derivatives, for each hidden node and each training point.
         z = x.dot(w) + u
-        s = sigma_v(z)
-        s1 = dsigma_dz_v(z)
-        s2 = d2sigma_dz2_v(z)
+        (s, s1, s2) = sigma_derivatives_v(z, 2)
 
         # Compute the network output and its derivatives, for each
         # training point.
@@ -190,28 +302,24 @@ class NNPDE2DIFF(SLFFNN):
         del2N = s2.dot((w**2*v).T)
 
         # Compute the Laplacian components for the trial function.
-        del2Yt = np.zeros((n, m))
-        for i in range(n):
-            del2Yt[i] = self.tf.del2Ytf(x[i], N[i], delN[i], del2N[i])
+        del2Yt = self.tf.del2Ytf_v(x, N, delN, del2N)
 
         return del2Yt
 
 
     # Internal methods below this point
 
-    def __init__(self, eq, nhid=DEFAULT_NHID):
+    def __init__(self, eq, nhid=DEFAULT_NHID, rng=None):
+        super().__init__(rng)
+
+        # Reload an equation given as a PDE2DIFF1D, PDE2DIFF2D or PDE2DIFF3D
+        # object as a PDE2DIFF object, which reads its constant derivatives.
+        if not isinstance(eq, PDE2DIFF):
+            eq = PDE2DIFF(eq.name)
         self.eq = eq
         m = len(eq.bcf)
-        if m == 2:
-            self.tf = Diff1DTrialFunction(eq.bcf, eq.delbcf, eq.del2bcf)
-        elif m == 3:
-            self.tf = Diff2DTrialFunction(eq.bcf, eq.delbcf, eq.del2bcf)
-        elif m == 4:
-            self.tf = Diff3DTrialFunction(eq.bcf, eq.delbcf, eq.del2bcf)
-        else:
-            print("Unexpected problem dimensionality: %s!", m)
-            exit(1)
-        
+        self.tf = DiffTrialFunction(eq.bcf, eq.delbcf, eq.del2bcf)
+
         # If the supplied equation object has optimized versions of the
         # boundary condition function and derivatives, use them.
         pdemod = import_module(eq.name)
@@ -224,19 +332,54 @@ class NNPDE2DIFF(SLFFNN):
         if hasattr(pdemod, 'del2Af'):
             print("Using optimized del2Af().")
             self.tf.del2Af = pdemod.del2Af
+        if hasattr(pdemod, 'Af_v'):
+            print("Using optimized Af_v().")
+            self.tf.Af_v = pdemod.Af_v
+        if hasattr(pdemod, 'delAf_v'):
+            print("Using optimized delAf_v().")
+            self.tf.delAf_v = pdemod.delAf_v
+        if hasattr(pdemod, 'del2Af_v'):
+            print("Using optimized del2Af_v().")
+            self.tf.del2Af_v = pdemod.del2Af_v
 
         # Create the weight and bias arrays.
         self.w = np.zeros((m, nhid))
         self.u = np.zeros(nhid)
         self.v = np.zeros(nhid)
 
-        # Create the parameter history array.
-        self.phist = np.hstack((self.w.flatten(), self.u, self.v))
+        # Create the parameter history, starting with the initial
+        # parameters.
+        p = np.hstack((self.w.flatten(), self.u, self.v))
+        self.phistrec = ParameterHistory(len(p))
+        self.phistrec.record(p)
+
+        # Create the per-epoch RMSE history for the delta method.
+        self.rmsehistrec = ParameterHistory(1)
+
+        # Final training points from train_adaptive().
+        self.x_train = None
 
         # Initialize results from minimize().
         self.nit = 0
         self.res = None
 
+        # Cache of trial function terms for the current training set.
+        self.tfcache = None
+
+        # Training kernels selected by the 'backend' option, or None for
+        # the vectorized code.
+        self.kernels = None
+
+    @property
+    def phist(self):
+        """Recorded parameter history, one vector per row"""
+        return self.phistrec.array()
+
+    @property
+    def rmsehist(self):
+        """Recorded per-epoch RMSE history from the delta method"""
+        return self.rmsehistrec.array()[:, 0]
+
     def __str__(self):
         s = ''
         s += "NNPDEDIFF:\n"
@@ -269,27 +412,31 @@ class NNPDE2DIFF(SLFFNN):
         verbose = my_opts['verbose']
         eta = my_opts['eta']  # Learning rate
         maxepochs = my_opts['maxepochs']  # Number of training epochs
-        wmin = my_opts['wmin']  # Network parameter limits
-        wmax = my_opts['wmax']
-        umin = my_opts['umin']
-        umax = my_opts['umax']
-        vmin = my_opts['vmin']
-        vmax = my_opts['vmax']
 
         # Create the hidden node weights, biases, and output node weights.
-        w = np.random.uniform(wmin, wmax, (m, H))
-        u = np.random.uniform(umin, umax, H)
-        v = np.random.uniform(vmin, vmax, H)
+        (w, u, v) = self.__init_params(m, my_opts)
+
+        # Prepare the parameter and RMSE histories for one entry per epoch.
+        self.__start_phist((m + 2)*H, my_opts, maxepochs)
+        self.__start_rmsehist(my_opts, maxepochs)
 
         # Initial parameter deltas are 0.
         dE_dw = np.zeros((m, H))
         dE_du = np.zeros(H)
         dE_dv = np.zeros(H)
 
-        # This small identity matrix is used during the computation of
-        # some of the derivatives below.
-        kd = np.identity(m)
-        kd = kd[np.newaxis, :, :, np.newaxis]
+        # Fetch the parameter-independent trial function terms for the
+        # training points.
+        tfc = self.__get_tfcache(x)
+
+        # Allocate the activation and sigma function buffers once, and
+        # reuse them for each epoch.
+        z = np.empty((n, H))
+        s = np.empty((n, H))
+        s1 = np.empty((n, H))
+        s2 = np.empty((n, H))
+        s3 = np.empty((n, H))
+        sigma_work = np.empty((n, H))
 
         # Train the network for the specified number of epochs.
         for epoch in range(maxepochs):
@@ -302,137 +449,72 @@ class NNPDE2DIFF(SLFFNN):
             v -= eta*dE_dv
 
             # Log the current parameter values.
-            self.phist = np.vstack((self.phist,
-                                    np.hstack((w.flatten(), u, v))))
+            p = np.hstack((w.flatten(), u, v))
+            self.phistrec.record(p)
+
+            # Compute the error and its gradient with the training kernels,
+            # if selected.
+            if self.kernels is not None:
+                (E2, jac) = self.__compute_error_and_jacobian(p, x, tfc)
+                rmse = sqrt(E2/n)
+                self.rmsehistrec.record(rmse)
+                if verbose:
+                    print(epoch, rmse)
+                dE_dw = jac[:m*H].reshape((m, H))
+                dE_du = jac[m*H:(m + 1)*H]
+                dE_dv = jac[(m + 1)*H:]
+                continue
 
             # Compute the node activation, the sigmoid function and its
             # derivatives, for each hidden node and each training point.
-            z = x.dot(w) + u
-            s = sigma_v(z)
-            s1 = dsigma_dz_v(z)
-            s2 = d2sigma_dz2_v(z)
-            s3 = d3sigma_dz3_v(z)
+            np.dot(x, w, out=z)
+            z += u
+            sigma_derivatives_v(z, 3, (s, s1, s2, s3), sigma_work)
 
             # Compute the network output and its derivatives, for each
             # training point.
             N = s.dot(v)
             delN = s1.dot((w*v).T)
             del2N = s2.dot((w**2*v).T)
-            dN_dw = v*s1[:, np.newaxis, :]*x[:, :, np.newaxis]
-            dN_du = v*s1
-            dN_dv = s
-            d2N_dwdx = v[np.newaxis, np.newaxis, np.newaxis, :]* \
-                       (s1[:, np.newaxis, np.newaxis, :]*kd +
-                        s2[:, np.newaxis, np.newaxis, :]*w[np.newaxis, np.newaxis, :, :]*
-                        x[:, :, np.newaxis, np.newaxis])
-            d2N_dudx = v*s2[:, np.newaxis, :]*w[np.newaxis, :, :]
-            d2N_dvdx = s1[:, np.newaxis, :]*w[np.newaxis, :, :]
-            d3N_dwdx2 = v[np.newaxis, np.newaxis, np.newaxis, :]* \
-                       (2*s2[:, np.newaxis, np.newaxis, :]*w[np.newaxis, np.newaxis, :, :]*kd +
-                        s3[:, np.newaxis, np.newaxis, :]*w[np.newaxis, :, np.newaxis, :]**2*
-                        x[:, :, np.newaxis, np.newaxis])
-            d3N_dudx2 = v*s3[:, np.newaxis, :]*w[np.newaxis, :, :]**2
-            d3N_dvdx2 = s2[:, np.newaxis, :]*w[np.newaxis, :, :]**2
-
-            # Compute the value of the trial solution, its coefficients,
-            # and derivatives, for each training point.
-            P = np.zeros(n)
-            delP = np.zeros((n, m))
-            del2P = np.zeros((n, m))
-            Yt = np.zeros(n)
-            delYt = np.zeros((n, m))
-            del2Yt = np.zeros((n, m))
-            for i in range(n):
-                P[i] = self.tf.Pf(x[i])
-                delP[i] = self.tf.delPf(x[i])
-                del2P[i] = self.tf.del2Pf(x[i])
-                Yt[i] = self.tf.Ytf(x[i], N[i])
-                delYt[i] = self.tf.delYtf(x[i], N[i], delN[i])
-                del2Yt[i] = self.tf.del2Ytf(x[i], N[i], delN[i], del2N[i])
-            dYt_dw = P[:, np.newaxis, np.newaxis]*dN_dw
-            dYt_du = P[:, np.newaxis]*dN_du
-            dYt_dv = P[:, np.newaxis]*dN_dv
-            d2Yt_dwdx = P[:, np.newaxis, np.newaxis, np.newaxis]*d2N_dwdx + \
-                        delP[:, np.newaxis, :, np.newaxis]* \
-                        dN_dw[:, :, np.newaxis, :]
-            d2Yt_dudx = P[:, np.newaxis, np.newaxis]*d2N_dudx + \
-                        delP[:, :, np.newaxis]*dN_du[:, np.newaxis, :]
-            d2Yt_dvdx = P[:, np.newaxis, np.newaxis]*d2N_dvdx + \
-                        delP[:, :, np.newaxis]*dN_dv[:, np.newaxis, :]
-            d3Yt_dwdx2 = P[:, np.newaxis, np.newaxis, np.newaxis]*d3N_dwdx2 + \
-                         2*delP[:, np.newaxis, :, np.newaxis]*d2N_dwdx + \
-                         del2P[:, np.newaxis, :, np.newaxis]* \
-                         dN_dw[:, :, np.newaxis, :]
-            d3Yt_dudx2 = P[:, np.newaxis, np.newaxis]*d3N_dudx2 + \
-                         2*delP[:, :, np.newaxis]*d2N_dudx + \
-                         del2P[:, :, np.newaxis]*dN_du[:, np.newaxis, :]
-            d3Yt_dvdx2 = P[:, np.newaxis, np.newaxis]*d3N_dvdx2 + \
-                         2*delP[:, :, np.newaxis]*d2N_dvdx + \
-                         del2P[:, :, np.newaxis]*dN_dv[:, np.newaxis, :]
+
+            # Compute the value of the trial solution and its derivatives,
+            # for each training point.
+            Yt = tfc.Ytf_v(N)
+            delYt = tfc.delYtf_v(N, delN)
+            del2Yt = tfc.del2Ytf_v(N, delN, del2N)
 
             # Compute the value of the original differential equation
             # for each training point, and its derivatives.
-            G = np.zeros(n)
-            dG_dYt = np.zeros(n)
-            dG_ddelYt = np.zeros((n, m))
-            dG_ddel2Yt = np.zeros((n, m))
-            for i in range(n):
-                G[i] = self.eq.Gf(x[i], Yt[i], delYt[i], del2Yt[i])
-                dG_dYt[i] = self.eq.dG_dYf(x[i], Yt[i], delYt[i], del2Yt[i])
-                for j in range(m):
-                    dG_ddelYt[i, j] = \
-                        self.eq.dG_ddelYf[j](x[i], Yt[i], delYt[i], del2Yt[i])
-                    dG_ddel2Yt[i, j] = \
-                        self.eq.dG_ddel2Yf[j](x[i], Yt[i], delYt[i], del2Yt[i])
-
-            dG_dw = dG_dYt[:, np.newaxis, np.newaxis]*dYt_dw
-            for i in range(n):
-                for j in range(m):
-                    for k in range(H):
-                        for jj in range(m):
-                            dG_dw[i, j, k] += \
-                                dG_ddelYt[i, jj]*d2Yt_dwdx[i, j, jj, k] + \
-                                dG_ddel2Yt[i, jj]*d3Yt_dwdx2[i, j, jj, k]
-
-            dG_du = dG_dYt[:, np.newaxis]*dYt_du
-            for i in range(n):
-                for k in range(H):
-                    for j in range(m):
-                        dG_du[i, k] += \
-                            dG_ddelYt[i, j]*d2Yt_dudx[i, j, k] + \
-                            dG_ddel2Yt[i, j]*d3Yt_dudx2[i, j, k]
-
-            dG_dv = dG_dYt[:, np.newaxis]*dYt_dv
-            for i in range(n):
-                for k in range(H):
-                    for j in range(m):
-                        dG_dv[i, k] += \
-                            dG_ddelYt[i, j]*d2Yt_dvdx[i, j, k] + \
-                            dG_ddel2Yt[i, j]*d3Yt_dvdx2[i, j, k]
+            (G, dG_dYt, dG_ddelYt, dG_ddel2Yt) = \
+                self.__compute_G(x, Yt, delYt, del2Yt)
 
             # Compute the error function for this epoch.
             E2 = np.sum(G**2)
+            rmse = sqrt(E2/n)
+            self.rmsehistrec.record(rmse)
             if verbose:
-                rmse = sqrt(E2/n)
                 print(epoch, rmse)
 
             # Compute the partial derivatives of the error with respect to the
-            # network parameters.
-            dE_dw = np.zeros((m, H))
-            for j in range(m):
-                for k in range(H):
-                    for i in range(n):
-                        dE_dw[j, k] += 2*G[i]*dG_dw[i, j, k]
-
-            dE_du = np.zeros(H)
-            for k in range(H):
-                for i in range(n):
-                    dE_du[k] += 2*G[i]*dG_du[i, k]
-
-            dE_dv = np.zeros(H)
-            for k in range(H):
-                for i in range(n):
-                    dE_dv[k] += 2*G[i]*dG_dv[i, k]
+            # network parameters. G depends on the parameters only through
+            # N, delN and del2N, so collect the coefficients of their
+            # parameter derivatives, and contract them with the network
+            # derivatives without forming any arrays larger than (n, H).
+            (c0, c1, c2) = self.__compute_coefficients(
+                tfc, dG_dYt, dG_ddelYt, dG_ddel2Yt)
+            a0 = 2*G*c0
+            a1 = 2*G[:, np.newaxis]*c1
+            a2 = 2*G[:, np.newaxis]*c2
+            b1 = a1.dot(w)
+            b2 = a2.dot(w**2)
+            q = a0[:, np.newaxis]*s1 + s2*b1 + s3*b2
+            dE_dw = v*(x.T.dot(q) + a1.T.dot(s1) + 2*w*a2.T.dot(s2))
+            dE_du = v*np.sum(q, axis=0)
+            dE_dv = np.sum(a0[:, np.newaxis]*s + s1*b1 + s2*b2, axis=0)
+
+        # Write any buffered history to disk.
+        self.phistrec.flush()
+        self.rmsehistrec.flush()
 
         # Save the optimized parameters.
         self.w = w
@@ -461,17 +543,118 @@ class NNPDE2DIFF(SLFFNN):
         # Create the hidden node weights, biases, and output node weights.
         m = len(self.eq.bcf)
         H = my_opts['nhid']
-        self.w = np.random.uniform(my_opts['wmin'], my_opts['wmax'], (m, H))
-        self.u = np.random.uniform(my_opts['umin'], my_opts['umax'], H)
-        self.v = np.random.uniform(my_opts['vmin'], my_opts['vmax'], H)
+        (self.w, self.u, self.v) = self.__init_params(m, my_opts)
 
         # Assemble the network parameters into a single 1-D vector for
         # use by the minimize() method.
         p = np.hstack((self.w.flatten(), self.u, self.v))
 
-        res = minimize(self.__compute_error, p, method=trainalg,
-                        args=(x), jac=None, hess=None,
-                        options=options, callback=callback)
+        # Prepare the parameter history.
+        self.__start_phist(len(p), my_opts)
+
+        # Select the error functions, evaluated in chunks of points on a
+        # thread pool if requested.
+        pool = None
+        compute_error = self.__compute_error
+        compute_error_and_jacobian = self.__compute_error_and_jacobian
+        if my_opts['nthreads'] > 1:
+            pool = ThreadPoolExecutor(max_workers=my_opts['nthreads'])
+            chunks = self.__make_chunks(x, my_opts['nthreads'])
+
+            def compute_error(p, x):
+                results = self.__map_chunks(pool, self.__compute_residual,
+                                            p, chunks)
+                return sum(np.sum(G**2) for G in results)
+
+            def compute_error_and_jacobian(p, x):
+                results = self.__map_chunks(
+                    pool, self.__compute_error_and_jacobian, p, chunks)
+                return (sum(r[0] for r in results),
+                        sum(r[1] for r in results))
+
+        # Use the analytical Jacobian for the gradient-based methods.
+        try:
+            if my_opts['use_jacobian'] and trainalg in ('CG', 'BFGS'):
+                res = minimize(compute_error_and_jacobian, p,
+                               method=trainalg, args=(x), jac=True,
+                               options=options, callback=callback)
+            else:
+                res = minimize(compute_error, p, method=trainalg,
+                               args=(x), jac=None, hess=None,
+                               options=options, callback=callback)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        if my_opts['verbose']:
+            print('res =', res)
+        self.res = res
+        self.phistrec.flush()
+
+        # Unpack the optimized network parameters.
+        for j in range(m):
+            self.w[j] = res.x[j*H:(j + 1)*H]
+        self.u = res.x[m*H:(m + 1)*H]
+        self.v = res.x[(m + 1)*H:(m + 2)*H]
+
+    def __train_least_squares(self, x, trainalg, opts=DEFAULT_OPTS,
+                              options=None):
+        """Train using the scipy least_squares() function"""
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert x.any()
+        assert my_opts['vmin'] < my_opts['vmax']
+        assert my_opts['wmin'] < my_opts['wmax']
+        assert my_opts['umin'] < my_opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        m = len(self.eq.bcf)
+        H = my_opts['nhid']
+        (self.w, self.u, self.v) = self.__init_params(m, my_opts)
+
+        # Assemble the network parameters into a single 1-D vector for
+        # use by the least_squares() method.
+        p = np.hstack((self.w.flatten(), self.u, self.v))
+
+        # The 'lm' method needs at least one residual per parameter.
+        assert trainalg != 'lm' or len(x) >= len(p), \
+            "The 'lm' algorithm needs at least %d training points, one per " \
+            "network parameter." % len(p)
+
+        # Minimize the sum of the squared residuals, using the residual
+        # Jacobian. Any options are passed through to least_squares().
+        if options is None:
+            options = {}
+        verbose = 2 if my_opts['verbose'] else 0
+
+        # Evaluate the residual and its Jacobian in chunks of points on a
+        # thread pool if requested.
+        pool = None
+        compute_residual = self.__compute_residual
+        compute_residual_jacobian = self.__compute_residual_jacobian
+        if my_opts['nthreads'] > 1:
+            pool = ThreadPoolExecutor(max_workers=my_opts['nthreads'])
+            chunks = self.__make_chunks(x, my_opts['nthreads'])
+
+            def compute_residual(p, x):
+                return np.concatenate(self.__map_chunks(
+                    pool, self.__compute_residual, p, chunks))
+
+            def compute_residual_jacobian(p, x):
+                return np.vstack(self.__map_chunks(
+                    pool, self.__compute_residual_jacobian, p, chunks))
+
+        try:
+            res = least_squares(compute_residual, p,
+                                jac=compute_residual_jacobian,
+                                method=trainalg, args=(x,), verbose=verbose,
+                                **options)
+        finally:
+            if pool:
+                pool.shutdown()
 
         if my_opts['verbose']:
             print('res =', res)
@@ -480,11 +663,74 @@ class NNPDE2DIFF(SLFFNN):
         # Unpack the optimized network parameters.
         for j in range(m):
             self.w[j] = res.x[j*H:(j + 1)*H]
-        self.u = res.x[(m - 1)*H:m*H]
-        self.v = res.x[m*H:(m + 1)*H]
+        self.u = res.x[m*H:(m + 1)*H]
+        self.v = res.x[(m + 1)*H:(m + 2)*H]
+
+    def __train_stochastic(self, x, trainalg, opts=DEFAULT_OPTS,
+                           options=None):
+        """Train using a mini-batch stochastic gradient method. Any options
+        are passed through to minimize_stochastic()."""
+
+        my_opts = dict(DEFAULT_OPTS)
+        my_opts.update(opts)
+
+        # Sanity-check arguments.
+        assert x.any()
+        assert my_opts['maxepochs'] > 0
+        assert my_opts['eta'] > 0
+        assert my_opts['vmin'] < my_opts['vmax']
+        assert my_opts['wmin'] < my_opts['wmax']
+        assert my_opts['umin'] < my_opts['umax']
+
+        # Create the hidden node weights, biases, and output node weights.
+        n = len(x)
+        m = len(self.eq.bcf)
+        H = my_opts['nhid']
+        (self.w, self.u, self.v) = self.__init_params(m, my_opts)
+        p = np.hstack((self.w.flatten(), self.u, self.v))
+
+        # Prepare the parameter and RMSE histories for one entry per epoch.
+        maxepochs = my_opts['maxepochs']
+        self.__start_phist(len(p), my_opts, maxepochs)
+        self.__start_rmsehist(my_opts, maxepochs)
+
+        # Compute the trial function terms for all training points once,
+        # and select the rows for each batch from them.
+        tfc = self.__get_tfcache(x)
+
+        def fun(p, i):
+            xb = x[i]
+            return self.__compute_error_and_jacobian(p, xb, tfc.subset(i, xb))
+
+        def callback(p, E2):
+            self.phistrec.record(p)
+            rmse = sqrt(E2/n)
+            self.rmsehistrec.record(rmse)
+            if my_opts['verbose']:
+                print(self.rmsehistrec.ncalls - 1, rmse)
+
+        res = minimize_stochastic(fun, p, n, trainalg, my_opts['eta'],
+                                  maxepochs, options=options,
+                                  callback=callback, rng=self.rng)
+        self.phistrec.flush()
+        self.rmsehistrec.flush()
+        self.res = res
+
+        # Unpack the optimized network parameters.
+        self.w = res.x[:m*H].reshape((m, H))
+        self.u = res.x[m*H:(m + 1)*H]
+        self.v = res.x[(m + 1)*H:(m + 2)*H]
 
     def __compute_error(self, p, x):
         """Compute the current error in the trained solution."""
+        G = self.__compute_residual(p, x)
+        E2 = np.sum(G**2)
+        return E2
+
+    def __compute_residual(self, p, x, tfc=None):
+        """Compute the differential equation residual at each point."""
+        if self.kernels is not None:
+            return self.__compute_residual_kernels(p, x, tfc)
 
         # Unpack the network parameters.
         n = len(x)
@@ -493,14 +739,12 @@ class NNPDE2DIFF(SLFFNN):
         w = np.zeros((m, H))
         for j in range(m):
             w[j] = p[j*H:(j + 1)*H]
-        u = p[(m - 1)*H:m*H]
-        v = p[m*H:(m + 1)*H]
+        u = p[m*H:(m + 1)*H]
+        v = p[(m + 1)*H:(m + 2)*H]
 
         # Weighted inputs and transfer functions and derivatives.
         z = x.dot(w) + u
-        s = sigma_v(z)
-        s1 = dsigma_dz_v(z)
-        s2 = d2sigma_dz2_v(z)
+        (s, s1, s2) = sigma_derivatives_v(z, 2)
 
         # Network output and derivatives.
         N = s.dot(v)
@@ -508,22 +752,335 @@ class NNPDE2DIFF(SLFFNN):
         del2N = s2.dot((w**2*v).T)
 
         # Trial function and derivatives
-        Yt = np.zeros(n)
-        delYt = np.zeros((n, m))
-        del2Yt = np.zeros((n, m))
-        for i in range(n):
-            Yt[i] = self.tf.Ytf(x[i], N[i])
-            delYt[i] = self.tf.delYtf(x[i], N[i], delN[i])
-            del2Yt[i] = self.tf.del2Ytf(x[i], N[i], delN[i], del2N[i])
+        if tfc is None:
+            tfc = self.__get_tfcache(x)
+        Yt = tfc.Ytf_v(N)
+        delYt = tfc.delYtf_v(N, delN)
+        del2Yt = tfc.del2Ytf_v(N, delN, del2N)
 
         # Differential equation
-        G = np.zeros(n)
-        for i in range(n):
-            G[i] = self.eq.Gf(x[i], Yt[i], delYt[i], del2Yt[i])
+        G = self.eq.Gf_v(x, Yt, delYt, del2Yt)
+
+        return G
+
+    def __compute_error_and_jacobian(self, p, x, tfc=None):
+        """Compute the squared error and its gradient (Jacobian)."""
+        if self.kernels is not None:
+            return self.__compute_error_and_jacobian_kernels(p, x, tfc)
+
+        # Unpack the network parameters.
+        n = len(x)
+        m = len(x[0])
+        H = int(len(p)/(m + 2))
+        w = p[:m*H].reshape((m, H))
+        u = p[m*H:(m + 1)*H]
+        v = p[(m + 1)*H:(m + 2)*H]
+
+        # Weighted inputs and transfer functions and derivatives.
+        z = x.dot(w) + u
+        (s, s1, s2, s3) = sigma_derivatives_v(z, 3)
+
+        # Network output and derivatives.
+        N = s.dot(v)
+        delN = s1.dot((w*v).T)
+        del2N = s2.dot((w**2*v).T)
+
+        # Trial function and derivatives
+        if tfc is None:
+            tfc = self.__get_tfcache(x)
+        Yt = tfc.Ytf_v(N)
+        delYt = tfc.delYtf_v(N, delN)
+        del2Yt = tfc.del2Ytf_v(N, delN, del2N)
+
+        # Differential equation and its derivatives
+        (G, dG_dYt, dG_ddelYt, dG_ddel2Yt) = \
+            self.__compute_G(x, Yt, delYt, del2Yt)
 
         E2 = np.sum(G**2)
 
-        return E2
+        # Since Yt = A + P*N, G depends on the network parameters only
+        # through N, delN and del2N. Collect the coefficients of the
+        # parameter derivatives of these terms in dE/dp = 2*sum(G*dG/dp).
+        (c0, c1, c2) = self.__compute_coefficients(
+            tfc, dG_dYt, dG_ddelYt, dG_ddel2Yt)
+        a0 = 2*G*c0
+        a1 = 2*G[:, np.newaxis]*c1
+        a2 = 2*G[:, np.newaxis]*c2
+
+        # Contract the coefficients with the network derivatives, without
+        # forming any arrays larger than (n, H).
+        b1 = a1.dot(w)
+        b2 = a2.dot(w**2)
+        q = a0[:, np.newaxis]*s1 + s2*b1 + s3*b2
+        dE_dw = v*(x.T.dot(q) + a1.T.dot(s1) + 2*w*a2.T.dot(s2))
+        dE_du = v*np.sum(q, axis=0)
+        dE_dv = np.sum(a0[:, np.newaxis]*s + s1*b1 + s2*b2, axis=0)
+
+        jac = np.hstack((dE_dw.flatten(), dE_du, dE_dv))
+        return E2, jac
+
+    def __compute_residual_jacobian(self, p, x, tfc=None):
+        """Compute the Jacobian of the residual wrt network parameters."""
+        if self.kernels is not None:
+            return self.__compute_residual_jacobian_kernels(p, x, tfc)
+
+        # Unpack the network parameters.
+        n = len(x)
+        m = len(x[0])
+        H = int(len(p)/(m + 2))
+        w = p[:m*H].reshape((m, H))
+        u = p[m*H:(m + 1)*H]
+        v = p[(m + 1)*H:(m + 2)*H]
+
+        # Weighted inputs and transfer functions and derivatives.
+        z = x.dot(w) + u
+        (s, s1, s2, s3) = sigma_derivatives_v(z, 3)
+
+        # Network output and derivatives.
+        N = s.dot(v)
+        delN = s1.dot((w*v).T)
+        del2N = s2.dot((w**2*v).T)
+
+        # Trial function and derivatives
+        if tfc is None:
+            tfc = self.__get_tfcache(x)
+        Yt = tfc.Ytf_v(N)
+        delYt = tfc.delYtf_v(N, delN)
+        del2Yt = tfc.del2Ytf_v(N, delN, del2N)
+
+        # Differential equation derivatives
+        (G, dG_dYt, dG_ddelYt, dG_ddel2Yt) = \
+            self.__compute_G(x, Yt, delYt, del2Yt)
+
+        # Coefficients of the parameter derivatives of N, delN and del2N
+        # in dG/dp (see __compute_error_and_jacobian()).
+        (c0, c1, c2) = self.__compute_coefficients(
+            tfc, dG_dYt, dG_ddelYt, dG_ddel2Yt)
+
+        # Assemble the (n, (m + 2)*H) Jacobian.
+        b1 = c1.dot(w)
+        b2 = c2.dot(w**2)
+        q = c0[:, np.newaxis]*s1 + s2*b1 + s3*b2
+        dG_dw = v*(x[:, :, np.newaxis]*q[:, np.newaxis, :] +
+                   c1[:, :, np.newaxis]*s1[:, np.newaxis, :] +
+                   2*w*c2[:, :, np.newaxis]*s2[:, np.newaxis, :])
+        dG_du = v*q
+        dG_dv = c0[:, np.newaxis]*s + s1*b1 + s2*b2
+
+        jac = np.hstack((dG_dw.reshape((n, m*H)), dG_du, dG_dv))
+        return jac
+
+    def __compute_residual_kernels(self, p, x, tfc=None):
+        """Compute the residual with the training kernels."""
+        (params, Yt, delYt, del2Yt) = self.__forward_kernels(p, x, tfc)
+        return self.eq.Gf_v(x, Yt, delYt, del2Yt)
+
+    def __compute_error_and_jacobian_kernels(self, p, x, tfc=None):
+        """Compute the squared error and its gradient with the training
+        kernels."""
+        if tfc is None:
+            tfc = self.__get_tfcache(x)
+        ((w, u, v), Yt, delYt, del2Yt) = self.__forward_kernels(p, x, tfc)
+        (G, dG_dYt, dG_ddelYt, dG_ddel2Yt) = \
+            self.__compute_G(x, Yt, delYt, del2Yt)
+        (c0, c1, c2) = self.__compute_coefficients(
+            tfc, dG_dYt, dG_ddelYt, dG_ddel2Yt)
+        jac = self.kernels.gradient(x, w, u, v, 2*G*c0,
+                                    2*G[:, np.newaxis]*c1,
+                                    2*G[:, np.newaxis]*c2)
+        return np.sum(G**2), jac
+
+    def __compute_residual_jacobian_kernels(self, p, x, tfc=None):
+        """Compute the residual Jacobian with the training kernels."""
+        if tfc is None:
+            tfc = self.__get_tfcache(x)
+        ((w, u, v), Yt, delYt, del2Yt) = self.__forward_kernels(p, x, tfc)
+        (G, dG_dYt, dG_ddelYt, dG_ddel2Yt) = \
+            self.__compute_G(x, Yt, delYt, del2Yt)
+        (c0, c1, c2) = self.__compute_coefficients(
+            tfc, dG_dYt, dG_ddelYt, dG_ddel2Yt)
+        return self.kernels.jacobian(x, w, u, v, c0, c1, c2)
+
+    def __forward_kernels(self, p, x, tfc=None):
+        """Unpack the network parameters, and compute the trial function
+        and its derivatives with the training kernels."""
+        m = x.shape[1]
+        H = len(p)//(m + 2)
+        w = p[:m*H].reshape((m, H))
+        u = p[m*H:(m + 1)*H]
+        v = p[(m + 1)*H:]
+        (N, delN, del2N) = self.kernels.forward(x, w, u, v)
+        if tfc is None:
+            tfc = self.__get_tfcache(x)
+        return ((w, u, v), tfc.Ytf_v(N), tfc.delYtf_v(N, delN),
+                tfc.del2Ytf_v(N, delN, del2N))
+
+    def __compute_G(self, x, Yt, delYt, del2Yt):
+        """Compute the differential equation and its derivatives."""
+        # Constant derivatives are returned as their values, a float for
+        # dG/dY and an (m,) array for dG/ddelY and dG/ddel2Y, which
+        # broadcast against the (n,) and (n, m) arrays of the other terms.
+        eq = self.eq
+        G = eq.Gf_v(x, Yt, delYt, del2Yt)
+        if eq.dG_dY_kind == VARIABLE:
+            dG_dYt = eq.dG_dYf_v(x, Yt, delYt, del2Yt)
+        else:
+            dG_dYt = eq.dG_dY_const
+        if eq.dG_ddelY_kind == VARIABLE:
+            dG_ddelYt = eq.dG_ddelYf_v(x, Yt, delYt, del2Yt)
+        else:
+            dG_ddelYt = eq.dG_ddelY_const
+        if eq.dG_ddel2Y_kind == VARIABLE:
+            dG_ddel2Yt = eq.dG_ddel2Yf_v(x, Yt, delYt, del2Yt)
+        else:
+            dG_ddel2Yt = eq.dG_ddel2Y_const
+        return (G, dG_dYt, dG_ddelYt, dG_ddel2Yt)
+
+    def __compute_coefficients(self, tfc, dG_dYt, dG_ddelYt, dG_ddel2Yt):
+        """Compute the coefficients of N, delN and del2N in dG/dp."""
+        # Since Yt = A + P*N, dG/dp = c0*dN/dp + sum(c1*ddelN/dp) +
+        # sum(c2*ddel2N/dp). Terms for derivatives classified as zero are
+        # skipped.
+        eq = self.eq
+        P = tfc.P
+        delP = tfc.delP
+        del2P = tfc.del2P
+        c0 = np.zeros(len(P))
+        c1 = np.zeros(delP.shape)
+        c2 = np.zeros(del2P.shape)
+        if eq.dG_dY_kind != ZERO:
+            c0 += dG_dYt*P
+        if eq.dG_ddelY_kind != ZERO:
+            c0 += np.sum(dG_ddelYt*delP, axis=1)
+            c1 += dG_ddelYt*P[:, np.newaxis]
+        if eq.dG_ddel2Y_kind != ZERO:
+            c0 += np.sum(dG_ddel2Yt*del2P, axis=1)
+            c1 += 2*dG_ddel2Yt*delP
+            c2 += dG_ddel2Yt*P[:, np.newaxis]
+        return (c0, c1, c2)
+
+    def __run_grid(self, grid, order, blocksize):
+        """Compute the trained solution (order 0), gradient (1), or
+        Laplacian (2) on a tensor-product grid."""
+
+        # Get references to the network parameters for convenience.
+        w = self.w
+        u = self.u
+        v = self.v
+        H = len(v)
+        m = grid.m
+
+        # Compute the contribution of each axis coordinate to the
+        # activation of each hidden node, (len(axes[j]), H) for each axis.
+        # The activations for a block of points are the sums of the
+        # contributions for their coordinates, so no (n, m) or (n, H)
+        # arrays are created for the whole grid.
+        zaxes = [np.outer(a, w[j]) for (j, a) in enumerate(grid.axes)]
+        if order == 0:
+            result = np.empty(grid.n)
+        else:
+            result = np.empty((grid.n, m))
+
+        # Allocate the activation and sigma function buffers for one block.
+        nb = min(blocksize, grid.n)
+        zbuf = np.empty((nb, H))
+        sbuf = [np.empty((nb, H)) for i in range(order + 1)]
+        work = np.empty((nb, H))
+
+        for (start, stop) in grid.blocks(blocksize):
+            k = stop - start
+            idx = grid.indices(start, stop)
+            x = np.stack([a[i] for (a, i) in zip(grid.axes, idx)], axis=1)
+            z = zbuf[:k]
+            z[:] = u
+            for (za, i) in zip(zaxes, idx):
+                z += za[i]
+            s = sigma_derivatives_v(z, order, [b[:k] for b in sbuf],
+                                    work[:k])
+            N = s[0].dot(v)
+            if order == 0:
+                result[start:stop] = self.tf.Ytf_v(x, N)
+            elif order == 1:
+                delN = s[1].dot((w*v).T)
+                result[start:stop] = self.tf.delYtf_v(x, N, delN)
+            else:
+                delN = s[1].dot((w*v).T)
+                del2N = s[2].dot((w**2*v).T)
+                result[start:stop] = self.tf.del2Ytf_v(x, N, delN, del2N)
+
+        return result.reshape(grid.shape + result.shape[1:])
+
+    def __init_params(self, m, opts):
+        """Return random initial network parameters (w, u, v), or copies of
+        the current parameters for a warm start."""
+        H = opts['nhid']
+        if opts['warm_start']:
+            assert self.w.shape == (m, H)
+            return (self.w.copy(), self.u.copy(), self.v.copy())
+        w = self.rng.uniform(opts['wmin'], opts['wmax'], (m, H))
+        u = self.rng.uniform(opts['umin'], opts['umax'], H)
+        v = self.rng.uniform(opts['vmin'], opts['vmax'], H)
+        return (w, u, v)
+
+    def __make_chunks(self, x, nchunks):
+        """Split the training points, and their trial function cache, into
+        nchunks contiguous chunks."""
+        tfc = self.__get_tfcache(x)
+        bounds = np.linspace(0, len(x), nchunks + 1).astype(int)
+        chunks = []
+        for (start, stop) in zip(bounds[:-1], bounds[1:]):
+            if stop > start:
+                i = slice(start, stop)
+                chunks.append((x[i], tfc.subset(i, x[i])))
+        return chunks
+
+    def __map_chunks(self, pool, f, p, chunks):
+        """Evaluate f(p, x, tfc) for each chunk on the thread pool. Each
+        chunk has its own cache, so the threads share no mutable state, and
+        the NumPy operations release the GIL."""
+        return list(pool.map(lambda chunk: f(p, *chunk), chunks))
+
+    def __get_tfcache(self, x):
+        """Return the trial function cache for the training points x."""
+        if self.tfcache is None or not self.tfcache.matches(self.tf, x):
+            # The saved BC values for the old points are not needed again.
+            self.tf.bcache.clear()
+            self.tfcache = TrialFunctionCache(self.tf, x)
+        return self.tfcache
+
+    def __start_phist(self, nparams, opts, nrecords=0):
+        """Configure the parameter history for a training run."""
+        assert opts['phist_stride'] >= 1
+        # A warm start continues the current history.
+        if opts['warm_start'] and nparams == self.phistrec.nparams:
+            self.phistrec.enabled = opts['phist']
+            self.phistrec.stride = opts['phist_stride']
+            self.phistrec.reserve(-(-nrecords//opts['phist_stride']))
+            return
+        self.phistrec.close()
+        # Stream the history to a new file if requested, otherwise start a
+        # new in-memory history if the number of parameters has changed,
+        # or if the previous history was streamed to a file.
+        if opts['phist_file'] is not None:
+            self.phistrec = DiskParameterHistory(opts['phist_file'], nparams)
+        elif (nparams != self.phistrec.nparams or
+              isinstance(self.phistrec, DiskParameterHistory)):
+            self.phistrec = ParameterHistory(nparams)
+        self.phistrec.enabled = opts['phist']
+        self.phistrec.stride = opts['phist_stride']
+        self.phistrec.reserve(-(-nrecords//opts['phist_stride']))
+
+    def __start_rmsehist(self, opts, nrecords=0):
+        """Configure the RMSE history for a training run."""
+        if opts['warm_start']:
+            self.rmsehistrec.reserve(nrecords)
+            return
+        self.rmsehistrec.close()
+        if opts['rmsehist_file'] is not None:
+            self.rmsehistrec = DiskParameterHistory(opts['rmsehist_file'], 1)
+        elif isinstance(self.rmsehistrec, DiskParameterHistory):
+            self.rmsehistrec = ParameterHistory(1)
+        self.rmsehistrec.reserve(nrecords)
 
     def __print_progress(self, xk):
         """Callback to print progress message from optimizer"""
@@ -531,7 +1088,7 @@ class NNPDE2DIFF(SLFFNN):
         self.nit += 1
         # print('xk =', xk)
         # Log the current parameters.
-        self.phist = np.vstack((self.phist, xk))
+        self.phistrec.record(xk)
 
 #########
 
@@ -539,6 +1096,12 @@ class NNPDE2DIFF(SLFFNN):
 
 if __name__ == '__main__':
 
+    from scipy.optimize import approx_fprime, check_grad
+    from time import time
+
+    from samplers import sobol_points
+    from trainingdata import create_training_grid
+
     # Create training data.
 
     # Training point counts in each dimension
@@ -553,42 +1116,118 @@ if __name__ == '__main__':
     zt = np.linspace(0, 1, nz)
     tt = np.linspace(0, 1, nt)
 
-    # 1-D training points
-    x_train1 = np.zeros((nx*nt, 2))
-    ii = 0
-    for l in range(nt):
-        for i in range(nx):
-            x_train1[ii, 0] = xt[i]
-            x_train1[ii, 1] = tt[l]
-            ii += 1
+    # 1-, 2-, and 3-D training points
+    x_train1 = create_training_grid([nx, nt])
     n1 = len(x_train1)
-
-    # 2-D training points
-    x_train2 = np.zeros((nx*ny*nt, 3))
-    ii = 0
-    for l in range(nt):
-        for j in range(ny):
-            for i in range(nx):
-                x_train2[ii, 0] = xt[i]
-                x_train2[ii, 1] = yt[j]
-                x_train2[ii, 2] = tt[l]
-                ii += 1
+    x_train2 = create_training_grid([nx, ny, nt])
     n2 = len(x_train2)
-
-    # 3-D training points
-    x_train3 = np.zeros((nx*ny*nz*nt, 4))
-    ii = 0
-    for l in range(nt):
-        for k in range(nz):
-            for j in range(ny):
-                for i in range(nx):
-                    x_train3[ii, 0] = xt[i]
-                    x_train3[ii, 1] = yt[j]
-                    x_train3[ii, 2] = zt[k]
-                    x_train3[ii, 3] = tt[l]
-                    ii += 1
+    x_train3 = create_training_grid([nx, ny, nz, nt])
     n3 = len(x_train3)
 
+    # Check the analytical Jacobian against a finite-difference
+    # approximation, then compare BFGS training times with and without it.
+    print('Checking analytical Jacobian for diff2d_halfsine.')
+    eq = PDE2DIFF('diff2d_halfsine')
+    net = NNPDE2DIFF(eq)
+    np.random.seed(0)
+    p = np.random.uniform(-1, 1, (3 + 2)*DEFAULT_NHID)
+    f = lambda p: net._NNPDE2DIFF__compute_error(p, x_train2)
+    fj = lambda p: net._NNPDE2DIFF__compute_error_and_jacobian(p, x_train2)
+    jac_err = check_grad(f, lambda p: fj(p)[1], p)
+    jac_fd = approx_fprime(p, f)
+    print('Jacobian error vs finite differences =', jac_err)
+    if jac_err > 1e-5*np.linalg.norm(jac_fd):
+        print('ERROR: Analytical Jacobian does not match finite differences!')
+    for use_jacobian in (False, True):
+        np.random.seed(0)
+        net = NNPDE2DIFF(eq)
+        t0 = time()
+        net.train(x_train2, trainalg='BFGS',
+                  opts={'use_jacobian': use_jacobian},
+                  options={'maxiter': 20})
+        t1 = time()
+        print('BFGS use_jacobian=%s: %d evaluations, E = %s, %.3f s' %
+              (use_jacobian, net.res.nfev, net.res.fun, t1 - t0))
+
+    # Check that thread-parallel chunked training matches serial training.
+    print('Checking thread-parallel training.')
+    results = []
+    for nthreads in (1, 3):
+        net_t = NNPDE2DIFF(eq, rng=0)
+        net_t.train(x_train2, trainalg='BFGS', opts={'nthreads': nthreads},
+                    options={'maxiter': 5})
+        results.append(net_t.res.x)
+    if not np.allclose(results[0], results[1]):
+        print('ERROR: Thread-parallel training does not match serial!')
+
+    # Check that the training kernels match the vectorized code.
+    print('Checking training kernels.')
+    for (trainalg, options) in (('delta', None), ('BFGS', {'maxiter': 5}),
+                                ('trf', {'max_nfev': 5})):
+        results = []
+        for backend in ('numpy', 'numba'):
+            net_k = NNPDE2DIFF(eq, rng=0)
+            net_k.train(x_train2, trainalg=trainalg,
+                        opts={'backend': backend, 'maxepochs': 10},
+                        options=options)
+            results.append(np.hstack((net_k.w.flatten(), net_k.u, net_k.v)))
+        if not np.allclose(results[0], results[1]):
+            print('ERROR: %s training kernels do not match vectorized code!'
+                  % trainalg)
+
+    # Check that adaptive refinement adds nadd points per refinement and
+    # does not increase the largest residual on the candidate points, and
+    # that a warm start continues from the current parameters.
+    print('Checking adaptive training point refinement.')
+    x_init = create_training_grid([4, 4, 4])
+    x_cand = sobol_points(256, 3, seed=0)
+    (nadd, nrefine) = (10, 3)
+    for (trainalg, options) in (('delta', None), ('BFGS', {'maxiter': 50})):
+        net_a = NNPDE2DIFF(eq, rng=0)
+        net_a.train(x_init, trainalg=trainalg, opts={'maxepochs': 200},
+                    options=options)
+        Gmax0 = np.abs(net_a.residual(x_cand)).max()
+        net_a = NNPDE2DIFF(eq, rng=0)
+        net_a.train_adaptive(x_init, x_cand, trainalg=trainalg,
+                             opts={'maxepochs': 200, 'nadd': nadd,
+                                   'nrefine': nrefine},
+                             options=options)
+        if len(net_a.x_train) != len(x_init) + nrefine*nadd:
+            print('ERROR: %s refinement added %d points, not %d!' %
+                  (trainalg, len(net_a.x_train) - len(x_init),
+                   nrefine*nadd))
+        Gmax = np.abs(net_a.residual(x_cand)).max()
+        if Gmax > Gmax0:
+            print('ERROR: %s refinement increased max |G| from %s to %s!' %
+                  (trainalg, Gmax0, Gmax))
+        p_a = np.hstack((net_a.w.flatten(), net_a.u, net_a.v))
+        net_a.train(net_a.x_train, trainalg='BFGS',
+                    opts={'warm_start': True}, options={'maxiter': 0})
+        if not np.array_equal(np.hstack((net_a.w.flatten(), net_a.u,
+                                         net_a.v)), p_a):
+            print('ERROR: %s warm start did not continue from the current '
+                  'parameters!' % trainalg)
+
+    # Check that dropping points keeps enough points for 'lm'.
+    net_a = NNPDE2DIFF(eq, rng=0)
+    net_a.train_adaptive(x_init, x_cand, trainalg='lm',
+                         opts={'nadd': nadd, 'nrefine': 2, 'drop_tol': np.inf},
+                         options={'max_nfev': 5})
+    if len(net_a.x_train) < (3 + 2)*DEFAULT_NHID:
+        print('ERROR: lm refinement dropped too many training points!')
+
+    # Check the tensor-product grid evaluation against the point array
+    # evaluation, using the BFGS-trained network.
+    print('Checking tensor-product grid evaluation.')
+    grid = TensorGrid([xt, yt, tt])
+    x_grid = grid.points()
+    for f in (net.run, net.run_gradient, net.run_laplacian):
+        r_grid = f(grid, blocksize=64)
+        r = f(x_grid)
+        if not np.allclose(r_grid.reshape(r.shape), r):
+            print('ERROR: Grid evaluation of %s() is incorrect!' %
+                  f.__name__)
+
     # Options for scipy.optimize.minimize()
     minimize_options = {}
     minimize_options['disp'] = True  # Set for convergence report.
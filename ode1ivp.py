@@ -19,6 +19,9 @@ Attributes:
     dG_ddYdx - Function for derivative of Gf wrt dY/dx
     Ya - (Optional) function for analytical solution Ya(x)
     dYa_dx - (Optional) function for analytical derivative dY_x(x)
+    *_v - Array versions of the equation and analytical solution
+        functions, from the module if defined, otherwise created from the
+        scalar versions
 
 Methods:
 
@@ -29,6 +32,7 @@ Todo:
 from importlib import import_module
 
 from ode1 import ODE1
+from vectorize import vectorized
 
 
 class ODE1IVP(ODE1):
@@ -49,6 +53,11 @@ class ODE1IVP(ODE1):
         self.dG_ddYdx = None
         self.Ya = None
         self.dYa_dx = None
+        self.G_v = None
+        self.dG_dY_v = None
+        self.dG_ddYdx_v = None
+        self.Ya_v = None
+        self.dYa_dx_v = None
         if diffeqmod:
             self.name = diffeqmod
             odemod = import_module(diffeqmod)
@@ -64,6 +73,14 @@ class ODE1IVP(ODE1):
                 self.Ya = odemod.Ya
             if odemod.dYa_dx:
                 self.dYa_dx = odemod.dYa_dx
+            # Use the array versions of the equation functions if the
+            # module defines them, otherwise create them from the scalar
+            # versions.
+            self.G_v = vectorized(odemod, 'G_v', self.G)
+            self.dG_dY_v = vectorized(odemod, 'dG_dY_v', self.dG_dY)
+            self.dG_ddYdx_v = vectorized(odemod, 'dG_ddYdx_v', self.dG_ddYdx)
+            self.Ya_v = vectorized(odemod, 'Ya_v', self.Ya)
+            self.dYa_dx_v = vectorized(odemod, 'dYa_dx_v', self.dYa_dx)
 
 
 if __name__ == '__main__':
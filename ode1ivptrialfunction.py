@@ -41,13 +41,18 @@ Methods:
         at xv with network output N, network output gradient
         delN, and network output Hessian deldelN
 
+    Af_v(X), delAf_v(X), deldelAf_v(X), Pf_v(X), delPf_v(X), deldelPf_v(X),
+    Ytf_v(X, N), delYtf_v(X, N, delN), deldelYtf_v(X, N, delN, deldelN) -
+        Batched versions of the above methods for an (n, 1) array X of
+        points
+
 Todo:
 """
 
 
 import numpy as np
 
-from APtrialfunction import APTrialFunction
+from aptrialfunction import APTrialFunction
 
 
 class ODE1IVPTrialFunction(APTrialFunction):
@@ -70,52 +75,90 @@ class ODE1IVPTrialFunction(APTrialFunction):
         """Boundary condition function gradient"""
         return [0]
 
+    def deldelAf(self, xv):
+        """Boundary condition function Hessian"""
+        return [[0]]
+
     def Pf(self, xv):
         """Network coefficient function"""
         return xv[0]
 
     def delPf(self, xv):
         """Network coefficient function gradient"""
-        return 1
+        return [1]
+
+    def deldelPf(self, xv):
+        """Network coefficient function Hessian"""
+        return [[0]]
+
+    # Batched versions, for an (n, 1) array X of points
+
+    def Af_v(self, X):
+        """Boundary condition function for an array of points"""
+        return np.full(len(X), self.bcf[0](0), dtype=float)
 
-    def Ytf(self, xv, N):
-        """Trial function"""
-        print(xv, N)
-        A = self.Af(xv)
-        P = self.Pf(xv)
-        Yt = A + P*N
-        return None
+    def delAf_v(self, X):
+        """Boundary condition function gradient for an array of points"""
+        return np.zeros((len(X), 1))
 
-    def delYtf(self, xv, N, delN):
-        """Trial function gradient"""
-        delA = self.delAf(xv)
-        P = self.Pf(xv)
-        delYt = []
-        delYt.append(delA[0] + P*delN[0] + delP[0]*n)
-        return delYt
+    def deldelAf_v(self, X):
+        """Boundary condition function Hessian for an array of points"""
+        return np.zeros((len(X), 1, 1))
+
+    def Pf_v(self, X):
+        """Network coefficient function for an array of points"""
+        return X[:, 0]
+
+    def delPf_v(self, X):
+        """Network coefficient function gradient for an array of points"""
+        return np.ones((len(X), 1))
+
+    def deldelPf_v(self, X):
+        """Network coefficient function Hessian for an array of points"""
+        return np.zeros((len(X), 1, 1))
 
 
 if __name__ == '__main__':
 
     # Test inputs
-    ic_test = 0  # Initial condition
-    xv_test = [0]
-    N_test = 0
+    ic_test = 1  # Initial condition
+    xv_test = [0.4]
+    N_test = 0.5
+    delN_test = [0.6]
+    deldelN_test = [[0.7]]
     bcf_test = [ lambda x: ic_test ]
     delbcf_test = [[ lambda x: 0 ]]
 
     # Expected test outputs
-    A_ref = 0
+    A_ref = ic_test
     delA_ref = [0]
     P_ref = xv_test[0]
     delP_ref = [1]
-    Yt_ref = 0
-    
+    Yt_ref = ic_test + xv_test[0]*N_test
+    delYt_ref = [xv_test[0]*delN_test[0] + N_test]
+    deldelYt_ref = [[xv_test[0]*deldelN_test[0][0] + 2*delN_test[0]]]
+
     tf = ODE1IVPTrialFunction(bcf_test, delbcf_test)
     print(tf)
     assert np.isclose(tf.Af(xv_test), A_ref)
-    assert np.isclose(tf.delAf(xv_test), delA_ref)
+    assert np.allclose(tf.delAf(xv_test), delA_ref)
     assert np.isclose(tf.Pf(xv_test), P_ref)
-    assert np.isclose(tf.delPf(xv_test), delP_ref)
+    assert np.allclose(tf.delPf(xv_test), delP_ref)
     assert np.isclose(tf.Ytf(xv_test, N_test), Yt_ref)
-
+    assert np.allclose(tf.delYtf(xv_test, N_test, delN_test), delYt_ref)
+    assert np.allclose(tf.deldelYtf(xv_test, N_test, delN_test, deldelN_test),
+                       deldelYt_ref)
+
+    # Test the batched methods against the scalar methods.
+    X_test = np.linspace(0, 1, 11)[:, np.newaxis]
+    n = len(X_test)
+    N_v = np.linspace(-1, 1, n)
+    delN_v = np.linspace(1, 2, n)[:, np.newaxis]
+    deldelN_v = np.linspace(2, 3, n)[:, np.newaxis, np.newaxis]
+    assert np.allclose(tf.Ytf_v(X_test, N_v),
+                       [tf.Ytf(*a) for a in zip(X_test, N_v)])
+    assert np.allclose(tf.delYtf_v(X_test, N_v, delN_v),
+                       [tf.delYtf(*a) for a in zip(X_test, N_v, delN_v)])
+    assert np.allclose(tf.deldelYtf_v(X_test, N_v, delN_v, deldelN_v),
+                       [tf.deldelYtf(*a) for a in zip(X_test, N_v, delN_v,
+                                                      deldelN_v)])
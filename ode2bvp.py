@@ -23,6 +23,9 @@ Attributes:
     Yaf - (Optional) function for analytical solution Ya(x)
     dYa_dxf - (Optional) function for analytical derivative dY/dx
     d2Ya_dx2f - (Optional) function for analytical derivative d2Y/dx2
+    *_v - Array versions of the equation and analytical solution
+        functions, from the module if defined, otherwise created from the
+        scalar versions
 
 Methods:
 
@@ -33,6 +36,7 @@ Todo:
 from importlib import import_module
 
 from ode2 import ODE2
+from vectorize import vectorized
 
 
 class ODE2BVP(ODE2):
@@ -55,6 +59,13 @@ class ODE2BVP(ODE2):
         self.Yaf = None
         self.dYa_dxf = None
         self.d2Ya_dx2f = None
+        self.Gf_v = None
+        self.dG_dYf_v = None
+        self.dG_ddYdxf_v = None
+        self.dG_dd2Ydx2f_v = None
+        self.Yaf_v = None
+        self.dYa_dxf_v = None
+        self.d2Ya_dx2f_v = None
         if diffeqmod:
             self.name = diffeqmod
             odemod = import_module(diffeqmod)
@@ -76,6 +87,19 @@ class ODE2BVP(ODE2):
                 self.dYa_dxf = odemod.dYa_dxf
             if odemod.d2Ya_dx2f:
                 self.d2Ya_dx2f = odemod.d2Ya_dx2f
+            # Use the array versions of the equation functions if the
+            # module defines them, otherwise create them from the scalar
+            # versions.
+            self.Gf_v = vectorized(odemod, 'Gf_v', self.Gf)
+            self.dG_dYf_v = vectorized(odemod, 'dG_dYf_v', self.dG_dYf)
+            self.dG_ddYdxf_v = vectorized(odemod, 'dG_ddYdxf_v',
+                                          self.dG_ddYdxf)
+            self.dG_dd2Ydx2f_v = vectorized(odemod, 'dG_dd2Ydx2f_v',
+                                            self.dG_dd2Ydx2f)
+            self.Yaf_v = vectorized(odemod, 'Yaf_v', self.Yaf)
+            self.dYa_dxf_v = vectorized(odemod, 'dYa_dxf_v', self.dYa_dxf)
+            self.d2Ya_dx2f_v = vectorized(odemod, 'd2Ya_dx2f_v',
+                                          self.d2Ya_dx2f)
 
 
 if __name__ == '__main__':
@@ -23,6 +23,9 @@ Attributes:
     yaf - (Optional) function for analytical solution y(x)
     dya_dxf - (Optional) function for analytical derivative dy/dx
     d2ya_dx2f - (Optional) function for analytical derivative d2y/dx2
+    *_v - Array versions of the equation and analytical solution
+        functions, from the module if defined, otherwise created from the
+        scalar versions
 
 Methods:
     __init__
@@ -37,6 +40,7 @@ from importlib import import_module
 from inspect import getsource
 
 from ode2 import ODE2
+from vectorize import vectorized
 
 
 class ODE2IVP(ODE2):
@@ -54,6 +58,13 @@ class ODE2IVP(ODE2):
         self.yaf = None
         self.dya_dxf = None
         self.d2ya_dx2f = None
+        self.Gf_v = None
+        self.dG_dyf_v = None
+        self.dG_dydxf_v = None
+        self.dG_d2ydx2f_v = None
+        self.yaf_v = None
+        self.dya_dxf_v = None
+        self.d2ya_dx2f_v = None
         if diffeqmod:
             self.name = diffeqmod
             odemod = import_module(diffeqmod)
@@ -79,6 +90,18 @@ class ODE2IVP(ODE2):
                 self.dya_dxf = odemod.dya_dxf
             if odemod.d2ya_dx2f:
                 self.d2ya_dx2f = odemod.d2ya_dx2f
+            # Use the array versions of the equation functions if the
+            # module defines them, otherwise create them from the scalar
+            # versions.
+            self.Gf_v = vectorized(odemod, 'Gf_v', self.Gf)
+            self.dG_dyf_v = vectorized(odemod, 'dG_dyf_v', self.dG_dyf)
+            self.dG_dydxf_v = vectorized(odemod, 'dG_dydxf_v', self.dG_dydxf)
+            self.dG_d2ydx2f_v = vectorized(odemod, 'dG_d2ydx2f_v',
+                                           self.dG_d2ydx2f)
+            self.yaf_v = vectorized(odemod, 'yaf_v', self.yaf)
+            self.dya_dxf_v = vectorized(odemod, 'dya_dxf_v', self.dya_dxf)
+            self.d2ya_dx2f_v = vectorized(odemod, 'd2ya_dx2f_v',
+                                          self.d2ya_dx2f)
 
     def __str__(self):
         s = ''
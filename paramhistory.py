@@ -0,0 +1,292 @@
+###############################################################################
+"""
+ParameterHistory - Class to record the history of network parameter vectors
+during training
+
+DiskParameterHistory - Class to stream the history of network parameter
+vectors to a file during training
+
+The parameter vectors are stored as the rows of a preallocated 2-D array.
+When the array is full, its capacity is doubled, so recording a long
+training run costs amortized O(1) copies per recorded vector, rather than
+the O(n) copy of each np.vstack() call.
+
+A DiskParameterHistory has the same interface, but only buffers chunksize
+vectors in memory. Each full buffer is appended to a .npy file, which can be
+read lazily during or after training with np.load(path, mmap_mode='r').
+
+Example:
+    Create a history for a network with nparams parameters, recording
+    every 10th vector.
+        phist = ParameterHistory(nparams, stride=10)
+
+    Record the current parameter vector.
+        phist.record(p)
+
+    Fetch the recorded parameter vectors as a 2-D array.
+        a = phist.array()
+
+    Stream the history to a file, and read it back lazily.
+        phist = DiskParameterHistory('phist.npy', nparams)
+        phist.record(p)
+        phist.close()
+        a = np.load('phist.npy', mmap_mode='r')
+
+Attributes:
+    nparams - Number of parameters in each recorded vector
+    stride - Record every stride-th vector passed to record()
+    enabled - If False, record() does nothing
+    ncalls - Number of calls to record()
+    n - Number of recorded vectors
+    data - (capacity, nparams) array of storage for recorded vectors
+    path - (DiskParameterHistory only) Path to the .npy history file
+
+Methods:
+    record(p) - Record parameter vector p, if it is due
+    reserve(n) - Ensure storage is available for n more recorded vectors
+    array() - Return a (n, nparams) view of the recorded vectors
+    flush() - Write any buffered vectors to the history file
+    clear() - Discard all recorded vectors
+    close() - Flush and close the history file
+
+Notes:
+    The array returned by ParameterHistory.array() is a view of the internal
+    storage, and is only valid until the next call to record() or
+    reserve(). Copy it if it must be kept.
+
+    The array returned by DiskParameterHistory.array() is a read-only
+    memory map of the history file.
+
+Todo:
+
+"""
+
+
+import numpy as np
+
+
+# Default initial capacity (rows).
+DEFAULT_CAPACITY = 16
+
+# Default number of vectors buffered in memory before writing to disk.
+DEFAULT_CHUNKSIZE = 1024
+
+# Default recording stride.
+DEFAULT_STRIDE = 1
+
+
+class ParameterHistory():
+    """Growable record of network parameter vectors."""
+
+
+    # Public methods
+
+    def __init__(self, nparams, stride=DEFAULT_STRIDE, enabled=True,
+                 capacity=DEFAULT_CAPACITY):
+        """Constructor"""
+        assert nparams > 0
+        assert stride >= 1
+        assert capacity >= 1
+        self.nparams = nparams
+        self.stride = stride
+        self.enabled = enabled
+        self.ncalls = 0
+        self.n = 0
+        self.data = np.empty((capacity if enabled else 0, nparams))
+
+    def record(self, p):
+        """Record parameter vector p, if due."""
+        self.ncalls += 1
+        if not self.enabled or (self.ncalls - 1) % self.stride != 0:
+            return
+        if self.n == len(self.data):
+            self.__resize(max(2*len(self.data), 1))
+        self.data[self.n] = p
+        self.n += 1
+
+    def reserve(self, n):
+        """Ensure storage for n more recorded vectors."""
+        if not self.enabled:
+            return
+        if self.n + n > len(self.data):
+            self.__resize(self.n + n)
+
+    def array(self):
+        """Return a view of the recorded vectors."""
+        return self.data[:self.n]
+
+    def flush(self):
+        """Nothing to write for an in-memory history."""
+        pass
+
+    def clear(self):
+        """Discard all recorded vectors."""
+        self.ncalls = 0
+        self.n = 0
+
+    def close(self):
+        """Nothing to close for an in-memory history."""
+        pass
+
+
+    # Internal methods below this point
+
+    def __resize(self, capacity):
+        """Resize the storage to the specified number of rows."""
+        data = np.empty((capacity, self.nparams))
+        data[:self.n] = self.data[:self.n]
+        self.data = data
+
+
+class DiskParameterHistory():
+    """Record of network parameter vectors streamed to a .npy file."""
+
+
+    # Public methods
+
+    def __init__(self, path, nparams, stride=DEFAULT_STRIDE, enabled=True,
+                 chunksize=DEFAULT_CHUNKSIZE):
+        """Constructor"""
+        assert nparams > 0
+        assert stride >= 1
+        assert chunksize >= 1
+        self.path = path
+        self.nparams = nparams
+        self.stride = stride
+        self.enabled = enabled
+        self.ncalls = 0
+        self.n = 0
+        self.data = np.empty((chunksize, nparams))
+        self.nbuf = 0
+        self.file = open(path, 'wb+')
+        self.__write_header()
+        self.header_size = self.file.tell()
+
+    def record(self, p):
+        """Record parameter vector p, if due."""
+        self.ncalls += 1
+        if not self.enabled or (self.ncalls - 1) % self.stride != 0:
+            return
+        self.data[self.nbuf] = p
+        self.nbuf += 1
+        self.n += 1
+        if self.nbuf == len(self.data):
+            self.flush()
+
+    def reserve(self, n):
+        """Storage is allocated on disk as vectors are written."""
+        pass
+
+    def array(self):
+        """Return a read-only memory map of the recorded vectors."""
+        self.flush()
+        if self.n == 0:
+            return np.empty((0, self.nparams))
+        return np.load(self.path, mmap_mode='r')
+
+    def flush(self):
+        """Write the buffered vectors and update the file header."""
+        if self.file.closed:
+            return
+        if self.nbuf > 0:
+            self.file.seek(0, 2)
+            self.file.write(self.data[:self.nbuf].tobytes())
+            self.nbuf = 0
+        self.file.seek(0)
+        self.__write_header()
+        assert self.file.tell() == self.header_size
+        self.file.flush()
+
+    def clear(self):
+        """Discard all recorded vectors."""
+        self.ncalls = 0
+        self.n = 0
+        self.nbuf = 0
+        self.file.truncate(self.header_size)
+        self.flush()
+
+    def close(self):
+        """Flush and close the history file."""
+        self.flush()
+        self.file.close()
+
+
+    # Internal methods below this point
+
+    def __write_header(self):
+        """Write the .npy header for the vectors recorded so far."""
+        header = {'descr': np.lib.format.dtype_to_descr(self.data.dtype),
+                  'fortran_order': False,
+                  'shape': (self.n, self.nparams)}
+        np.lib.format.write_array_header_1_0(self.file, header)
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    nparams = 5
+    nvec = 100
+    p = np.arange(nvec*nparams, dtype=float).reshape(nvec, nparams)
+
+    print("Testing recording with growth.")
+    phist = ParameterHistory(nparams, capacity=1)
+    for pp in p:
+        phist.record(pp)
+    if not np.array_equal(phist.array(), p):
+        print("ERROR: Recorded history does not match parameters!")
+    if len(phist.data) != 128:
+        print("ERROR: Unexpected capacity %d!" % len(phist.data))
+
+    print("Testing recording stride.")
+    phist = ParameterHistory(nparams, stride=7)
+    for pp in p:
+        phist.record(pp)
+    if not np.array_equal(phist.array(), p[::7]):
+        print("ERROR: Strided history does not match parameters!")
+
+    print("Testing reserve.")
+    phist = ParameterHistory(nparams)
+    phist.reserve(nvec)
+    data = phist.data
+    for pp in p:
+        phist.record(pp)
+    if phist.data is not data:
+        print("ERROR: Reserved storage was reallocated!")
+
+    print("Testing disabled recording.")
+    phist = ParameterHistory(nparams, enabled=False)
+    for pp in p:
+        phist.record(pp)
+    if phist.array().shape != (0, nparams):
+        print("ERROR: Disabled history recorded parameters!")
+
+    print("Testing clear.")
+    phist = ParameterHistory(nparams)
+    for pp in p:
+        phist.record(pp)
+    phist.clear()
+    phist.record(p[-1])
+    if not np.array_equal(phist.array(), p[-1:]):
+        print("ERROR: Cleared history is not empty!")
+
+    print("Testing disk history.")
+    from os import remove
+    from tempfile import mkstemp
+    (fd, path) = mkstemp(suffix='.npy')
+    phist = DiskParameterHistory(path, nparams, stride=3, chunksize=8)
+    if phist.array().shape != (0, nparams):
+        print("ERROR: New disk history is not empty!")
+    for pp in p:
+        phist.record(pp)
+    if not np.array_equal(phist.array(), p[::3]):
+        print("ERROR: Disk history does not match parameters!")
+    phist.record(p[0])
+    phist.close()
+    a = np.load(path, mmap_mode='r')
+    if not np.array_equal(a, p[::3]):
+        print("ERROR: Disk history file does not match parameters!")
+    del a
+    remove(path)
@@ -34,6 +34,9 @@ Attributes:
     delYaf - (Optional) mx1 rray of functions for analytical gradients of Ya[xv]
     deldelYaf - (Optional) mxm array of functions for analytical
     gradient gradients of Ya[xv]
+    *_v - Array versions of the equation and analytical solution
+        functions, from the module if defined, otherwise created from the
+        scalar versions
 
 Methods:
 
@@ -43,6 +46,7 @@ Todo:
 from importlib import import_module
 
 from pde2 import PDE2
+from vectorize import vectorized
 
 class PDE2BVP(PDE2):
     """Base class for all 2nd-order partial differential equation boundary-
@@ -64,6 +68,13 @@ class PDE2BVP(PDE2):
         self.Yaf = None
         self.delYaf = None
         self.deldelYaf = None
+        self.Gf_v = None
+        self.dG_dYf_v = None
+        self.dG_ddelYf_v = None
+        self.dG_ddeldelYf_v = None
+        self.Yaf_v = None
+        self.delYaf_v = None
+        self.deldelYaf_v = None
         if diffeqmod:
             pdemod = import_module(diffeqmod)
             assert pdemod.Gf          # Function for the PDE as a whole
@@ -86,6 +97,19 @@ class PDE2BVP(PDE2):
                 self.delYaf = pdemod.delYaf
             if pdemod.deldelYaf:
                 self.deldelYaf = pdemod.deldelYaf
+            # Use the array versions of the equation functions if the
+            # module defines them, otherwise create them from the scalar
+            # versions.
+            self.Gf_v = vectorized(pdemod, 'Gf_v', self.Gf)
+            self.dG_dYf_v = vectorized(pdemod, 'dG_dYf_v', self.dG_dYf)
+            self.dG_ddelYf_v = vectorized(pdemod, 'dG_ddelYf_v',
+                                          self.dG_ddelYf)
+            self.dG_ddeldelYf_v = vectorized(pdemod, 'dG_ddeldelYf_v',
+                                             self.dG_ddeldelYf)
+            self.Yaf_v = vectorized(pdemod, 'Yaf_v', self.Yaf)
+            self.delYaf_v = vectorized(pdemod, 'delYaf_v', self.delYaf)
+            self.deldelYaf_v = vectorized(pdemod, 'deldelYaf_v',
+                                          self.deldelYaf)
 
 if __name__ == '__main__':
     pde2bvp = PDE2BVP('eq.lagaris_05')
@@ -11,9 +11,24 @@ Example:
         pde2diff = PDE2DIFF(modname)
 
 Attributes:
+    *_v - Array versions of the equation and analytical solution
+        functions, from the module if defined, otherwise created from the
+        scalar versions
+    dG_dY_kind, dG_ddelY_kind, dG_ddel2Y_kind - Classification of the
+        derivatives of the equation as ZERO, CONSTANT or VARIABLE
+    dG_dY_const, dG_ddelY_const, dG_ddel2Y_const - Values of the constant
+        derivatives (a float, or an array of m floats), None if VARIABLE
 
 Methods:
 
+Notes:
+    A derivative is only classified as ZERO or CONSTANT if the module
+    declares its value, as dG_dY_const (a number), or dG_ddelY_const or
+    dG_ddel2Y_const (a list of m numbers). All other derivatives are
+    VARIABLE, and are evaluated at each point. The declared values are read
+    when the module is loaded, so they must be declared again if module
+    variables they depend on are changed later.
+
 Todo:
     * Expand base functionality.
 """
@@ -22,7 +37,16 @@ Todo:
 from importlib import import_module
 from inspect import getsource
 
+import numpy as np
+
 from pde2 import PDE2
+from vectorize import vectorized
+
+
+# Classifications of the equation derivatives.
+ZERO = 'zero'
+CONSTANT = 'constant'
+VARIABLE = 'variable'
 
 
 class PDE2DIFF(PDE2):
@@ -39,6 +63,19 @@ class PDE2DIFF(PDE2):
         self.Yaf = None
         self.delYaf = None
         self.del2Yaf = None
+        self.Gf_v = None
+        self.dG_dYf_v = None
+        self.dG_ddelYf_v = None
+        self.dG_ddel2Yf_v = None
+        self.Yaf_v = None
+        self.delYaf_v = None
+        self.del2Yaf_v = None
+        self.dG_dY_kind = VARIABLE
+        self.dG_ddelY_kind = VARIABLE
+        self.dG_ddel2Y_kind = VARIABLE
+        self.dG_dY_const = None
+        self.dG_ddelY_const = None
+        self.dG_ddel2Y_const = None
         if diffeqmod:
             self.name = diffeqmod
             pdemod = import_module(diffeqmod)
@@ -62,6 +99,25 @@ class PDE2DIFF(PDE2):
                 self.delYaf = pdemod.delYaf
             if hasattr(pdemod, 'del2Yaf'):
                 self.del2Yaf = pdemod.del2Yaf
+            # Use the array versions of the equation functions if the
+            # module defines them, otherwise create them from the scalar
+            # versions.
+            self.Gf_v = vectorized(pdemod, 'Gf_v', self.Gf)
+            self.dG_dYf_v = vectorized(pdemod, 'dG_dYf_v', self.dG_dYf)
+            self.dG_ddelYf_v = vectorized(pdemod, 'dG_ddelYf_v',
+                                          self.dG_ddelYf)
+            self.dG_ddel2Yf_v = vectorized(pdemod, 'dG_ddel2Yf_v',
+                                           self.dG_ddel2Yf)
+            self.Yaf_v = vectorized(pdemod, 'Yaf_v', self.Yaf)
+            self.delYaf_v = vectorized(pdemod, 'delYaf_v', self.delYaf)
+            self.del2Yaf_v = vectorized(pdemod, 'del2Yaf_v', self.del2Yaf)
+            # Use the constant derivative values declared by the module.
+            (self.dG_dY_kind, self.dG_dY_const) = \
+                _declared(pdemod, 'dG_dY_const')
+            (self.dG_ddelY_kind, self.dG_ddelY_const) = \
+                _declared(pdemod, 'dG_ddelY_const')
+            (self.dG_ddel2Y_kind, self.dG_ddel2Y_const) = \
+                _declared(pdemod, 'dG_ddel2Y_const')
 
     def __str__(self):
         s = ''
@@ -98,5 +154,58 @@ class PDE2DIFF(PDE2):
         return s.rstrip()  # Strip trailing newline if any.
 
 
+def _declared(pdemod, name):
+    """Classify a derivative by the constant value declared in a module."""
+    if not hasattr(pdemod, name):
+        return (VARIABLE, None)
+    c = np.array(getattr(pdemod, name), dtype=float)
+    if c.ndim == 0:
+        c = float(c)
+    if not np.any(c):
+        return (ZERO, c)
+    return (CONSTANT, c)
+
+
 if __name__ == '__main__':
-    pass
+
+    import sys
+    import types
+
+    print("Testing derivative classification.")
+    eq = PDE2DIFF('diff2d_halfsine')
+    if eq.dG_dY_kind != ZERO:
+        print("ERROR: dG/dY not classified as zero!")
+    if eq.dG_ddelY_kind != CONSTANT or \
+       not np.array_equal(eq.dG_ddelY_const, [0, 0, 1]):
+        print("ERROR: dG/ddelY not classified as constant!")
+    if eq.dG_ddel2Y_kind != CONSTANT:
+        print("ERROR: dG/ddel2Y not classified as constant!")
+
+    print("Testing undeclared derivatives.")
+    mod = types.ModuleType('diff2d_halfsine_undeclared')
+    for (k, v) in vars(import_module('diff2d_halfsine')).items():
+        if not k.startswith('__') and not k.endswith('_const'):
+            setattr(mod, k, v)
+    sys.modules[mod.__name__] = mod
+    eq = PDE2DIFF(mod.__name__)
+    if (eq.dG_dY_kind, eq.dG_ddelY_kind, eq.dG_ddel2Y_kind) != \
+       (VARIABLE, VARIABLE, VARIABLE):
+        print("ERROR: Undeclared derivatives not classified as variable!")
+
+    print("Testing declared derivative values.")
+    rng = np.random.RandomState(0)
+    for name in ('diff1d_half', 'diff1d_halfsine', 'diff1d_halfsine+increase',
+                 'diff1d_one', 'diff2d_half', 'diff2d_halfsine',
+                 'diff2d_halfsine+increase', 'diff2d_one', 'diff2d_zero',
+                 'diff3d_halfsine', 'diff3d_halfsine+increase'):
+        eq = PDE2DIFF(name)
+        m = len(eq.bcf)
+        args = (rng.uniform(0, 1, (8, m)), rng.uniform(-1, 1, 8),
+                rng.uniform(-1, 1, (8, m)), rng.uniform(-1, 1, (8, m)))
+        for (kind, c, f_v) in ((eq.dG_dY_kind, eq.dG_dY_const, eq.dG_dYf_v),
+                               (eq.dG_ddelY_kind, eq.dG_ddelY_const,
+                                eq.dG_ddelYf_v),
+                               (eq.dG_ddel2Y_kind, eq.dG_ddel2Y_const,
+                                eq.dG_ddel2Yf_v)):
+            if kind == VARIABLE or not np.allclose(f_v(*args), c):
+                print("ERROR: Incorrect declared derivative in %s!" % name)
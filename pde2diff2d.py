@@ -22,6 +22,9 @@ Attributes:
     Yaf - (Optional) function for analytical solution Y(x,t)
     delYaf - (Optional) function for analytical gradient
     deldelYaff - (Optional) function for analytical Hessian
+    *_v - Array versions of the equation and analytical solution
+        functions, from the module if defined, otherwise created from the
+        scalar versions
 
 Methods:
     __init__
@@ -36,6 +39,7 @@ from importlib import import_module
 from inspect import getsource
 
 from pde2 import PDE2
+from vectorize import vectorized
 
 
 class PDE2DIFF2D(PDE2):
@@ -52,6 +56,13 @@ class PDE2DIFF2D(PDE2):
         self.Yaf = None
         self.delYaf = None
         self.del2Yaf = None
+        self.Gf_v = None
+        self.dG_dYf_v = None
+        self.dG_ddelYf_v = None
+        self.dG_ddel2Yf_v = None
+        self.Yaf_v = None
+        self.delYaf_v = None
+        self.del2Yaf_v = None
         if diffeqmod:
             self.name = diffeqmod
             pdemod = import_module(diffeqmod)
@@ -80,6 +91,18 @@ class PDE2DIFF2D(PDE2):
                 self.delYaf = pdemod.delYaf
             if hasattr(pdemod, 'del2Yaf'):
                 self.del2Yaf = pdemod.del2Yaf
+            # Use the array versions of the equation functions if the
+            # module defines them, otherwise create them from the scalar
+            # versions.
+            self.Gf_v = vectorized(pdemod, 'Gf_v', self.Gf)
+            self.dG_dYf_v = vectorized(pdemod, 'dG_dYf_v', self.dG_dYf)
+            self.dG_ddelYf_v = vectorized(pdemod, 'dG_ddelYf_v',
+                                          self.dG_ddelYf)
+            self.dG_ddel2Yf_v = vectorized(pdemod, 'dG_ddel2Yf_v',
+                                           self.dG_ddel2Yf)
+            self.Yaf_v = vectorized(pdemod, 'Yaf_v', self.Yaf)
+            self.delYaf_v = vectorized(pdemod, 'delYaf_v', self.delYaf)
+            self.del2Yaf_v = vectorized(pdemod, 'del2Yaf_v', self.del2Yaf)
 
     def __str__(self):
         s = ''
@@ -0,0 +1,157 @@
+###############################################################################
+"""
+samplers - Functions to create scattered training (collocation) points
+
+A uniform training grid with n points along each of m axes has n**m points,
+which grows quickly for 3-D diffusion problems. Quasi-random (low
+discrepancy) sequences and Latin hypercube samples cover the domain more
+evenly than the same number of pseudorandom points, and are not tied to a
+per-axis point count, so a network can usually be trained to the same
+accuracy with far fewer points.
+
+All samplers return an (n, m) array of points in the box given by bounds,
+[0, 1] along each axis by default. A sampler given the same seed returns
+the same points.
+
+Example:
+    Create 256 scrambled Sobol points in the unit cube (x, y, t).
+        x = sobol_points(256, 3, seed=0)
+
+    Create 200 Halton points in [0, 2]x[0, 1].
+        x = halton_points(200, 2, bounds=[(0, 2), (0, 1)], seed=0)
+
+    Create training points by method name.
+        x = create_training_points(500, 4, method='latin_hypercube', seed=1)
+
+Attributes:
+    SAMPLERS - Dictionary of sampler functions by method name
+
+Methods:
+    create_training_points(n, m, method, bounds, seed) - Create n points
+        with the named sampler
+    uniform_points(n, m, bounds, seed) - Pseudorandom points
+    sobol_points(n, m, bounds, seed, scramble) - Sobol sequence points
+    halton_points(n, m, bounds, seed, scramble) - Halton sequence points
+    latin_hypercube_points(n, m, bounds, seed) - Latin hypercube points
+
+Notes:
+    The Sobol sequence is best balanced when n is a power of 2.
+
+    With the default scramble=True, the Sobol and Halton points, like the
+    other samplers' points, almost surely lie inside the box, away from the
+    boundaries where the trial functions satisfy the boundary conditions by
+    construction. With scramble=False the first point is the lower corner
+    of the box.
+
+Todo:
+
+"""
+
+
+import warnings
+
+import numpy as np
+from scipy.stats import qmc
+
+
+# Default sampling method for create_training_points().
+DEFAULT_METHOD = 'sobol'
+
+
+def create_training_points(n, m, method=DEFAULT_METHOD, bounds=None,
+                           seed=None):
+    """Create n training points in m dimensions with the named sampler."""
+    assert method in SAMPLERS
+    return SAMPLERS[method](n, m, bounds=bounds, seed=seed)
+
+
+def uniform_points(n, m, bounds=None, seed=None):
+    """Create n pseudorandom training points in m dimensions."""
+    rng = np.random.default_rng(seed)
+    return _scale(rng.uniform(size=(n, m)), bounds)
+
+
+def sobol_points(n, m, bounds=None, seed=None, scramble=True):
+    """Create n Sobol sequence training points in m dimensions."""
+    sampler = qmc.Sobol(m, scramble=scramble, seed=seed)
+    with warnings.catch_warnings():
+        # Balance warning for n not a power of 2
+        warnings.simplefilter('ignore', UserWarning)
+        x = sampler.random(n)
+    return _scale(x, bounds)
+
+
+def halton_points(n, m, bounds=None, seed=None, scramble=True):
+    """Create n Halton sequence training points in m dimensions."""
+    sampler = qmc.Halton(m, scramble=scramble, seed=seed)
+    return _scale(sampler.random(n), bounds)
+
+
+def latin_hypercube_points(n, m, bounds=None, seed=None):
+    """Create n Latin hypercube training points in m dimensions."""
+    sampler = qmc.LatinHypercube(m, seed=seed)
+    return _scale(sampler.random(n), bounds)
+
+
+SAMPLERS = {
+    'uniform': uniform_points,
+    'sobol': sobol_points,
+    'halton': halton_points,
+    'latin_hypercube': latin_hypercube_points
+    }
+
+
+def _scale(x, bounds):
+    """Scale points from the unit cube to the box given by bounds."""
+    if bounds is None:
+        return x
+    assert len(bounds) == x.shape[1]
+    (lo, hi) = np.array(bounds, dtype=float).T
+    return lo + x*(hi - lo)
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    n = 256
+    m = 3
+    bounds = [(0, 2), (-1, 1), (0, 0.5)]
+
+    for method in SAMPLERS:
+
+        print("Testing %s sampler." % method)
+        x = create_training_points(n, m, method=method, seed=1)
+        if x.shape != (n, m):
+            print("ERROR: Incorrect %s sample shape!" % method)
+        if not np.all((x > 0) & (x < 1)):
+            print("ERROR: %s points outside unit cube interior!" % method)
+        if not np.array_equal(x, create_training_points(n, m, method=method,
+                                                        seed=1)):
+            print("ERROR: %s points not reproducible!" % method)
+        x = create_training_points(n, m, method=method, bounds=bounds,
+                                   seed=1)
+        (lo, hi) = np.array(bounds).T
+        if not np.all((x >= lo) & (x <= hi)):
+            print("ERROR: %s points outside bounds!" % method)
+
+    print("Testing sample discrepancy.")
+    d_uniform = qmc.discrepancy(uniform_points(n, m, seed=1))
+    for method in ('sobol', 'halton', 'latin_hypercube'):
+        d = qmc.discrepancy(create_training_points(n, m, method=method,
+                                                   seed=1))
+        if d >= d_uniform:
+            print("ERROR: %s discrepancy %s not below uniform %s!" %
+                  (method, d, d_uniform))
+
+    print("Testing unscrambled sequences.")
+    for f in (sobol_points, halton_points):
+        x = f(n, m, scramble=False)
+        if not np.array_equal(x[0], np.zeros(m)):
+            print("ERROR: Unscrambled %s does not start at the origin!" %
+                  f.__name__)
+        if not np.all((x[1:] > 0) & (x[1:] < 1)):
+            print("ERROR: Unscrambled %s points after the first not inside "
+                  "unit cube!" % f.__name__)
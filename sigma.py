@@ -6,6 +6,8 @@ This module provides the sigma transfer function and derivatives.
 Example:
     Calculate the sigma for z=1.75.
         s = sigma(1.75)
+    Calculate the sigma for each element of an array of activations.
+        s = sigma_v(z)
 
 Attributes:
     None
@@ -21,6 +23,28 @@ Methods:
     s2()
     s3()
     s4()
+    sigma_v()
+    dsigma_dz_v()
+    d2sigma_dz2_v()
+    d3sigma_dz3_v()
+    d4sigma_dz4_v()
+    s_v()
+    s1_v()
+    s2_v()
+    s3_v()
+    s4_v()
+    sigma_derivatives_v()
+
+Notes:
+    The functions with a '_v' suffix operate on entire numpy arrays (such
+    as the (n, H) array of hidden node activations) without a Python-level
+    loop. They are computed from exp(-|z|), so they never overflow, even
+    for |z| > 709, where the scalar versions raise OverflowError.
+
+    sigma_derivatives_v() computes sigma and its derivatives up to a given
+    order from a single exp() per element, optionally writing into
+    caller-supplied arrays so that training loops can reuse the same
+    buffers every epoch.
 
 Todo:
     None
@@ -29,6 +53,8 @@ Todo:
 
 from math import exp
 
+import numpy as np
+
 
 def sigma(z):
     """Sigma transfer function"""
@@ -84,6 +110,135 @@ def s4(s):
     return 24*s**5 - 60*s**4 + 50*s**3 - 15*s**2 + s
 
 
+# Vectorized forms for numpy arrays
+
+def _sigma_neg_abs_v(z):
+    """Compute sigma(-|z|) = exp(-|z|)/(1 + exp(-|z|)), which cannot
+    overflow"""
+    e = np.exp(-np.abs(z))
+    return e/(1 + e)
+
+
+def sigma_v(z):
+    """Vectorized sigma transfer function"""
+    z = np.asarray(z, dtype=float)
+    m = _sigma_neg_abs_v(z)
+    return np.where(z >= 0, 1 - m, m)
+
+
+def dsigma_dz_v(z):
+    """Vectorized sigma transfer function 1st derivative"""
+    m = _sigma_neg_abs_v(np.asarray(z, dtype=float))
+    return m*(1 - m)
+
+
+def d2sigma_dz2_v(z):
+    """Vectorized sigma transfer function 2nd derivative"""
+    z = np.asarray(z, dtype=float)
+    m = _sigma_neg_abs_v(z)
+    return -np.sign(z)*m*(1 - m)*(1 - 2*m)
+
+
+def d3sigma_dz3_v(z):
+    """Vectorized sigma transfer function 3rd derivative"""
+    s1 = dsigma_dz_v(z)
+    return s1*(1 - 6*s1)
+
+
+def d4sigma_dz4_v(z):
+    """Vectorized sigma transfer function 4th derivative"""
+    z = np.asarray(z, dtype=float)
+    m = _sigma_neg_abs_v(z)
+    s1 = m*(1 - m)
+    return -np.sign(z)*s1*(1 - 2*m)*(1 - 12*s1)
+
+
+# Vectorized alternative forms as a function of sigma itself
+
+s_v = sigma_v
+
+
+def s1_v(s):
+    """Vectorized sigma transfer function 1st derivative"""
+    return s*(1 - s)
+
+
+def s2_v(s):
+    """Vectorized sigma transfer function 2nd derivative"""
+    return s*(1 - s)*(1 - 2*s)
+
+
+def s3_v(s):
+    """Vectorized sigma transfer function 3rd derivative"""
+    s1 = s*(1 - s)
+    return s1*(1 - 6*s1)
+
+
+def s4_v(s):
+    """Vectorized sigma transfer function 4th derivative"""
+    s1 = s*(1 - s)
+    return s1*(1 - 2*s)*(1 - 12*s1)
+
+
+def sigma_derivatives_v(z, order=3, out=None, work=None):
+    """Compute sigma and its derivatives up to order (at most 4) for each
+    element of z, using a single exp() per element. The results are
+    written to out, a sequence of order + 1 arrays of the same shape as z,
+    if supplied. The scratch array work (same shape as z) may also be
+    supplied. No memory is allocated if both are supplied. Returns the
+    tuple (s, s1, ..., s<order>)."""
+    assert 0 <= order <= 4
+    if out is None:
+        out = [np.empty(z.shape) for i in range(order + 1)]
+    assert len(out) == order + 1
+    if work is None:
+        work = np.empty(z.shape)
+
+    # Compute m = sigma(-|z|) = e/(1 + e), with e = exp(-|z|) <= 1.
+    s = out[0]
+    m = work
+    np.abs(z, out=m)
+    np.negative(m, out=m)
+    np.exp(m, out=m)
+    np.add(m, 1, out=s)
+    np.divide(m, s, out=m)
+
+    # s = m for z < 0, and s = 1 - m for z >= 0, computed as
+    # s = m + (1 - 2m)*heaviside(z).
+    t = out[1] if order > 0 else np.empty(z.shape)
+    np.multiply(m, -2, out=t)
+    t += 1
+    np.heaviside(z, 1, out=s)
+    s *= t
+    s += m
+    if order == 0:
+        return tuple(out)
+
+    # s1 = s(1 - s) = m(1 - m)
+    s1 = out[1]
+    np.subtract(1, m, out=s1)
+    s1 *= m
+    if order > 1:
+        # s2 = s1(1 - 2s)
+        s2 = out[2]
+        np.multiply(s, -2, out=s2)
+        s2 += 1
+        s2 *= s1
+    if order > 2:
+        # s3 = s1(1 - 6s1)
+        s3 = out[3]
+        np.multiply(s1, -6, out=s3)
+        s3 += 1
+        s3 *= s1
+    if order > 3:
+        # s4 = s2(1 - 12s1)
+        s4 = out[4]
+        np.multiply(s1, -12, out=s4)
+        s4 += 1
+        s4 *= s2
+    return tuple(out)
+
+
 if __name__ == '__main__':
     z = 1
     
@@ -98,3 +253,54 @@ if __name__ == '__main__':
     print("s2(%g) = %g" % (z, s2(s(z))))
     print("s3(%g) = %g" % (z, s3(s(z))))
     print("s4(%g) = %g" % (z, s4(s(z))))
+
+    print("Testing vectorized functions against scalar versions.")
+    zv = np.linspace(-10, 10, 201)
+    for (f, f_v) in ((sigma, sigma_v), (dsigma_dz, dsigma_dz_v),
+                     (d2sigma_dz2, d2sigma_dz2_v), (d3sigma_dz3, d3sigma_dz3_v),
+                     (d4sigma_dz4, d4sigma_dz4_v)):
+        assert np.allclose(f_v(zv), [f(zz) for zz in zv])
+    for (f, f_v) in ((s1, s1_v), (s2, s2_v), (s3, s3_v), (s4, s4_v)):
+        assert np.allclose(f_v(s_v(zv)), [f(s(zz)) for zz in zv])
+
+    print("Testing vectorized functions for large |z|.")
+    zbig = np.array([-1000, -710, 710, 1000])
+    assert np.all(np.isfinite(sigma_v(zbig)))
+    assert np.allclose(sigma_v(zbig), [0, 0, 1, 1])
+    for f_v in (dsigma_dz_v, d2sigma_dz2_v, d3sigma_dz3_v, d4sigma_dz4_v):
+        assert np.allclose(f_v(zbig), 0)
+
+    print("Testing combined sigma and derivatives.")
+    zv = np.hstack((zv, zbig))
+    ref = (sigma_v(zv), dsigma_dz_v(zv), d2sigma_dz2_v(zv), d3sigma_dz3_v(zv),
+           d4sigma_dz4_v(zv))
+    for order in range(5):
+        out = [np.empty_like(zv) for i in range(order + 1)]
+        res = sigma_derivatives_v(zv, order, out, np.empty_like(zv))
+        for i in range(order + 1):
+            assert res[i] is out[i]
+            assert np.allclose(res[i], ref[i], rtol=1e-12, atol=1e-15)
+
+    print("Benchmarking on the activations for a 41x41 diffusion grid.")
+    from timeit import timeit
+    nx = nt = 41
+    H = 10
+    np.random.seed(0)
+    (xx, tt) = np.meshgrid(np.linspace(0, 1, nx), np.linspace(0, 1, nt))
+    x = np.column_stack((xx.ravel(), tt.ravel()))
+    zg = x.dot(np.random.uniform(-1, 1, (2, H))) + np.random.uniform(-1, 1, H)
+    for (f, f_v) in ((sigma, sigma_v), (dsigma_dz, dsigma_dz_v),
+                     (d2sigma_dz2, d2sigma_dz2_v), (d3sigma_dz3, d3sigma_dz3_v)):
+        f_vectorize = np.vectorize(f)
+        t_old = timeit(lambda: f_vectorize(zg), number=10)/10
+        t_new = timeit(lambda: f_v(zg), number=10)/10
+        print("%s: np.vectorize %.3g s, array %.3g s, speedup %.1fx" %
+              (f.__name__, t_old, t_new, t_old/t_new))
+    out = [np.empty_like(zg) for i in range(4)]
+    work = np.empty_like(zg)
+    t_sep = timeit(lambda: (sigma_v(zg), dsigma_dz_v(zg), d2sigma_dz2_v(zg),
+                            d3sigma_dz3_v(zg)), number=10)/10
+    t_fused = timeit(lambda: sigma_derivatives_v(zg, 3, out, work),
+                     number=10)/10
+    print("sigma to 3rd derivative: separate %.3g s, combined %.3g s, "
+          "speedup %.1fx" % (t_sep, t_fused, t_sep/t_fused))
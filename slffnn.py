@@ -9,25 +9,46 @@ Example:
         net = SLFNN()
 
 Attributes:
-    None
+    rng - Random number generator used for the initial network parameters
 
 Methods:
-    None
+    random_generator(rng) - Create the random number generator for a
+        network from a seed or generator
 
 Todo:
     None
 """
 
+import numpy as np
+
 from neuralnetwork import NeuralNetwork
 
+
+def random_generator(rng=None):
+    """Return the random number generator for rng. If rng is None, return
+    the global np.random state, so the results depend on np.random.seed().
+    Otherwise, rng is passed to np.random.default_rng(), so it may be an
+    int seed, a np.random.SeedSequence, or a np.random.Generator, which is
+    returned unchanged."""
+    if rng is None:
+        return np.random
+    return np.random.default_rng(rng)
+
+
 class SLFFNN(NeuralNetwork):
     """Base class for all single-layer feed-forward neural network objects"""
 
-    def __init__(self):
+    def __init__(self, rng=None):
         """Initialize the neural network object."""
         super().__init__()
+        self.rng = random_generator(rng)
 
 
 if __name__ == '__main__':
     net = SLFFNN()
     print(net)
+    assert net.rng is np.random
+    g = np.random.default_rng(1)
+    assert SLFFNN(rng=g).rng is g
+    assert np.array_equal(SLFFNN(rng=2).rng.uniform(size=3),
+                          np.random.default_rng(2).uniform(size=3))
@@ -0,0 +1,188 @@
+###############################################################################
+"""
+stochastic - Mini-batch stochastic gradient minimization of network error
+functions
+
+This module provides a minimize()-like function for the stochastic
+gradient training algorithms 'sgd', 'momentum' and 'adam'. Each epoch, the
+training points are split into mini-batches of batch_size points, and the
+network parameters are updated once per batch, using the error gradient
+for that batch only. The cost of each update is independent of the total
+number of training points.
+
+Example:
+    Minimize an error function with the Adam algorithm, using batches of
+    64 points, where fun(p, i) returns the error and its gradient for the
+    training points with indices i.
+        res = minimize_stochastic(fun, p0, n, 'adam', eta=0.01,
+                                  maxepochs=500,
+                                  options={'batch_size': 64})
+
+Attributes:
+    METHODS - Tuple of the supported algorithm names
+    DEFAULT_OPTS - Default algorithm options, which can be overridden with
+        the options argument of minimize_stochastic():
+        batch_size - Number of points in each mini-batch
+        shuffle - If True, shuffle the points before each epoch
+        momentum - Momentum coefficient for 'momentum'
+        beta1, beta2 - Moment decay rates for 'adam'
+        epsilon - Denominator offset for 'adam'
+        lr_schedule - Learning rate schedule, one of 'constant', 'step',
+            'exponential' or 'inverse'
+        lr_decay - Learning rate decay factor for the schedule
+        lr_step - Number of epochs between decays for 'step'
+
+Methods:
+    minimize_stochastic(fun, p, n, method, eta, maxepochs, options,
+        callback, rng) - Minimize the error over n points
+    learning_rate(eta, epoch, opts) - Compute the scheduled learning rate
+
+Notes:
+    The gradient for a batch is divided by the number of points in the
+    batch, so eta has the same meaning for all batch sizes.
+
+Todo:
+
+"""
+
+
+from math import sqrt
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+
+# Supported algorithms
+METHODS = ('sgd', 'momentum', 'adam')
+
+# Default values for algorithm options
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BETA1 = 0.9
+DEFAULT_BETA2 = 0.999
+DEFAULT_EPSILON = 1e-8
+DEFAULT_LR_DECAY = 0.5
+DEFAULT_LR_SCHEDULE = 'constant'
+DEFAULT_LR_STEP = 100
+DEFAULT_MOMENTUM = 0.9
+DEFAULT_SHUFFLE = True
+DEFAULT_OPTS = {
+    'batch_size':  DEFAULT_BATCH_SIZE,
+    'beta1':       DEFAULT_BETA1,
+    'beta2':       DEFAULT_BETA2,
+    'epsilon':     DEFAULT_EPSILON,
+    'lr_decay':    DEFAULT_LR_DECAY,
+    'lr_schedule': DEFAULT_LR_SCHEDULE,
+    'lr_step':     DEFAULT_LR_STEP,
+    'momentum':    DEFAULT_MOMENTUM,
+    'shuffle':     DEFAULT_SHUFFLE
+    }
+
+
+def learning_rate(eta, epoch, opts):
+    """Compute the learning rate for an epoch from the schedule."""
+    schedule = opts['lr_schedule']
+    decay = opts['lr_decay']
+    if schedule == 'constant':
+        return eta
+    elif schedule == 'step':
+        return eta*decay**(epoch//opts['lr_step'])
+    elif schedule == 'exponential':
+        return eta*decay**epoch
+    elif schedule == 'inverse':
+        return eta/(1 + decay*epoch)
+    assert False, 'Invalid learning rate schedule (%s)!' % schedule
+
+
+def minimize_stochastic(fun, p, n, method, eta, maxepochs, options=None,
+                        callback=None, rng=None):
+    """Minimize an error function over n training points with a stochastic
+    gradient method. fun(p, i) returns the error and its gradient for the
+    points with indices i. callback(p, E2), if given, is called after each
+    epoch with the current parameters and the sum of the batch errors. rng
+    supplies the random shuffles, np.random by default."""
+    assert method in METHODS
+    assert n > 0
+    assert eta > 0
+    assert maxepochs > 0
+    my_opts = dict(DEFAULT_OPTS)
+    if options:
+        my_opts.update(options)
+    assert my_opts['batch_size'] > 0
+    if rng is None:
+        rng = np.random
+
+    # Update state: velocity for momentum, 1st and 2nd moments for Adam.
+    p = np.array(p, dtype=float)
+    m1 = np.zeros(len(p))
+    m2 = np.zeros(len(p))
+    beta1 = my_opts['beta1']
+    beta2 = my_opts['beta2']
+    nsteps = 0
+
+    batch_size = min(my_opts['batch_size'], n)
+    idx = np.arange(n)
+    for epoch in range(maxepochs):
+        lr = learning_rate(eta, epoch, my_opts)
+        if my_opts['shuffle']:
+            idx = rng.permutation(n)
+        E2 = 0
+        for start in range(0, n, batch_size):
+            batch = idx[start:start + batch_size]
+            (E2_batch, grad) = fun(p, batch)
+            E2 += E2_batch
+            grad = grad/len(batch)
+            nsteps += 1
+            if method == 'sgd':
+                p -= lr*grad
+            elif method == 'momentum':
+                m1 *= my_opts['momentum']
+                m1 -= lr*grad
+                p += m1
+            else:
+                m1 *= beta1
+                m1 += (1 - beta1)*grad
+                m2 *= beta2
+                m2 += (1 - beta2)*grad**2
+                lr_t = lr*sqrt(1 - beta2**nsteps)/(1 - beta1**nsteps)
+                p -= lr_t*m1/(np.sqrt(m2) + my_opts['epsilon'])
+        if callback:
+            callback(p, E2)
+
+    return OptimizeResult(x=p, fun=E2, nit=maxepochs, nfev=nsteps,
+                          success=True)
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    # Least-squares fit of a line to n points: E = sum((a*x + b - y)**2).
+    n = 200
+    rng = np.random.RandomState(0)
+    x = rng.uniform(0, 1, n)
+    y = 2*x - 1
+
+    def fun(p, i):
+        r = p[0]*x[i] + p[1] - y[i]
+        return (np.sum(r**2), np.array([2*np.sum(r*x[i]), 2*np.sum(r)]))
+
+    print("Testing learning rate schedules.")
+    opts = dict(DEFAULT_OPTS, lr_step=10, lr_decay=0.5)
+    for (schedule, lr) in (('constant', 1), ('step', 0.25),
+                           ('exponential', 0.5**25), ('inverse', 1/13.5)):
+        opts['lr_schedule'] = schedule
+        if not np.isclose(learning_rate(1, 25, opts), lr):
+            print("ERROR: Incorrect %s learning rate!" % schedule)
+
+    for method in METHODS:
+        print("Testing %s minimization." % method)
+        res = minimize_stochastic(fun, [0, 0], n, method, eta=0.05,
+                                  maxepochs=200,
+                                  options={'batch_size': 16},
+                                  rng=np.random.RandomState(1))
+        if not np.allclose(res.x, [2, -1], atol=1e-2):
+            print("ERROR: %s did not converge (p = %s)!" % (method, res.x))
+        if res.nfev != 200*13:
+            print("ERROR: Incorrect number of %s steps!" % method)
@@ -0,0 +1,104 @@
+###############################################################################
+"""
+TensorGrid - Class to describe a tensor-product grid of points by its
+per-axis coordinates
+
+A tensor-product grid in m dimensions is the set of all points
+(x[0][i0], x[1][i1], ..., x[m-1][im]) for the m 1-D coordinate vectors
+x[j]. The grid is stored as the coordinate vectors only, so a grid of n
+points takes O(sum(len(x[j]))) storage rather than the O(n*m) of an explicit
+point array. Points are numbered in C (row-major) order, so the last axis
+varies fastest, as with np.meshgrid(..., indexing='ij').
+
+Example:
+    Create a 3-D grid with 11 points along each axis.
+        g = np.linspace(0, 1, 11)
+        grid = TensorGrid([g, g, g])
+
+    Create the explicit (n, m) point array for the grid.
+        x = grid.points()
+
+    Create the point array for a block of consecutive points.
+        x = grid.points(start, stop)
+
+    Process the grid in blocks of at most 1000 points.
+        for (start, stop) in grid.blocks(1000): ...
+
+Attributes:
+    axes - List of m 1-D arrays of coordinates along each axis
+    m - Number of dimensions
+    shape - Tuple of the number of points along each axis
+    n - Total number of points
+
+Methods:
+    indices(start, stop) - Return the per-axis indices of a block of points
+    points(start, stop) - Return the (stop - start, m) array of a block of
+        points
+    blocks(size) - Iterate over (start, stop) ranges of at most size points
+
+Todo:
+
+"""
+
+
+import numpy as np
+
+
+class TensorGrid():
+    """Tensor-product grid of points."""
+
+
+    # Public methods
+
+    def __init__(self, axes):
+        """Constructor"""
+        assert len(axes) > 0
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        for a in self.axes:
+            assert a.ndim == 1 and len(a) > 0
+        self.m = len(self.axes)
+        self.shape = tuple(len(a) for a in self.axes)
+        self.n = int(np.prod(self.shape))
+
+    def indices(self, start=0, stop=None):
+        """Return the per-axis indices of points start to stop - 1."""
+        if stop is None:
+            stop = self.n
+        return np.unravel_index(np.arange(start, stop), self.shape)
+
+    def points(self, start=0, stop=None):
+        """Return the array of points start to stop - 1."""
+        idx = self.indices(start, stop)
+        return np.stack([a[i] for (a, i) in zip(self.axes, idx)], axis=1)
+
+    def blocks(self, size):
+        """Iterate over (start, stop) ranges of at most size points."""
+        assert size > 0
+        for start in range(0, self.n, size):
+            yield (start, min(start + size, self.n))
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    gx = np.linspace(0, 1, 3)
+    gy = np.linspace(0, 2, 4)
+    gt = np.linspace(0, 3, 5)
+    grid = TensorGrid([gx, gy, gt])
+
+    print("Testing grid shape.")
+    if grid.shape != (3, 4, 5) or grid.n != 60 or grid.m != 3:
+        print("ERROR: Incorrect grid shape!")
+
+    print("Testing grid points.")
+    x_ref = np.array(np.meshgrid(gx, gy, gt, indexing='ij')).reshape(3, -1).T
+    if not np.array_equal(grid.points(), x_ref):
+        print("ERROR: Grid points do not match meshgrid!")
+
+    print("Testing grid blocks.")
+    x = np.vstack([grid.points(a, b) for (a, b) in grid.blocks(7)])
+    if not np.array_equal(x, x_ref):
+        print("ERROR: Grid blocks do not match meshgrid!")
@@ -3,42 +3,65 @@ trainingdata - Functions useful for creating and manipulating training data.
 """
 
 
-from itertools import repeat
+import numpy as np
 
+from tensorgrid import TensorGrid
 
-def create_training_grid(n):
+
+def create_training_grid(n, bounds=None, dtype=float):
     """Create a grid of training data. The input n is a vector containing the
     numbers of evenly-spaced data points to use in each dimension. For example,
     for an (x, y, z) grid, with n = [3, 4, 5], we will get a grid with 3 points
     along the x-axis, 4 points along the y-axis, and 5 points along the z-axis,
     for a total of 3*4*5 = 60 points. The points along each dimension
-    are evenly spaced in the range [0, 1]. When there is m=1 dimension, a list
-    is returned. When m>1, a list of lists is returned. """
+    are evenly spaced in the range [0, 1], or in the range [lo, hi] given for
+    that dimension in bounds. The points are returned as a contiguous
+    (N, m) array, with the last coordinate varying fastest. When there is
+    m=1 dimension, a 1-D array of N points is returned."""
 
-    # Determine the number of dimensions in the result.
-    m = len(n)
+    # Compute the evenly-spaced points along each dimension.
+    axes = training_grid_axes(n, bounds, dtype)
+    m = len(axes)
 
     # Handle 1-D and (n>1)-D cases differently.
     if m == 1:
-        X = [i/(n[0] - 1) for i in range(n[0])]
-    else:
-        # Compute the evenly-spaced points along each dimension.
-        x = [[i/(nn - 1) for i in range(nn)] for nn in n]
-
-        # Assemble all possible point combinations.
-        X = []
-        p1 = None
-        p2 = 1
-        for j in range(m - 1):
-            p1 = prod(n[j + 1:])
-            XX = [xx for item in x[j] for xx in repeat(item, p1)]*p2
-            X.append(XX)
-            p2 *= n[j]
-        X.append(x[-1]*p2)
-        X = list(zip(*X))
-
-    # Return the list of training points.
-    return X
+        return axes[0]
+
+    # Fill each coordinate column by broadcasting the points along its axis
+    # over the whole grid.
+    X = np.empty(tuple(n) + (m,), dtype=dtype)
+    for (j, a) in enumerate(axes):
+        shape = [1]*m
+        shape[j] = len(a)
+        X[..., j] = a.reshape(shape)
+
+    # Return the array of training points.
+    return X.reshape((-1, m))
+
+
+def training_grid_axes(n, bounds=None, dtype=float):
+    """Compute the evenly-spaced points along each dimension of a training
+    grid, as a list of 1-D arrays. See create_training_grid()."""
+    m = len(n)
+    if bounds is None:
+        bounds = [(0, 1)]*m
+    assert len(bounds) == m
+    return [np.linspace(lo, hi, nn, dtype=dtype)
+            for (nn, (lo, hi)) in zip(n, bounds)]
+
+
+def iter_training_grid(n, blocksize, bounds=None, dtype=float):
+    """Generate the points of a training grid in blocks of at most blocksize
+    points, in the same order as create_training_grid(). Each block is a
+    (k, m) array, or a 1-D array when m=1. Use this for grids too large to
+    create at once."""
+    grid = TensorGrid(training_grid_axes(n, bounds, dtype))
+    for (start, stop) in grid.blocks(blocksize):
+        X = grid.points(start, stop).astype(dtype, copy=False)
+        if grid.m == 1:
+            X = X[:, 0]
+        yield X
+
 
 def prod(n):
     """Compute the product of the elements of a list."""
@@ -74,3 +97,22 @@ if __name__ == '__main__':
     assert len(X3) == prod(n3)
     X4 = create_training_grid(n4)
     assert len(X4) == prod(n4)
+
+    print('Testing grid point order.')
+    assert X1.shape == (3,)
+    assert np.allclose(X1, [0, 0.5, 1])
+    assert X3.shape == (60, 3) and X3.flags['C_CONTIGUOUS']
+    X3_ref = np.array(np.meshgrid(*[np.linspace(0, 1, nn) for nn in n3],
+                                  indexing='ij')).reshape(3, -1).T
+    assert np.array_equal(X3, X3_ref)
+
+    print('Testing grid bounds and dtype.')
+    X = create_training_grid(n2, bounds=[(-1, 1), (2, 5)], dtype=np.float32)
+    assert X.dtype == np.float32
+    assert np.allclose(X[0], [-1, 2]) and np.allclose(X[-1], [1, 5])
+
+    print('Testing grid blocks.')
+    blocks = list(iter_training_grid(n4, 50))
+    assert len(blocks) == 8
+    assert np.array_equal(np.vstack(blocks), X4)
+    assert np.array_equal(np.hstack(list(iter_training_grid(n1, 2))), X1)
@@ -0,0 +1,194 @@
+###############################################################################
+"""
+TrialFunctionCache - Class to cache the parameter-independent parts of a
+trial function at a fixed set of training points
+
+For a trial function of the form:
+
+Yt(x) = A(x) + P(x)N(x,p)
+
+the boundary condition function A(x), the network coefficient function P(x),
+and their derivatives depend only on the training points, not on the network
+parameters p. These terms are computed once when the cache is created, and
+are reused by every subsequent error and gradient evaluation for the same
+training set.
+
+Example:
+    Create a cache for a trial function object and a set of training points.
+        tfc = TrialFunctionCache(tf, x)
+
+    Check if the cache is valid for a trial function and training set.
+        if tfc.matches(tf, x): ...
+
+    Compute the trial function at the cached points for network output N.
+        Yt = tfc.Ytf_v(N)
+
+Attributes:
+    tf - Trial function object used to create the cache
+    x - (n, m) array of training points (a copy)
+    key - Key of the contents of x, None until needed for a subset
+    A, delA, del2A - Cached boundary condition function, gradient, and
+        Laplacian components, shapes (n,), (n, m), (n, m)
+    P, delP, del2P - Cached network coefficient function, gradient, and
+        Laplacian components, shapes (n,), (n, m), (n, m)
+
+Methods:
+    matches(tf, x) - Return True if the cache is valid for trial function
+        tf and training points x
+
+    subset(idx, x) - Return a cache for the cached points with indices idx,
+        without recomputing the cached terms
+
+    Ytf_v(N) - Compute the trial function at the cached points with network
+        output N
+
+    delYtf_v(N, delN) - Compute the trial function gradient at the cached
+        points with network output N and network output gradient delN
+
+    del2Ytf_v(N, delN, del2N) - Compute the trial function Laplacian
+        components at the cached points with network output N, network
+        output gradient delN, and network output Laplacian components del2N
+
+Notes:
+    The cache is keyed on the identity of the trial function object and the
+    contents of the training array. The cache keeps a copy of the training
+    array, and matches() always compares the contents of x, so a training
+    array changed in place no longer matches. If the methods of the trial
+    function object are replaced after the cache is created, a new cache
+    must be created.
+
+Todo:
+
+"""
+
+
+from hashlib import sha1
+
+import numpy as np
+
+
+def training_set_key(x):
+    """Compute a hashable key for the contents of a training array."""
+    x = np.ascontiguousarray(x)
+    return (x.shape, x.dtype.str, sha1(x.view(np.uint8)).hexdigest())
+
+
+class TrialFunctionCache():
+    """Cache of parameter-independent trial function terms."""
+
+
+    # Public methods
+
+    def __init__(self, tf, x):
+        """Constructor"""
+        self.tf = tf
+        self.x = np.array(x)
+        self.key = training_set_key(self.x)
+        self.A = tf.Af_v(x)
+        self.delA = tf.delAf_v(x)
+        self.del2A = tf.del2Af_v(x)
+        self.P = tf.Pf_v(x)
+        self.delP = tf.delPf_v(x)
+        self.del2P = tf.del2Pf_v(x)
+
+    def matches(self, tf, x):
+        """Return True if the cache is valid for tf and x."""
+        if tf is not self.tf:
+            return False
+        if self.key is None:
+            self.key = training_set_key(self.x)
+        return training_set_key(x) == self.key
+
+    def subset(self, idx, x=None):
+        """Return a cache for the cached points with indices idx. x, if
+        given, must be the array of those points. The key of the subset is
+        only computed if it is checked with matches()."""
+        tfc = TrialFunctionCache.__new__(TrialFunctionCache)
+        tfc.tf = self.tf
+        tfc.x = self.x[idx] if x is None else x
+        tfc.key = None
+        tfc.A = self.A[idx]
+        tfc.delA = self.delA[idx]
+        tfc.del2A = self.del2A[idx]
+        tfc.P = self.P[idx]
+        tfc.delP = self.delP[idx]
+        tfc.del2P = self.del2P[idx]
+        return tfc
+
+    def Ytf_v(self, N):
+        """Trial function at the cached points"""
+        Yt = self.A + self.P*N
+        return Yt
+
+    def delYtf_v(self, N, delN):
+        """Trial function gradient at the cached points"""
+        delYt = (self.delA + self.P[:, np.newaxis]*delN +
+                 self.delP*N[:, np.newaxis])
+        return delYt
+
+    def del2Ytf_v(self, N, delN, del2N):
+        """Trial function Laplacian at the cached points"""
+        del2Yt = (self.del2A + self.P[:, np.newaxis]*del2N +
+                  2*self.delP*delN + self.del2P*N[:, np.newaxis])
+        return del2Yt
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    from pde2diff import PDE2DIFF
+    from diff2dtrialfunction import Diff2DTrialFunction
+
+    # Create a trial function for a 2-D diffusion problem.
+    eq = PDE2DIFF('diff2d_halfsine')
+    tf = Diff2DTrialFunction(eq.bcf, eq.delbcf, eq.del2bcf)
+
+    # Create a small training set and network output test values.
+    g = np.linspace(0, 1, 4)
+    x = np.array(np.meshgrid(g, g, g, indexing='ij')).reshape(3, -1).T.copy()
+    n = len(x)
+    N = np.linspace(-1, 1, n)
+    delN = np.tile([0.61, 0.62, 0.63], (n, 1))
+    del2N = np.tile([0.71, 0.72, 0.73], (n, 1))
+
+    tfc = TrialFunctionCache(tf, x)
+
+    print("Testing cache matching.")
+    if not tfc.matches(tf, x):
+        print("ERROR: Cache does not match original training set!")
+    if not tfc.matches(tf, x.copy()):
+        print("ERROR: Cache does not match copy of training set!")
+    if tfc.matches(tf, x[::-1].copy()):
+        print("ERROR: Cache matches reordered training set!")
+    if tfc.matches(Diff2DTrialFunction(eq.bcf, eq.delbcf, eq.del2bcf), x):
+        print("ERROR: Cache matches different trial function!")
+    xm = x.copy()
+    tfm = TrialFunctionCache(tf, xm)
+    xm[:] = x[::-1]
+    if tfm.matches(tf, xm):
+        print("ERROR: Cache matches training set changed in place!")
+
+    print("Testing cached trial function.")
+    if not np.allclose(tfc.Ytf_v(N), tf.Ytf_v(x, N)):
+        print("ERROR: Cached Yt does not match trial function!")
+
+    print("Testing cached trial function gradient.")
+    if not np.allclose(tfc.delYtf_v(N, delN), tf.delYtf_v(x, N, delN)):
+        print("ERROR: Cached delYt does not match trial function!")
+
+    print("Testing cached trial function Laplacian.")
+    if not np.allclose(tfc.del2Ytf_v(N, delN, del2N),
+                       tf.del2Ytf_v(x, N, delN, del2N)):
+        print("ERROR: Cached del2Yt does not match trial function!")
+
+    print("Testing cache subset.")
+    idx = np.arange(0, n, 3)
+    tfs = tfc.subset(idx)
+    if not tfs.matches(tf, x[idx].copy()):
+        print("ERROR: Subset cache does not match subset of training set!")
+    if not np.allclose(tfs.del2Ytf_v(N[idx], delN[idx], del2N[idx]),
+                       tf.del2Ytf_v(x[idx], N[idx], delN[idx], del2N[idx])):
+        print("ERROR: Subset cached del2Yt does not match trial function!")
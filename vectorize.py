@@ -0,0 +1,107 @@
+###############################################################################
+"""
+vectorize - Functions to create array versions of scalar equation functions
+
+The equation definition modules in eq/ define their functions for a single
+point, e.g. Gf(xv, Y, delY, del2Y). A module may also define an array
+version of each function, with the same name plus the suffix '_v', which
+takes arrays with one row per point, e.g. Gf_v(X, Y, delY, del2Y), and
+returns one result row per point. The functions in this module supply the
+array version when a module does not define it, by calling the scalar
+version once per point.
+
+Example:
+    Create an array version of a scalar function.
+        Gf_v = vectorize(Gf)
+        G = Gf_v(X, Y, delY, del2Y)
+
+    Create an array version of a list of scalar functions.
+        dG_ddelYf_v = vectorize(dG_ddelYf)
+        dG_ddelY = dG_ddelYf_v(X, Y, delY, del2Y)  # Shape (n, m)
+
+    Fetch the array version from a module, or create it if missing.
+        Gf_v = vectorized(pdemod, 'Gf_v', pdemod.Gf)
+
+Attributes:
+    None
+
+Methods:
+    vectorize(f) - Create an array version of a scalar function, or a
+        (nested) list of scalar functions
+    vectorized(mod, name, f) - Return the array function mod.name if it
+        exists, otherwise vectorize(f)
+
+Todo:
+
+"""
+
+
+import numpy as np
+
+
+def _apply(f, args):
+    """Apply a scalar function, or a nested list of them, to one point."""
+    if callable(f):
+        return f(*args)
+    return [_apply(ff, args) for ff in f]
+
+
+def vectorize(f):
+    """Create an array version of a scalar function or list of functions."""
+    def f_v(*args):
+        """Array version of a scalar function, evaluated point by point"""
+        return np.array([_apply(f, row) for row in zip(*args)], dtype=float)
+    f_v.scalar = f
+    return f_v
+
+
+def vectorized(mod, name, f):
+    """Return the array function mod.name, or vectorize(f) if missing."""
+    if hasattr(mod, name):
+        return getattr(mod, name)
+    if f is None:
+        return None
+    return vectorize(f)
+
+#################
+
+
+# Self-test code
+
+if __name__ == '__main__':
+
+    def Gf(xy, Y, delY):
+        (x, y) = xy
+        (dY_dx, dY_dy) = delY
+        return x*Y + dY_dy
+
+    def dG_dxf(xy, Y, delY):
+        return 1
+
+    def dG_dyf(xy, Y, delY):
+        return 2
+
+    X = np.array([[0, 1], [2, 3], [4, 5]], dtype=float)
+    Y = np.array([1, 2, 3], dtype=float)
+    delY = np.array([[1, 2], [3, 4], [5, 6]], dtype=float)
+
+    print("Testing vectorized function.")
+    G = vectorize(Gf)(X, Y, delY)
+    G_ref = X[:, 0]*Y + delY[:, 1]
+    if not np.allclose(G, G_ref):
+        print("ERROR: Vectorized function result is incorrect!")
+
+    print("Testing vectorized function list.")
+    dG = vectorize([dG_dxf, dG_dyf])(X, Y, delY)
+    if not np.allclose(dG, np.tile([1, 2], (3, 1))):
+        print("ERROR: Vectorized function list result is incorrect!")
+
+    print("Testing vectorized nested function list.")
+    d2G = vectorize([[dG_dxf, dG_dyf], [dG_dyf, dG_dxf]])(X, Y, delY)
+    if d2G.shape != (3, 2, 2) or not np.allclose(d2G[:, 0, 1], 2):
+        print("ERROR: Vectorized nested function list result is incorrect!")
+
+    print("Testing vectorized 1-argument function.")
+    Ya = vectorize(lambda x: 2*x)(Y)
+    if not np.allclose(Ya, 2*Y):
+        print("ERROR: Vectorized 1-argument function result is incorrect!")